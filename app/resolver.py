@@ -1,10 +1,14 @@
 import json
 import os
 import sys
+import threading
 from pathlib import Path
 
 CONFIG_PATH = Path("data/stegtvc_config.json")
 
+WILDCARD = "*"
+MEMO_LIMIT = 65536
+
 
 class StegTVCResolutionError(Exception):
     """Raised when StegTVC cannot resolve configuration."""
@@ -24,33 +28,148 @@ def load_config():
         raise StegTVCResolutionError(f"Failed to read config: {e}")
 
 
+def _provider_result(entry):
+    return {
+        "provider": entry.get("provider"),
+        "model": entry.get("model"),
+        "temperature": entry.get("temperature", 0.0),
+        "max_tokens": entry.get("max_tokens", 1024),
+    }
+
+
+class ResolverIndex:
+    """
+    Hash index over config["providers"], keyed by (use_case, module).
+
+    Entries may use "*" for use_case and/or module as a fallback and may set
+    an integer "priority" (default 0). A lookup takes the most specific key
+    that exists: (use_case, module), (use_case, "*"), ("*", module), ("*", "*").
+    Within one key the highest priority wins; ties keep file order, so a
+    config without wildcards or priorities resolves exactly like the
+    original first-match scan. Lookups are memoized per index.
+    """
+
+    def __init__(self, config):
+        providers = config.get("providers", [])
+        if not providers:
+            raise StegTVCResolutionError("No providers defined in config.")
+
+        best = {}
+        for pos, entry in enumerate(providers):
+            key = (entry.get("use_case"), entry.get("module"))
+            rank = (int(entry.get("priority", 0)), -pos)
+            if key not in best or rank > best[key][0]:
+                best[key] = (rank, entry)
+        self._table = {key: _provider_result(entry) for key, (_, entry) in best.items()}
+        self._memo = {}
+
+    def __len__(self):
+        return len(self._table)
+
+    def lookup(self, use_case, module):
+        """Provider fields for (use_case, module), or None."""
+        key = (use_case, module)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        table = self._table
+        hit = (
+            table.get(key)
+            or table.get((use_case, WILDCARD))
+            or table.get((WILDCARD, module))
+            or table.get((WILDCARD, WILDCARD))
+        )
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[key] = hit
+        return hit
+
+
+_index_lock = threading.Lock()
+_index_state = {"stamp": None, "index": None}
+
+
+def _config_stamp():
+    try:
+        st = os.stat(CONFIG_PATH)
+    except OSError:
+        return None
+    return (str(CONFIG_PATH), st.st_mtime_ns, st.st_size)
+
+
+def get_index():
+    """
+    Parsed, indexed config. Re-read only when CONFIG_PATH, its mtime or
+    its size changes.
+    """
+    stamp = _config_stamp()
+    state = _index_state
+    if stamp is not None and stamp == state["stamp"]:
+        return state["index"]
+    with _index_lock:
+        if stamp is None or stamp != state["stamp"]:
+            state["index"] = ResolverIndex(load_config())
+            state["stamp"] = stamp
+        return state["index"]
+
+
+def _resolve(index, use_case, module, importance):
+    hit = index.lookup(use_case, module)
+    if hit is None:
+        raise StegTVCResolutionError(
+            f"No match found for use_case='{use_case}' module='{module}'"
+        )
+    result = dict(hit)
+    result["importance"] = importance
+    return result
+
+
 def stegtvc_resolve(use_case: str, module: str, importance: str = "normal"):
     """
     Main resolver used by workflows & AI entities.
     """
-    config = load_config()
-
-    providers = config.get("providers", [])
-    if not providers:
-        raise StegTVCResolutionError("No providers defined in config.")
-
-    # single pass priority selection
-    for entry in providers:
-        if (
-            entry.get("use_case") == use_case
-            and entry.get("module") == module
-        ):
-            return {
-                "provider": entry.get("provider"),
-                "model": entry.get("model"),
-                "temperature": entry.get("temperature", 0.0),
-                "max_tokens": entry.get("max_tokens", 1024),
-                "importance": importance,
-            }
-
-    raise StegTVCResolutionError(
-        f"No match found for use_case='{use_case}' module='{module}'"
-    )
+    return _resolve(get_index(), use_case, module, importance)
+
+
+def check_pairs(pairs):
+    """
+    `pairs` as a list, after checking that every entry is a (use_case, module)
+    or (use_case, module, importance) sequence of strings.
+    """
+    if isinstance(pairs, (str, bytes, dict)) or not hasattr(pairs, "__iter__"):
+        raise StegTVCResolutionError("pairs must be a list of [use_case, module(, importance)]")
+    pairs = list(pairs)
+    for i, pair in enumerate(pairs):
+        if (not isinstance(pair, (list, tuple)) or len(pair) not in (2, 3)
+                or not all(isinstance(x, str) for x in pair)):
+            raise StegTVCResolutionError(
+                f"pairs[{i}] must be [use_case, module] or [use_case, module, importance] strings, got {pair!r}"
+            )
+    return pairs
+
+
+def resolve_many(pairs, importance: str = "normal", strict: bool = True):
+    """
+    Batch resolver: one config freshness check for the whole batch.
+
+    `pairs` holds (use_case, module) or (use_case, module, importance)
+    tuples; anything else raises StegTVCResolutionError before any lookup.
+    With strict=False a miss yields None instead of raising.
+    """
+    pairs = check_pairs(pairs)
+    index = get_index()
+    out = []
+    for pair in pairs:
+        use_case, module = pair[0], pair[1]
+        imp = pair[2] if len(pair) > 2 else importance
+        try:
+            out.append(_resolve(index, use_case, module, imp))
+        except StegTVCResolutionError:
+            if strict:
+                raise
+            out.append(None)
+    return out
 
 
 if __name__ == "__main__":
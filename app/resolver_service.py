@@ -0,0 +1,153 @@
+"""
+StegTVC resolver service – long-running resolver for job steps.
+
+Serves lookups from the indexed in-memory config (app.resolver) over HTTP on
+a Unix domain socket (default) or localhost TCP, so a step pays a socket
+round trip instead of interpreter startup + import + config read. The
+config is re-read automatically when its mtime/size changes.
+
+Start once per job:
+    python -m app.resolver_service --socket /tmp/stegtvc.sock &
+
+Query from shell steps:
+    curl -s --unix-socket /tmp/stegtvc.sock \
+      "http://stegtvc/resolve?use_case=connectivity-check&module=hybrid-collab-bridge"
+
+Endpoints:
+    GET  /health
+    GET  /resolve?use_case=..&module=..[&importance=..]
+    POST /resolve_many   {"pairs": [[use_case, module(, importance)], ...],
+                          "importance": "normal", "strict": false}
+
+Python callers use stegtvc_client.resolve / resolve_many, which talk to this
+service when it is running and fall back to in-process resolution otherwise.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.resolver import StegTVCResolutionError, check_pairs, get_index, resolve_many, stegtvc_resolve
+
+DEFAULT_SOCKET = os.environ.get("STEGTVC_SOCKET", "/tmp/stegtvc.sock")
+
+
+class ResolverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for clients holding a connection
+    server_version = "StegTVC/1"
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) tuple.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            try:
+                self._send(200, {"ok": True, "providers": len(get_index())})
+            except StegTVCResolutionError as e:
+                self._send(503, {"ok": False, "error": str(e)})
+            return
+        if url.path != "/resolve":
+            self._send(404, {"error": f"unknown path {url.path}"})
+            return
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if "use_case" not in q or "module" not in q:
+            self._send(400, {"error": "use_case and module are required"})
+            return
+        try:
+            self._send(200, stegtvc_resolve(q["use_case"], q["module"], q.get("importance", "normal")))
+        except StegTVCResolutionError as e:
+            self._send(404, {"error": str(e)})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/resolve_many":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            pairs = check_pairs(req["pairs"])
+        except (ValueError, KeyError, TypeError, StegTVCResolutionError) as e:
+            detail = f": {e}" if isinstance(e, StegTVCResolutionError) else ""
+            self._send(400, {"error": "body must be JSON with a 'pairs' list" + detail})
+            return
+        try:
+            results = resolve_many(pairs, req.get("importance", "normal"), bool(req.get("strict", False)))
+        except StegTVCResolutionError as e:
+            self._send(404, {"error": str(e)})
+            return
+        self._send(200, {"results": results})
+
+
+class UnixResolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+        super().server_bind()
+
+
+def make_server(socket_path=None, port=None, verbose=False):
+    if port is not None:
+        server = ThreadingHTTPServer(("127.0.0.1", port), ResolverHandler)
+    else:
+        server = UnixResolverServer(socket_path or DEFAULT_SOCKET, ResolverHandler)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StegTVC resolver service")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help="Unix socket path (default: $STEGTVC_SOCKET or /tmp/stegtvc.sock)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Serve on 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    # Fail fast on a broken config instead of on the first request.
+    try:
+        get_index()
+    except StegTVCResolutionError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    server = make_server(args.socket, args.port, args.verbose)
+    where = f"127.0.0.1:{args.port}" if args.port is not None else args.socket
+    print(f"StegTVC resolver service listening on {where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.port is None:
+            try:
+                os.unlink(args.socket)
+            except OSError:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,565 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the parts of the GitHub REST API that SCW uses.
+
+Serves synthetic orgs generated deterministically from --seed, so two runs
+(or two commits) see exactly the same fleet:
+
+- GET  /orgs/{org}/repos                      (paged, 100 per page)
+- POST /orgs/{org}/repos                      (new repo: empty, or README on main with auto_init)
+- GET  /repos/{o}/{r}                         (default_branch)
+- GET  /repos/{o}/{r}/contents/{path}?ref=    (policy files, scw/file_index.json)
+- PUT  /repos/{o}/{r}/contents/{path}         (also on an empty repo: its first commit)
+- GET  /repos/{o}/{r}/git/trees/{ref}?recursive=1
+- GET  /repos/{o}/{r}/git/ref/heads/{branch}, PATCH /git/refs/heads/{branch}, POST /git/refs
+- POST /repos/{o}/{r}/git/blobs | git/trees | git/commits
+- POST /repos/{o}/{r}/pulls
+- GET/POST/PUT /repos/{o}/{r}/pages          (404 until created)
+- GET  /orgs/{org}/actions/secrets            (policy depends_on_secrets, visibility "selected")
+- GET  /orgs/{org}/actions/secrets/{name}/repositories
+- GET  /repos/{o}/{r}/actions/secrets         (always empty)
+- GET  /rate_limit
+- GET  /__stats, POST /__reset               (request counters, per route)
+
+Each repo gets the policy's required files in a random state: fresh, stale
+(older sv_epoch) or missing; --index-ratio of repos carry scw/file_index.json.
+list_org_repos stops at 10 pages, so repos are spread over orgs of
+--org-size (default 1000). --secrets-ratio of repos are selected for the
+first org secret; the rest lack every secret. Repos created through the
+API start empty: git/ref, git/trees and Git Data writes answer 409 (as
+GitHub does) until a Contents API PUT makes the first commit.
+
+Fault injection: --latency-ms/--jitter-ms per request, --error-rate (502s),
+--rate-limit N requests per --rate-window seconds (403 + X-RateLimit-*).
+
+Usage:
+  python scripts/bench/fake_github.py --repos 1000 [--port 0]
+  (prints "listening on http://127.0.0.1:PORT" once ready)
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[2]
+PER_PAGE_MAX = 100
+
+
+def _meta_block(path, kind, version, epoch):
+    return (
+        "# === STEGVERSE FILE METADATA ===\n"
+        f"# sv_file: {path}\n# sv_kind: {kind}\n# sv_module: SCW\n"
+        f"# sv_version: {version}\n# sv_build_id: 20251125-000000Z\n# sv_epoch: {epoch}\n"
+        "# sv_parent_build: none\n# sv_hash: auto\n# sv_sig: svmeta:v1\n"
+        "# === END STEGVERSE FILE METADATA ===\n"
+    )
+
+
+def git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class Fleet:
+    """Deterministic synthetic repos: content is a pure function of (seed, repo index)."""
+
+    def __init__(self, repos, org_size, seed, index_ratio, stale_ratio, missing_ratio, policy,
+                 secrets_ratio=1.0):
+        self.n = repos
+        self.org_size = org_size
+        self.seed = seed
+        self.index_ratio = index_ratio
+        self.stale_ratio = stale_ratio
+        self.missing_ratio = missing_ratio
+        self.secrets_ratio = secrets_ratio
+        self.epoch = int(policy["policy_epoch"])
+        self.version = policy["min_versions"].get("workflow", "4.0.0")
+        self.required = [f for f in policy["required_files"] if f["path"] != "scw/file_index.json"]
+        self.secrets = sorted({n for f in policy["required_files"] for n in f.get("depends_on_secrets") or []})
+        self.orgs = [f"bench-{i:02d}" for i in range((repos + org_size - 1) // org_size)]
+
+    def org_repos(self, org):
+        try:
+            o = self.orgs.index(org)
+        except ValueError:
+            return None
+        lo = o * self.org_size
+        return [f"{org}/r{i:05d}" for i in range(lo, min(self.n, lo + self.org_size))]
+
+    def repo_index(self, full):
+        m = re.fullmatch(r"(bench-\d+)/r(\d+)", full)
+        if not m or int(m.group(2)) >= self.n:
+            return None
+        return int(m.group(2))
+
+    def secret_repos(self, org, name):
+        """Repos selected for an org secret: only the first one is shared, with --secrets-ratio of repos."""
+        repos = self.org_repos(org)
+        if repos is None or name not in self.secrets:
+            return None
+        if name != self.secrets[0]:
+            return []
+        return [f for f in repos
+                if random.Random(f"{self.seed}:secrets:{f}").random() < self.secrets_ratio]
+
+    def files(self, full):
+        """path -> text for one repo."""
+        i = self.repo_index(full)
+        if i is None:
+            return None
+        rng = random.Random(self.seed * 1_000_003 + i)
+        files = {"README.md": f"# {full}\n"}
+        index_files = []
+        for spec in self.required:
+            roll = rng.random()
+            if roll < self.missing_ratio:
+                continue
+            epoch = self.epoch - 1 if roll < self.missing_ratio + self.stale_ratio else self.epoch
+            path = spec["path"]
+            files[path] = _meta_block(path, spec.get("kind", "workflow"), self.version, epoch) + (
+                f"name: {Path(path).stem}\non:\n  workflow_dispatch:\njobs:\n  noop:\n"
+                "    runs-on: ubuntu-latest\n    steps:\n      - run: echo ok\n"
+            )
+            index_files.append({"path": path, "kind": spec.get("kind", "workflow"), "module": "SCW",
+                                "sv_version": self.version, "sv_build_id": "20251125-000000Z",
+                                "sv_epoch": epoch, "sv_hash": "auto"})
+        if rng.random() < self.index_ratio:
+            files["scw/file_index.json"] = json.dumps(
+                {"sv_index_sig": "fileindex:v1", "files": index_files}, indent=2)
+        return files
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.total = 0
+            self.by_route = {}
+            self.bytes_out = 0
+
+    def add(self, route, nbytes):
+        with self.lock:
+            self.total += 1
+            self.by_route[route] = self.by_route.get(route, 0) + 1
+            self.bytes_out += nbytes
+
+    def as_dict(self):
+        with self.lock:
+            return {"requests": self.total, "bytes_out": self.bytes_out, "by_route": dict(self.by_route)}
+
+
+class RateLimiter:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.used = 0
+
+    def take(self):
+        """(allowed, remaining, reset_epoch)."""
+        with self.lock:
+            now = time.time()
+            if now - self.start >= self.window:
+                self.start, self.used = now, 0
+            reset = int(self.start + self.window)
+            if not self.limit:
+                return True, 5000, reset
+            if self.used >= self.limit:
+                return False, 0, reset
+            self.used += 1
+            return True, self.limit - self.used, reset
+
+
+ROUTES = [
+    ("GET", "org_repos", re.compile(r"^/orgs/([^/]+)/repos$")),
+    ("POST", "create_repo", re.compile(r"^/orgs/([^/]+)/repos$")),
+    ("GET", "repo", re.compile(r"^/repos/([^/]+/[^/]+)$")),
+    ("GET", "contents", re.compile(r"^/repos/([^/]+/[^/]+)/contents/(.+)$")),
+    ("PUT", "put_contents", re.compile(r"^/repos/([^/]+/[^/]+)/contents/(.+)$")),
+    ("GET", "tree", re.compile(r"^/repos/([^/]+/[^/]+)/git/trees/(.+)$")),
+    ("GET", "ref", re.compile(r"^/repos/([^/]+/[^/]+)/git/ref/(heads/.+)$")),
+    ("PATCH", "update_ref", re.compile(r"^/repos/([^/]+/[^/]+)/git/refs/(heads/.+)$")),
+    ("POST", "create_ref", re.compile(r"^/repos/([^/]+/[^/]+)/git/refs$")),
+    ("POST", "create_blob", re.compile(r"^/repos/([^/]+/[^/]+)/git/blobs$")),
+    ("POST", "create_tree", re.compile(r"^/repos/([^/]+/[^/]+)/git/trees$")),
+    ("POST", "create_commit", re.compile(r"^/repos/([^/]+/[^/]+)/git/commits$")),
+    ("POST", "create_pull", re.compile(r"^/repos/([^/]+/[^/]+)/pulls$")),
+    ("GET", "pages", re.compile(r"^/repos/([^/]+/[^/]+)/pages$")),
+    ("POST", "create_pages", re.compile(r"^/repos/([^/]+/[^/]+)/pages$")),
+    ("PUT", "update_pages", re.compile(r"^/repos/([^/]+/[^/]+)/pages$")),
+    ("GET", "org_secrets", re.compile(r"^/orgs/([^/]+)/actions/secrets$")),
+    ("GET", "org_secret_repos", re.compile(r"^/orgs/([^/]+)/actions/secrets/([^/]+)/repositories$")),
+    ("GET", "repo_secrets", re.compile(r"^/repos/([^/]+/[^/]+)/actions/secrets$")),
+    ("GET", "rate_limit", re.compile(r"^/rate_limit$")),
+]
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeGitHub/1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, route, headers=None):
+        body = json.dumps(payload).encode("utf-8") if status != 204 else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(body)
+        if route:
+            self.server.stats.add(route, len(body))
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        srv = self.server
+        if url.path == "/__stats":
+            return self._send(200, srv.stats.as_dict(), None)
+        if url.path == "/__reset":
+            self._body()
+            srv.stats.reset()
+            return self._send(200, {"ok": True}, None)
+
+        for m, route, rx in ROUTES:
+            match = rx.match(url.path)
+            if m == method and match:
+                break
+        else:
+            match = None
+        body = self._body() if method != "GET" else {}
+        if match is None:
+            return self._send(404, {"message": "Not Found"}, "not_found")
+        if srv.latency:
+            time.sleep(max(0.0, srv.latency + srv.rng.uniform(-srv.jitter, srv.jitter)))
+        allowed, remaining, reset = srv.limiter.take()
+        rl = {"X-RateLimit-Limit": srv.limiter.limit or 5000, "X-RateLimit-Remaining": remaining,
+              "X-RateLimit-Reset": reset}
+        if route != "rate_limit":
+            if not allowed:
+                return self._send(403, {"message": "API rate limit exceeded"}, "rate_limited", rl)
+            if srv.error_rate and srv.rng.random() < srv.error_rate:
+                return self._send(502, {"message": "Injected error"}, "injected_error", rl)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, payload = getattr(self, f"_r_{route}")(*match.groups(), q=q, body=body)
+        self._send(status, payload, route, rl)
+
+    # --- routes -----------------------------------------------------------
+
+    def _exists(self, full):
+        return self.server.fleet.repo_index(full) is not None or full in self.server.created
+
+    def _empty(self, full):
+        srv = self.server
+        with srv.lock:
+            return full in srv.created and full not in srv.writes
+
+    def _repo_files(self, full):
+        srv = self.server
+        with srv.lock:
+            files = srv.writes.get(full)
+        return files if files is not None else srv.fleet.files(full)
+
+    def _r_org_repos(self, org, q, body):
+        repos = self.server.fleet.org_repos(org)
+        if repos is None:
+            return 404, {"message": "Not Found"}
+        per_page = min(int(q.get("per_page", 30)), PER_PAGE_MAX)
+        page = max(1, int(q.get("page", 1)))
+        chunk = repos[(page - 1) * per_page: page * per_page]
+        return 200, [{"full_name": f, "name": f.split("/")[1], "default_branch": "main",
+                      "archived": False, "private": False} for f in chunk]
+
+    def _r_create_repo(self, org, q, body):
+        srv = self.server
+        full = f"{org}/{body.get('name', '')}"
+        if self._exists(full):
+            return 422, {"message": "name already exists on this account"}
+        with srv.lock:
+            srv.created.add(full)
+            if body.get("auto_init"):
+                files = {"README.md": f"# {body['name']}\n"}
+                sha = hashlib.sha1(f"{full}:init".encode()).hexdigest()
+                srv.objects[sha] = {"files": files}
+                srv.refs[(full, "heads/main")] = sha
+                srv.writes[full] = dict(files)
+        return 201, {"full_name": full, "name": body.get("name"), "default_branch": "main",
+                     "private": bool(body.get("private"))}
+
+    def _r_repo(self, full, q, body):
+        if not self._exists(full):
+            return 404, {"message": "Not Found"}
+        return 200, {"full_name": full, "name": full.split("/")[1], "default_branch": "main", "private": False}
+
+    def _r_contents(self, full, path, q, body):
+        files = self._repo_files(full)
+        if files is None or path not in files:
+            return 404, {"message": "Not Found"}
+        data = files[path].encode("utf-8")
+        return 200, {"type": "file", "path": path, "sha": git_blob_sha(data), "size": len(data),
+                     "encoding": "base64", "content": base64.b64encode(data).decode("ascii")}
+
+    def _r_put_contents(self, full, path, q, body):
+        srv = self.server
+        if not self._exists(full):
+            return 404, {"message": "Not Found"}
+        text = base64.b64decode(body.get("content", "")).decode("utf-8", errors="replace")
+        ref = f"heads/{body.get('branch') or 'main'}"
+        with srv.lock:
+            files = dict(self._repo_files(full) or {})
+            files[path] = text
+            sha = hashlib.sha1(f"{full}:{path}:{body.get('message')}:{len(srv.objects)}".encode()).hexdigest()
+            srv.objects[sha] = {"files": files}
+            srv.refs[(full, ref)] = sha
+            srv.writes[full] = dict(files)
+        return 201, {"content": {"path": path, "sha": git_blob_sha(text.encode("utf-8"))},
+                     "commit": {"sha": sha}}
+
+    def _r_tree(self, full, ref, q, body):
+        if self._empty(full):
+            return 409, {"message": "Git Repository is empty."}
+        files = self._repo_files(full)
+        if files is None:
+            return 404, {"message": "Not Found"}
+        tree = [{"path": p, "mode": "100644", "type": "blob", "sha": git_blob_sha(t.encode("utf-8")),
+                 "size": len(t.encode("utf-8"))} for p, t in sorted(files.items())]
+        return 200, {"sha": hashlib.sha1(ref.encode()).hexdigest(), "tree": tree, "truncated": False}
+
+    def _r_ref(self, full, ref, q, body):
+        srv = self.server
+        if not self._exists(full):
+            return 404, {"message": "Not Found"}
+        if self._empty(full):
+            return 409, {"message": "Git Repository is empty."}
+        with srv.lock:
+            sha = srv.refs.get((full, ref))
+            if sha is None and full in srv.created:
+                return 404, {"message": "Not Found"}   # API-created repos only have the refs written
+            sha = sha or hashlib.sha1(f"{full}:{ref}".encode()).hexdigest()
+        return 200, {"ref": f"refs/{ref}", "object": {"type": "commit", "sha": sha}}
+
+    def _r_update_ref(self, full, ref, q, body):
+        srv = self.server
+        with srv.lock:
+            commit = srv.objects.get(body.get("sha"))
+            if commit is None:
+                return 422, {"message": "Object does not exist"}
+            srv.refs[(full, ref)] = body["sha"]
+            srv.writes[full] = dict(commit["files"])
+        return 200, {"ref": f"refs/{ref}", "object": {"type": "commit", "sha": body["sha"]}}
+
+    def _r_create_ref(self, full, q, body):
+        srv = self.server
+        ref = body.get("ref", "")[len("refs/"):]
+        with srv.lock:
+            commit = srv.objects.get(body.get("sha"))
+            if commit is None:
+                return 422, {"message": "Object does not exist"}
+            if (full, ref) in srv.refs:
+                return 422, {"message": "Reference already exists"}
+            srv.refs[(full, ref)] = body["sha"]
+            srv.writes[full] = dict(commit["files"])
+        return 201, {"ref": f"refs/{ref}", "object": {"type": "commit", "sha": body["sha"]}}
+
+    def _r_create_blob(self, full, q, body):
+        if self._empty(full):
+            return 409, {"message": "Git Repository is empty."}
+        content = body.get("content", "")
+        data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode("utf-8")
+        sha = git_blob_sha(data)
+        with self.server.lock:
+            self.server.objects[sha] = {"blob": data.decode("utf-8", errors="replace")}
+        return 201, {"sha": sha}
+
+    def _r_create_tree(self, full, q, body):
+        if self._empty(full):
+            return 409, {"message": "Git Repository is empty."}
+        srv = self.server
+        with srv.lock:
+            if "base_tree" in body:
+                base = srv.objects.get(body["base_tree"], {}).get("files")
+                files = dict(base if base is not None else (self._repo_files(full) or {}))
+            else:
+                files = {}
+            for e in body.get("tree", []):
+                if e.get("sha") is None and "content" not in e:
+                    files.pop(e["path"], None)
+                elif "content" in e:
+                    files[e["path"]] = e["content"]
+                else:
+                    files[e["path"]] = srv.objects.get(e["sha"], {}).get("blob", "")
+            sha = hashlib.sha1(json.dumps(sorted(files.items())).encode("utf-8")).hexdigest()
+            srv.objects[sha] = {"files": files}
+        return 201, {"sha": sha}
+
+    def _r_create_commit(self, full, q, body):
+        if self._empty(full):
+            return 409, {"message": "Git Repository is empty."}
+        srv = self.server
+        with srv.lock:
+            tree = srv.objects.get(body.get("tree"))
+            if tree is None:
+                return 422, {"message": "Tree does not exist"}
+            sha = hashlib.sha1(f"{body.get('tree')}:{body.get('parents')}:{body.get('message')}".encode()).hexdigest()
+            srv.objects[sha] = {"files": tree["files"]}
+        return 201, {"sha": sha, "tree": {"sha": body["tree"]}}
+
+    def _r_create_pull(self, full, q, body):
+        srv = self.server
+        with srv.lock:
+            srv.pull_seq += 1
+            number = srv.pull_seq
+        return 201, {"number": number, "head": {"ref": body.get("head")}, "base": {"ref": body.get("base")},
+                     "html_url": f"http://fake/{full}/pull/{number}"}
+
+    def _r_pages(self, full, q, body):
+        with self.server.lock:
+            pages = self.server.pages.get(full)
+        return (200, pages) if pages is not None else (404, {"message": "Not Found"})
+
+    def _r_create_pages(self, full, q, body):
+        srv = self.server
+        if not self._exists(full):
+            return 404, {"message": "Not Found"}
+        owner, name = full.split("/")
+        with srv.lock:
+            if full in srv.pages:
+                return 409, {"message": "GitHub Pages is already enabled."}
+            srv.pages[full] = {"html_url": f"http://fake/{owner}.github.io/{name}/", "cname": None,
+                               "build_type": body.get("build_type", "legacy"), "source": body.get("source")}
+            return 201, srv.pages[full]
+
+    def _r_update_pages(self, full, q, body):
+        srv = self.server
+        with srv.lock:
+            pages = srv.pages.get(full)
+            if pages is None:
+                return 404, {"message": "Not Found"}
+            pages.update({k: body[k] for k in ("build_type", "source", "cname") if k in body})
+        return 204, None
+
+    def _r_org_secrets(self, org, q, body):
+        fleet = self.server.fleet
+        if fleet.org_repos(org) is None:
+            return 404, {"message": "Not Found"}
+        secrets = [{"name": n, "visibility": "selected", "created_at": "2025-11-25T00:00:00Z"}
+                   for n in fleet.secrets]
+        return 200, {"total_count": len(secrets), "secrets": secrets}
+
+    def _r_org_secret_repos(self, org, name, q, body):
+        repos = self.server.fleet.secret_repos(org, name)
+        if repos is None:
+            return 404, {"message": "Not Found"}
+        per_page = min(int(q.get("per_page", 30)), PER_PAGE_MAX)
+        page = max(1, int(q.get("page", 1)))
+        chunk = repos[(page - 1) * per_page: page * per_page]
+        return 200, {"total_count": len(repos),
+                     "repositories": [{"full_name": f, "name": f.split("/")[1]} for f in chunk]}
+
+    def _r_repo_secrets(self, full, q, body):
+        if self.server.fleet.repo_index(full) is None:
+            return 404, {"message": "Not Found"}
+        return 200, {"total_count": 0, "secrets": []}
+
+    def _r_rate_limit(self, q, body):
+        srv = self.server
+        remaining = 5000 if not srv.limiter.limit else max(0, srv.limiter.limit - srv.limiter.used)
+        core = {"limit": srv.limiter.limit or 5000, "remaining": remaining,
+                "reset": int(srv.limiter.start + srv.limiter.window)}
+        return 200, {"resources": {"core": core, "graphql": core}, "rate": core}
+
+
+def make_server(args, policy):
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeGitHubHandler)
+    server.daemon_threads = True
+    server.verbose = args.verbose
+    server.fleet = Fleet(args.repos, args.org_size, args.seed, args.index_ratio,
+                         args.stale_ratio, args.missing_ratio, policy, args.secrets_ratio)
+    server.stats = Stats()
+    server.limiter = RateLimiter(args.rate_limit, args.rate_window)
+    server.latency = args.latency_ms / 1000.0
+    server.jitter = args.jitter_ms / 1000.0
+    server.error_rate = args.error_rate
+    server.rng = random.Random(args.seed)
+    server.lock = threading.RLock()  # create_tree reads _repo_files under it
+    server.objects, server.refs, server.writes = {}, {}, {}
+    server.pages, server.created = {}, set()
+    server.pull_seq = 0
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local fake GitHub API for SCW benchmarks")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--repos", type=int, default=1000)
+    parser.add_argument("--org-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index-ratio", type=float, default=0.5,
+                        help="Share of repos carrying scw/file_index.json")
+    parser.add_argument("--stale-ratio", type=float, default=0.2)
+    parser.add_argument("--missing-ratio", type=float, default=0.1)
+    parser.add_argument("--secrets-ratio", type=float, default=0.9,
+                        help="Share of repos selected for the org secret their workflows need")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per window (0 = unlimited)")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--policy", default=str(ROOT / "scw" / "policy.yml"))
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    policy = yaml.safe_load(Path(args.policy).read_text(encoding="utf-8"))
+    server = make_server(args, policy)
+    host, port = server.server_address[:2]
+    print(f"listening on http://{host}:{port} orgs={','.join(server.fleet.orgs)}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
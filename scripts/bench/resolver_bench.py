@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+StegTVC resolver benchmark.
+
+Builds a synthetic config (default 10k providers), then times 100k lookups
+through:
+- legacy:      load_config() + linear scan per call (sampled, extrapolated)
+- cached:      stegtvc_resolve() with the mtime/size-keyed index
+- batch:       resolve_many() over the same lookups
+
+Usage:
+  python scripts/bench/resolver_bench.py [--providers 10000] [--lookups 100000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import resolver  # noqa: E402
+
+
+def _legacy_resolve(use_case, module):
+    config = resolver.load_config()
+    for entry in config.get("providers", []):
+        if entry.get("use_case") == use_case and entry.get("module") == module:
+            return entry
+    raise resolver.StegTVCResolutionError("miss")
+
+
+def _synthetic_config(n):
+    providers = [
+        {
+            "use_case": f"uc-{i % 500}",
+            "module": f"mod-{i}",
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "temperature": 0.0,
+            "max_tokens": 512,
+        }
+        for i in range(n)
+    ]
+    providers.append({"use_case": "*", "module": "*", "provider": "fallback", "model": "none"})
+    return {"providers": providers}
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StegTVC resolver benchmark")
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--legacy-sample", type=int, default=200,
+                        help="Legacy lookups actually run (the rest is extrapolated)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = Path(tmp) / "stegtvc_config.json"
+        cfg.write_text(json.dumps(_synthetic_config(args.providers)), encoding="utf-8")
+        resolver.CONFIG_PATH = cfg
+
+        pairs = []
+        for _ in range(args.lookups):
+            i = rng.randrange(args.providers)
+            pairs.append((f"uc-{i % 500}", f"mod-{i}"))
+
+        sample = pairs[: args.legacy_sample]
+        legacy = _timed(lambda: [_legacy_resolve(u, m) for u, m in sample])
+        legacy_total = legacy / len(sample) * len(pairs)
+
+        build = _timed(resolver.get_index)
+        cached = _timed(lambda: [resolver.stegtvc_resolve(u, m) for u, m in pairs])
+        batch = _timed(lambda: resolver.resolve_many(pairs))
+
+    print(f"providers={args.providers} lookups={args.lookups}")
+    print(f"  {'index build (once)':<24} {build:10.3f}s")
+    for name, secs in [
+        ("legacy (extrapolated)", legacy_total),
+        ("cached stegtvc_resolve", cached),
+        ("resolve_many", batch),
+    ]:
+        print(f"  {name:<24} {secs:10.3f}s  {secs / len(pairs) * 1e6:10.2f} us/lookup")
+    print(f"  speedup (batch vs legacy): {legacy_total / batch:,.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
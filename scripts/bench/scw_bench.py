@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+"""
+SCW benchmark suite, run against the local fake GitHub API.
+
+For each fleet size (default 100 / 1k / 10k repos) a fresh
+scripts/bench/fake_github.py is started and a separate worker process
+measures:
+- scan:         scan_org over every synthetic org (repos/s, API calls/repo),
+                recording the local snapshot as org-scan does
+- simulate:     offline fix queue from that snapshot under a bumped policy_epoch
+- autopatch:    the first --autopatch-items pending items that have a template,
+                cloned from and pushed to local bare repos (SCW_GIT_URL), PRs
+                against the fake
+- state_reader: load/filter/latest/render over size*5 synthetic events
+- svmeta:       SvMeta.from_text over size*3 metadata-bearing documents, then
+                sort + FleetIndex over at least 100k of the parsed metas
+plus the worker's peak RSS. The fleet is generated from a fixed seed, and
+results carry the commit sha, so runs are comparable across commits:
+
+  python scripts/bench/scw_bench.py --out reports/bench/scw_bench.json
+  python scripts/bench/scw_bench.py --compare reports/bench/scw_bench.json
+
+Extra arguments after "--" are passed to fake_github.py (e.g.
+-- --latency-ms 20 --error-rate 0.01).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+FAKE = ROOT / "scripts" / "bench" / "fake_github.py"
+SIG = "scwbench:v1"
+
+# (section, metric, higher_is_better) pairs shown by --compare.
+HEADLINE = [
+    ("scan", "repos_per_s", True),
+    ("scan", "api_calls_per_repo", False),
+    ("simulate", "repos_per_s", True),
+    ("autopatch", "items_per_s", True),
+    ("state_reader", "events_per_s", True),
+    ("svmeta", "docs_per_s", True),
+    ("svmeta", "index_adds_per_s", True),
+    (None, "peak_rss_mb", False),
+]
+
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def _rate(n, secs):
+    return round(n / secs, 2) if secs > 0 else None
+
+
+# --- worker (one process per size) -----------------------------------------
+
+def _bench_scan(policy, orgs, size, snap_path):
+    from scw import metrics
+    from scw.org_health import scan_org
+    from scw.snapshot import Snapshot
+
+    metrics.reset()
+    t0 = time.perf_counter()
+    with Snapshot(snap_path) as snap:
+        report = scan_org("bench-token", orgs, policy, snap)
+    secs = time.perf_counter() - t0
+    snap = metrics.snapshot()
+    calls = sum(c["value"] for c in snap["counters"] if c["name"] == "api_calls")
+    api_bytes = sum(c["value"] for c in snap["counters"] if c["name"] == "api_bytes")
+    return report, {
+        "repos": len(report["repos"]),
+        "seconds": round(secs, 3),
+        "repos_per_s": _rate(len(report["repos"]), secs),
+        "api_calls": int(calls),
+        "api_calls_per_repo": round(calls / max(1, len(report["repos"])), 2),
+        "api_bytes": int(api_bytes),
+        "fix_items": len(report["fix_queue"]["items"]),
+    }
+
+
+def _bench_simulate(policy, snap_path):
+    from scw.snapshot import Snapshot, simulate
+
+    candidate = dict(policy, policy_epoch=policy["policy_epoch"] + 1)
+    t0 = time.perf_counter()
+    with Snapshot(snap_path, readonly=True) as snap:
+        _, items, stats = simulate(snap, candidate)
+    secs = time.perf_counter() - t0
+    return {"repos": stats["repos"], "seconds": round(secs, 3),
+            "repos_per_s": _rate(stats["repos"], secs), "fix_items": len(items)}
+
+
+def _seed_bare_repos(git_root, repos):
+    """One bare repo per name, cloned from a single seeded repo (cheap local clones)."""
+    seed = git_root / "_seed"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(seed)], check=True)
+    (seed / "README.md").write_text("seed\n", encoding="utf-8")
+    env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.invalid",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.invalid")
+    subprocess.run(["git", "add", "."], cwd=seed, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "seed"], cwd=seed, check=True, env=env)
+    for full in repos:
+        dest = git_root / f"{full}.git"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(["git", "clone", "-q", "--bare", str(seed), str(dest)], check=True)
+
+
+def _bench_autopatch(report, policy, n_items, tmp):
+    from scw import templating
+
+    # Items without a template (scw/file_index.json) now stop before the clone; keep the bench on real patches.
+    templates = templating.load(policy, ROOT)
+    items = [i for i in report["fix_queue"]["items"]
+             if i["status"] == "pending" and templates.get(i["path"]) is not None][:n_items]
+    if not items:
+        return {"items": 0}
+    git_root = tmp / "git"
+    _seed_bare_repos(git_root, sorted({i["repo"] for i in items}))
+    os.environ.update({
+        "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.invalid",
+        "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.invalid",
+    })
+    from scw import metrics, scw_core
+
+    scw_core.GIT_URL = git_root.as_uri()
+    scw_core.WORKDIR = tmp / "work"
+    metrics.reset()
+    t0 = time.perf_counter()
+    scw_core.autopatch({"items": items}, policy)
+    secs = time.perf_counter() - t0
+    statuses = {}
+    for i in items:
+        statuses[i["status"]] = statuses.get(i["status"], 0) + 1
+    snap = metrics.snapshot()
+    git_s = sum(s["total_ms"] for n, s in snap["spans"].items() if n.startswith("git_")) / 1000
+    return {"items": len(items), "seconds": round(secs, 3), "items_per_s": _rate(len(items), secs),
+            "git_seconds": round(git_s, 3), "statuses": statuses}
+
+
+def _bench_state_reader(size, tmp):
+    sys.path.insert(0, str(ROOT / "scripts"))
+    import state_reader
+
+    rng = random.Random(7)
+    statuses = ["fixed", "ok", "still_broken", "dispatch_added_only"]
+    path = tmp / "events.jsonl"
+    n = size * 5
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "namespace": "SCW", "kind": "workflow_first_aid",
+                "resource_name": f"wf-{rng.randrange(size)}.yml",
+                "ts": f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                "status": rng.choice(statuses), "post_checksum": f"{i:064x}",
+                "labels": ["first_aid"], "run_id": str(i),
+            }) + "\n")
+    t0 = time.perf_counter()
+    latest = state_reader._build_latest_by_workflow(
+        state_reader._filter_scw_workflow_events(state_reader._load_events(path)))
+    state_reader._render_markdown(latest)
+    state_reader._build_latest_json(latest)
+    secs = time.perf_counter() - t0
+    return {"events": n, "seconds": round(secs, 3), "events_per_s": _rate(n, secs)}
+
+
+def _bench_svmeta(size):
+    from scw.svmeta import FleetIndex, SvMeta
+
+    body = "jobs:\n  noop:\n    runs-on: ubuntu-latest\n    steps:\n      - run: echo ok\n" * 20
+    docs = [
+        "# === STEGVERSE FILE METADATA ===\n"
+        f"# sv_file: f{i}.yml\n# sv_kind: workflow\n# sv_module: SCW\n# sv_version: 4.{i % 10}.0\n"
+        f"# sv_build_id: 20251125-000000Z\n# sv_epoch: {i % 10}\n# sv_hash: auto\n# sv_sig: svmeta:v1\n"
+        "# === END STEGVERSE FILE METADATA ===\n" + body
+        for i in range(size * 3)
+    ]
+    t0 = time.perf_counter()
+    metas = [SvMeta.from_text(d) for d in docs]
+    secs = time.perf_counter() - t0
+    # Sorting and indexing a fleet's worth of metas (as fleet-index does).
+    fleet = [metas[i % len(metas)] for i in range(max(len(metas), 100_000))]
+    t0 = time.perf_counter()
+    fleet.sort(key=SvMeta.ordering_key)
+    sort_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = FleetIndex()
+    for i, m in enumerate(fleet):
+        index.add(f"repo{i // 3}", m.sv_file, m)
+    index_s = time.perf_counter() - t0
+    return {"docs": len(docs), "seconds": round(secs, 3), "docs_per_s": _rate(len(docs), secs),
+            "sorted": len(fleet), "sort_ms": round(sort_s * 1000, 1),
+            "index_adds_per_s": _rate(len(fleet), index_s)}
+
+
+def run_worker(args):
+    import yaml
+
+    policy = yaml.safe_load((ROOT / "scw" / "policy.yml").read_text(encoding="utf-8"))
+    orgs = args.orgs.split(",")
+    tmp = Path(tempfile.mkdtemp(prefix="scw_bench_"))
+    try:
+        result = {"size": args.size}
+        snap_path = tmp / "snapshot.sqlite"
+        try:
+            report, result["scan"] = _bench_scan(policy, orgs, args.size, snap_path)
+        except Exception as e:
+            # Injected faults (--error-rate, --rate-limit) can abort a scan; record it.
+            report, result["scan"] = None, {"error": f"{type(e).__name__}: {str(e)[:200]}"}
+        result["simulate"] = _bench_simulate(policy, snap_path) if report else {"repos": 0}
+        result["autopatch"] = (_bench_autopatch(report, policy, args.autopatch_items, tmp)
+                               if report else {"items": 0})
+        del report
+        result["state_reader"] = _bench_state_reader(args.size, tmp)
+        result["svmeta"] = _bench_svmeta(args.size)
+        result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps(result))
+    return 0
+
+
+# --- driver ----------------------------------------------------------------
+
+def _start_fake(size, fake_args):
+    proc = subprocess.Popen([sys.executable, str(FAKE), "--repos", str(size), "--port", "0", *fake_args],
+                            stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().split()
+    if len(line) < 3 or not line[2].startswith("http://"):
+        proc.kill()
+        raise SystemExit(f"fake_github.py failed to start: {' '.join(line)}")
+    return proc, line[2], line[3].split("=", 1)[1]
+
+
+def _run_size(size, args, fake_args):
+    proc, url, orgs = _start_fake(size, fake_args)
+    try:
+        env = dict(os.environ, SCW_API_URL=url, GH_TOKEN="bench-token", SCW_METRICS="0",
+                   PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        cmd = [sys.executable, str(Path(__file__).resolve()), "_worker", "--size", str(size),
+               "--orgs", orgs, "--autopatch-items", str(args.autopatch_items)]
+        out = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            sys.stderr.write(out.stderr[-4000:])
+            raise SystemExit(f"benchmark worker failed for size {size}")
+        return json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _value(result, section, metric):
+    return result.get(metric) if section is None else (result.get(section) or {}).get(metric)
+
+
+def _print_table(doc, baseline=None):
+    base = {r["size"]: r for r in (baseline or {}).get("results", [])}
+    print(f"commit={doc['commit'] or 'n/a'} python={doc['python']}"
+          + (f"  (vs {(baseline.get('commit') or 'n/a')[:12]})" if baseline else ""))
+    for r in doc["results"]:
+        print(f"size={r['size']}")
+        for section in ("scan", "autopatch"):
+            if (r.get(section) or {}).get("error"):
+                print(f"  {section} failed: {r[section]['error']}")
+        for section, metric, higher in HEADLINE:
+            v = _value(r, section, metric)
+            label = f"{section}.{metric}" if section else metric
+            line = f"  {label:<30} {v if v is not None else '-':>12}"
+            old = _value(base[r["size"]], section, metric) if r["size"] in base else None
+            if old and v is not None:
+                ratio = v / old
+                better = ratio >= 1 if higher else ratio <= 1
+                line += f"   was {old:>10}  x{ratio:.2f} {'+' if better else '-'}"
+            print(line)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["_worker"]:
+        p = argparse.ArgumentParser()
+        p.add_argument("--size", type=int, required=True)
+        p.add_argument("--orgs", required=True)
+        p.add_argument("--autopatch-items", type=int, default=20)
+        return run_worker(p.parse_args(argv[1:]))
+
+    fake_args = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, fake_args = argv[:i], argv[i + 1:]
+    parser = argparse.ArgumentParser(description="SCW benchmark suite (fake GitHub API)")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated fleet sizes")
+    parser.add_argument("--autopatch-items", type=int, default=20,
+                        help="Pending fix items patched per size (each needs a local bare repo)")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    doc = {"sig": SIG, "commit": _commit(), "python": platform.python_version(),
+           "fake_args": fake_args, "autopatch_items": args.autopatch_items, "results": []}
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"[bench] size={size} ...", file=sys.stderr, flush=True)
+        doc["results"].append(_run_size(size, args, fake_args))
+
+    _print_table(doc, baseline)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+SCW startup benchmark: interpreter start + imports for short CLI steps.
+
+Many workflow steps run one quick command (doctor, scan-diff, merge), where
+process startup outweighs the work. Each case runs --runs times in a fresh
+interpreter with -X importtime and reports:
+- wall_ms:       median wall time of the whole process
+- import_ms:     median cumulative import time of the case's top-level imports
+- heavy_imports: which of requests / yaml / sqlite3 / org_health got loaded
+
+  python scripts/bench/startup_bench.py --out reports/bench/startup.json
+  python scripts/bench/startup_bench.py --compare reports/bench/startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SIG = "scwstartup:v1"
+HEAVY = ("requests", "yaml", "sqlite3", "scw.org_health")
+
+# name -> interpreter arguments (run from the repo root, GH_TOKEN unset)
+CASES = {
+    "python_baseline": ["-c", "pass"],
+    "import_cli": ["-c", "import scw.cli"],
+    "import_scw_core": ["-c", "import scw.scw_core"],
+    "import_org_health": ["-c", "import scw.org_health"],
+    "help": ["-m", "scw", "--help"],
+    "doctor": ["-m", "scw", "doctor"],
+}
+
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def _parse_importtime(stderr):
+    """(top-level cumulative import us, set of imported module names) from -X importtime output."""
+    total, mods = 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        mods.add(name.strip())
+        if not name.startswith("  "):  # top level: own name right after the bar and one space
+            total += int(cumulative)
+    return total, mods
+
+
+def run_case(args, runs):
+    env = {k: v for k, v in os.environ.items() if k not in ("GH_TOKEN", "GITHUB_TOKEN")}
+    env.update(SCW_METRICS="0", PYTHONPATH=str(ROOT) + os.pathsep + env.get("PYTHONPATH", ""))
+    walls, imports, mods = [], [], set()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        p = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env,
+                           capture_output=True, text=True)
+        walls.append((time.perf_counter() - t0) * 1000)
+        if p.returncode != 0:
+            return {"error": p.stderr.strip().splitlines()[-1][:200] if p.stderr.strip() else f"rc={p.returncode}"}
+        total, mods = _parse_importtime(p.stderr)
+        imports.append(total / 1000)
+    return {"wall_ms": round(statistics.median(walls), 1), "import_ms": round(statistics.median(imports), 1),
+            "heavy_imports": [m for m in HEAVY if m in mods]}
+
+
+def _print_table(doc, baseline=None):
+    base = (baseline or {}).get("results", {})
+    print(f"commit={doc['commit'] or 'n/a'} python={doc['python']} runs={doc['runs']}"
+          + (f"  (vs {(baseline.get('commit') or 'n/a')[:12]})" if baseline else ""))
+    for name, r in doc["results"].items():
+        if r.get("error"):
+            print(f"  {name:<20} failed: {r['error']}")
+            continue
+        line = f"  {name:<20} wall {r['wall_ms']:>7} ms  imports {r['import_ms']:>7} ms"
+        old = base.get(name) or {}
+        if old.get("wall_ms"):
+            line += f"   was {old['wall_ms']:>7} ms  x{r['wall_ms'] / old['wall_ms']:.2f}"
+        if r["heavy_imports"]:
+            line += f"   loads {', '.join(r['heavy_imports'])}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SCW startup / import-time benchmark")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per case (median reported)")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated subset of: " + ", ".join(CASES))
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    doc = {"sig": SIG, "commit": _commit(), "python": platform.python_version(), "runs": args.runs,
+           "results": {}}
+    for name in [c.strip() for c in args.cases.split(",") if c.strip()]:
+        if name not in CASES:
+            raise SystemExit(f"Unknown case {name}; choose from {', '.join(CASES)}")
+        doc["results"][name] = run_case(CASES[name], args.runs)
+
+    _print_table(doc, baseline)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
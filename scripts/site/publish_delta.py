@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Publish site_public/ to <owner/repo>'s gh-pages branch as one incremental commit.
+
+Instead of clone + rm -rf + rsync + force-push, the local tree is hashed
+(git blob shas) and compared with the current gh-pages tree via the API;
+only changed files are uploaded (Git Data API: blobs, one tree on top of the
+old one, one commit, fast-forward ref update). gh-pages mirrors site_public/
+exactly, so files gone locally are deleted. Nothing changed -> no commit.
+The Git Data API refuses writes to a repo without commits (409), so an empty
+repo first gets a README on its default branch through the Contents API;
+--auto-create creates the repo with one (auto_init).
+
+GitHub Pages is read first and only created / updated when its source
+(gh-pages, /) or custom domain differ.
+
+API calls for an unchanged site: 4 (repo, ref, tree, pages). For k changed
+files: 4 + up to k blobs + tree + commit + ref.
+
+  python scripts/site/publish_delta.py owner/repo [--domain example.org] [--auto-create] [--dry-run]
+
+Token: GH_TOKEN / GITHUB_TOKEN, else `gh auth token`. SCW_API_URL overrides
+the API base (e.g. scripts/bench/fake_github.py).
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[2]
+API = os.getenv("SCW_API_URL", "https://api.github.com").rstrip("/")
+BRANCH = "gh-pages"
+
+
+def git_blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def local_tree(src, domain=None):
+    """path -> (mode, bytes) for every file under src (symlinks as links), plus CNAME for --domain."""
+    files = {}
+    for p in sorted(src.rglob("*")):
+        rel = p.relative_to(src).as_posix()
+        if p.is_symlink():
+            files[rel] = ("120000", os.readlink(p).encode("utf-8"))
+        elif p.is_file():
+            files[rel] = ("100755" if os.access(p, os.X_OK) else "100644", p.read_bytes())
+    if domain:
+        files["CNAME"] = ("100644", (domain + "\n").encode("utf-8"))
+    return files
+
+
+class GitHub:
+    def __init__(self, token):
+        self.s = requests.Session()
+        self.s.headers.update({"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json",
+                               "User-Agent": "StegVerse-SCW-site"})
+        self.calls = 0
+
+    def request(self, method, path, ok=(200, 201), **kw):
+        self.calls += 1
+        r = self.s.request(method, f"{API}{path}", timeout=30, **kw)
+        if r.status_code not in ok:
+            raise SystemExit(f"[x] {method} {path}: {r.status_code} {r.text[:200]}")
+        return r
+
+    def get(self, path, **params):
+        """JSON body, or None on 404 / 409 (missing, or an empty repo)."""
+        r = self.request("GET", path, ok=(200, 404, 409), params=params or None)
+        return r.json() if r.status_code == 200 else None
+
+
+def token_from_env():
+    token = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
+    if token:
+        return token
+    try:
+        return subprocess.check_output(["gh", "auth", "token"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        raise SystemExit("[x] No GH_TOKEN / GITHUB_TOKEN and `gh auth token` failed")
+
+
+def ensure_repo(gh, target, auto_create):
+    if gh.get(f"/repos/{target}") is not None:
+        return
+    if not auto_create:
+        raise SystemExit(f"[x] Cannot access {target}; create it first or pass --auto-create.")
+    owner, name = target.split("/")
+    print(f"[i] Creating {target}")
+    # auto_init: the first commit exists, so the Git Data API accepts writes.
+    r = gh.request("POST", f"/orgs/{owner}/repos", ok=(201, 404), json={"name": name, "auto_init": True})
+    if r.status_code == 404:  # not an org: a user repo
+        gh.request("POST", "/user/repos", json={"name": name, "auto_init": True})
+
+
+def seed_empty(gh, target):
+    """First commit of an empty repo (README on the default branch); only the Contents API writes there."""
+    name = target.split("/")[1]
+    readme = f"# {name}\n\nThe site is published from site_public/ to the {BRANCH} branch.\n"
+    print(f"[i] {target} is empty; creating its first commit")
+    gh.request("PUT", f"/repos/{target}/contents/README.md",
+               json={"message": "chore: initialize repository",
+                     "content": base64.b64encode(readme.encode("utf-8")).decode("ascii")})
+
+
+def remote_tree(gh, target):
+    """(head commit sha or None, tree sha or None, {path: (mode, sha)}) of gh-pages; None for an empty repo."""
+    r = gh.request("GET", f"/repos/{target}/git/ref/heads/{BRANCH}", ok=(200, 404, 409))
+    if r.status_code == 409:  # "Git Repository is empty"
+        return None
+    if r.status_code == 404:
+        return None, None, {}
+    head = r.json()["object"]["sha"]
+    tree = gh.get(f"/repos/{target}/git/trees/{head}", recursive="1")
+    if tree is None:
+        return head, None, {}
+    if tree.get("truncated"):
+        # Listing incomplete: publish a full tree (no base) so nothing stale survives.
+        print("[!] gh-pages tree listing truncated; uploading a full tree")
+        return head, None, {}
+    entries = {e["path"]: (e["mode"], e["sha"]) for e in tree["tree"] if e["type"] == "blob"}
+    return head, tree["sha"], entries
+
+
+def plan(local, remote):
+    """(changed paths, deleted paths): local files whose blob or mode differ, remote files gone locally."""
+    changed = [p for p, (mode, data) in local.items() if remote.get(p) != (mode, git_blob_sha(data))]
+    deleted = sorted(p for p in remote if p not in local)
+    return changed, deleted
+
+
+def publish(gh, target, local, message):
+    state = remote_tree(gh, target)
+    if state is None:
+        seed_empty(gh, target)
+        state = None, None, {}
+    head, base_tree, remote = state
+    changed, deleted = plan(local, remote)
+    if base_tree is None:
+        # New branch or unknown tree: the new tree must list every file.
+        changed, deleted = sorted(local), []
+    if not changed and not deleted:
+        print(f"[i] {BRANCH} already matches site_public/ ({len(local)} files)")
+        return head, 0, 0
+    known = {sha for _, sha in remote.values()}
+    entries = []
+    for path in changed:
+        mode, data = local[path]
+        sha = git_blob_sha(data)
+        if sha not in known:  # moved / duplicated content is already on GitHub
+            gh.request("POST", f"/repos/{target}/git/blobs",
+                       json={"content": base64.b64encode(data).decode("ascii"), "encoding": "base64"})
+            known.add(sha)
+        entries.append({"path": path, "mode": mode, "type": "blob", "sha": sha})
+    for path in deleted:
+        entries.append({"path": path, "mode": remote[path][0], "type": "blob", "sha": None})
+    body = {"tree": entries}
+    if base_tree:
+        body["base_tree"] = base_tree
+    tree = gh.request("POST", f"/repos/{target}/git/trees", json=body).json()["sha"]
+    commit = gh.request("POST", f"/repos/{target}/git/commits",
+                        json={"message": message, "tree": tree, "parents": [head] if head else []}).json()["sha"]
+    if head:
+        # Fast-forward: history is kept, a concurrent publish makes this fail instead of being overwritten.
+        gh.request("PATCH", f"/repos/{target}/git/refs/heads/{BRANCH}", json={"sha": commit, "force": False})
+    else:
+        gh.request("POST", f"/repos/{target}/git/refs", json={"ref": f"refs/heads/{BRANCH}", "sha": commit})
+    print(f"[i] {BRANCH} -> {commit[:12]}: {len(changed)} changed, {len(deleted)} deleted, "
+          f"{len(local) - len(changed)} unchanged")
+    return commit, len(changed), len(deleted)
+
+
+def ensure_pages(gh, target, domain):
+    """Create / update the Pages site only when its source or domain differ; returns the Pages info."""
+    want = {"branch": BRANCH, "path": "/"}
+    info = gh.get(f"/repos/{target}/pages")
+    if info is None:
+        print("[i] Enabling GitHub Pages")
+        info = gh.request("POST", f"/repos/{target}/pages", json={"build_type": "legacy", "source": want}).json()
+    source = info.get("source") or {}
+    differs = {"branch": source.get("branch"), "path": source.get("path")} != want
+    if domain and info.get("cname") != domain:
+        differs = True
+    if not differs:
+        print("[i] Pages configuration unchanged")
+        return info
+    body = {"build_type": "legacy", "source": want}
+    if domain:
+        body["cname"] = domain
+    print("[i] Updating GitHub Pages configuration")
+    gh.request("PUT", f"/repos/{target}/pages", ok=(200, 204), json=body)
+    return dict(info, source=want, cname=domain or info.get("cname"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental gh-pages publish of site_public/")
+    parser.add_argument("target", help="owner/repo")
+    parser.add_argument("--domain", default=None, help="Custom domain (writes CNAME, sets Pages cname)")
+    parser.add_argument("--auto-create", action="store_true", help="Create the repo if it does not exist")
+    parser.add_argument("--src", default=str(ROOT / "site_public"))
+    parser.add_argument("--message", default="chore(site): publish to gh-pages")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change; no writes")
+    args = parser.parse_args(argv)
+
+    src = Path(args.src)
+    if not src.is_dir():
+        raise SystemExit(f"site_public/ not found at {src}")
+    local = local_tree(src, args.domain)
+    gh = GitHub(token_from_env())
+
+    if args.dry_run:
+        if gh.get(f"/repos/{args.target}") is None:
+            raise SystemExit(f"[x] Cannot access {args.target}")
+        _, base_tree, remote = remote_tree(gh, args.target) or (None, None, {})
+        changed, deleted = plan(local, remote) if base_tree else (sorted(local), [])
+        for p in changed:
+            print(f"  {'M' if p in remote else 'A'} {p}")
+        for p in deleted:
+            print(f"  D {p}")
+        print(f"[i] Dry run: {len(changed)} to upload, {len(deleted)} to delete ({gh.calls} API calls)")
+        return 0
+
+    ensure_repo(gh, args.target, args.auto_create)
+    publish(gh, args.target, local, args.message)
+    info = ensure_pages(gh, args.target, args.domain)
+    owner, name = args.target.split("/")
+    url = info.get("html_url") or f"https://{owner}.github.io/{name}/"
+    print(f"[✓] Published site to {args.target} → {url} ({gh.calls} API calls)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
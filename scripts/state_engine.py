@@ -86,6 +86,7 @@ def _cmd_first_aid(summary_path: str) -> None:
     fixed: List[str] = data.get("fixed", []) or []
     added_dispatch: List[str] = data.get("added_dispatch", []) or []
     still_broken: List[Tuple[str, str]] = data.get("still_broken", []) or []
+    ok: List[str] = data.get("ok", []) or []
 
     ctx = _base_context()
     now = _iso_now()
@@ -170,6 +171,29 @@ def _cmd_first_aid(summary_path: str) -> None:
         }
         _write_event(event)
 
+    # 4) Log workflows that were checked and needed no repair, so their
+    #    post_checksum is known to incremental sweeps. Incremental runs only
+    #    list changed files here, which keeps the log from growing per run.
+    for name in ok:
+        wf_rel = Path(".github") / "workflows" / name
+        event = {
+            "ts": now,
+            "namespace": "SCW",
+            "kind": "workflow_first_aid",
+            "event_type": "check",
+            "status": "ok",
+            "resource_type": "workflow",
+            "resource_name": name,
+            "path": str(wf_rel),
+            "post_checksum": _checksum(wf_rel),
+            "labels": [
+                "first_aid",
+                "ok",
+            ],
+            "meta": ctx,
+        }
+        _write_event(event)
+
 
 def main(argv: Optional[list] = None) -> int:
     parser = argparse.ArgumentParser(
@@ -97,6 +97,8 @@ def _summarize_status(ev: Dict[str, Any]) -> str:
         return "✅ fixed"
     if status == "dispatch_added_only":
         return "⚪ dispatch-only"
+    if status == "ok":
+        return "🟢 ok"
     if status == "still_broken":
         if err_type:
             return f"❌ still_broken · `{err_type}`"
@@ -112,6 +114,8 @@ def _status_bucket(ev: Dict[str, Any]) -> str:
         return "broken"
     if status == "dispatch_added_only":
         return "dispatch_only"
+    if status == "ok":
+        return "ok"
     return "other"
 
 
@@ -119,11 +123,13 @@ def _render_markdown(
     latest: Dict[str, Dict[str, Any]]
 ) -> str:
     # Aggregate stats
-    fixed = broken = dispatch_only = other = 0
+    fixed = broken = dispatch_only = ok = other = 0
     for ev in latest.values():
         bucket = _status_bucket(ev)
         if bucket == "fixed":
             fixed += 1
+        elif bucket == "ok":
+            ok += 1
         elif bucket == "broken":
             broken += 1
         elif bucket == "dispatch_only":
@@ -142,6 +148,7 @@ def _render_markdown(
     lines.append(f"- ✅ Fixed workflows: **{fixed}**")
     lines.append(f"- ❌ Still broken: **{broken}**")
     lines.append(f"- ⚪ Dispatch-only entries: **{dispatch_only}**")
+    lines.append(f"- 🟢 Checked OK: **{ok}**")
     lines.append(f"- ℹ️ Other states: **{other}**")
     lines.append(f"- Total tracked workflows: **{total}**")
     lines.append("")
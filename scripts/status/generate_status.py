@@ -1,29 +1,216 @@
-
 #!/usr/bin/env python3
-import os, json, datetime, subprocess
+"""
+Status site generator.
+
+Availability and p50/p95/p99 latency per uptime target over 1h/24h/7d/30d,
+plus the latest org-scan and workflow state summaries.
+
+Rollups (reports/uptime/rollups.json) keep one bucket per target per hour
+(sample count, ok count, log-spaced latency histogram) and the time of the
+last folded sample; each run folds in only samples newer than that from the
+ring store, and drops buckets older than the longest window. The 1h window
+is read straight from the ring (at most an hour of samples). Summaries of
+other reports and the git tag are cached by file stamp / HEAD sha, so a run
+costs the same however much history exists.
+
+site_public/status.html and status.json are rewritten only when their
+content (everything but the timestamp) changes.
+"""
+import os, sys, json, gzip, math, hashlib, datetime, subprocess, time, html as _html
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import uptime_store
+
 root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 repo_root = os.path.dirname(root)
 reports = os.path.join(repo_root, "reports")
 status_dir = os.path.join(repo_root, "site_public")
-def read_state():
-  p=os.path.join(reports,"DEPLOY_STATE.json")
+ROLLUPS = os.path.join(reports, "uptime", "rollups.json")
+ORG_SCAN = os.path.join(reports, "org_scan.json")
+ORG_SCAN_STREAM = os.path.join(reports, "org_scan.jsonl.gz")
+LATEST_INDEX = os.path.join(repo_root, ".steg", "state", "latest_per_workflow.json")
+SIG = "uptimerollup:v1"
+WINDOWS = [("1h", 3600), ("24h", 86400), ("7d", 7*86400), ("30d", 30*86400)]
+HOUR = 3600
+# Latency histogram: bucket i covers (B0*G**(i-1), B0*G**i] ms, ~12% wide.
+B0, G, NBUCKETS = 1.0, 1.12, 100
+
+def _read_json(p):
   try: return json.load(open(p,"r",encoding="utf-8"))
-  except: return {}
-def latest_tag():
+  except Exception: return None
+
+def _stamp(p):
+  try: st=os.stat(p); return [st.st_mtime_ns, st.st_size]
+  except OSError: return None
+
+def read_state():
+  return _read_json(os.path.join(reports,"DEPLOY_STATE.json")) or {}
+
+def _head_sha():
+  """HEAD commit sha read from .git directly (no subprocess)."""
+  git=os.path.join(repo_root, ".git")
+  try:
+    head=open(os.path.join(git,"HEAD"),"r").read().strip()
+    if not head.startswith("ref: "): return head
+    ref=head[5:]
+    p=os.path.join(git, ref)
+    if os.path.exists(p): return open(p,"r").read().strip()
+    for line in open(os.path.join(git,"packed-refs"),"r"):
+      parts=line.split()
+      if len(parts)==2 and parts[1]==ref: return parts[0]
+  except OSError:
+    pass
+  return None
+
+def latest_tag(cache):
+  sha=_head_sha(); hit=cache.get("describe") or {}
+  if sha and hit.get("head")==sha: return hit.get("tag")
+  try:
+    out = subprocess.check_output(["git","describe","--tags","--abbrev=0"], text=True, cwd=repo_root, stderr=subprocess.DEVNULL).strip()
+  except Exception:
+    out = None
+  cache["describe"]={"head": sha, "tag": out}
+  return out
+
+def _read_stream(p):
+  """Streaming org-scan (scw/report.py) as the legacy document shape the summary needs."""
   try:
-    out = subprocess.check_output(["git","describe","--tags","--abbrev=0"], text=True).strip()
-    return out
+    scan={"repos": [], "fix_queue": {"items": []}}
+    with gzip.open(p,"rt",encoding="utf-8") as f:
+      for line in f:
+        rec=json.loads(line); t=rec.get("type")
+        if t=="header": scan["generated_utc"]=rec.get("generated_utc")
+        elif t=="repo": scan["repos"].append(None)
+        elif t=="fix": scan["fix_queue"]["items"].append({"status": rec.get("status")})
+    return scan
   except Exception:
     return None
+
+def _cached_summary(cache, key, path, fn, reader=_read_json):
+  """fn(parsed file) summary, recomputed only when the file's stamp changes."""
+  stamp=_stamp(path); hit=cache.get(key) or {}
+  if stamp is None: cache.pop(key, None); return None
+  if hit.get("stamp")==stamp: return hit.get("summary")
+  data=reader(path)
+  summary=fn(data) if data is not None else None
+  cache[key]={"stamp": stamp, "summary": summary}
+  return summary
+
+def summarize_org_scan(scan):
+  items=(scan.get("fix_queue") or {}).get("items") or []
+  by_status={}
+  for it in items: by_status[it.get("status") or "unknown"]=by_status.get(it.get("status") or "unknown",0)+1
+  return {"generated_utc": scan.get("generated_utc"), "repos": len(scan.get("repos") or []),
+          "fix_items": len(items), "by_status": by_status}
+
+def summarize_workflows(index):
+  by_status={}
+  for ev in index.values(): by_status[ev.get("status") or "unknown"]=by_status.get(ev.get("status") or "unknown",0)+1
+  return {"workflows": len(index), "by_status": by_status}
+
+def _bucket(ms):
+  if ms<=B0: return 0
+  return min(NBUCKETS-1, int(math.ceil(math.log(ms/B0, G))))
+
+def _percentile(hist, q):
+  total=sum(hist.values())
+  if not total: return None
+  rank=q*total; seen=0
+  for i in sorted(hist, key=int):
+    seen+=hist[i]
+    if seen>=rank: return round(B0*G**int(i), 1)
+  return None
+
+def _fold(acc, s):
+  acc["n"]+=1
+  if s["ok"]:
+    acc["ok"]+=1
+    if s["total_ms"] is not None:
+      b=str(_bucket(s["total_ms"])); acc["h"][b]=acc["h"].get(b,0)+1
+
+def _new_acc(): return {"n": 0, "ok": 0, "h": {}}
+
+def update_rollups(cache, store, now):
+  """Fold samples newer than each target's last_t into hourly buckets."""
+  targets=cache.setdefault("targets", {})
+  horizon=(int(now)//HOUR)*HOUR-WINDOWS[-1][1]
+  for name in store.names():
+    ring=store.ring(name)
+    t=targets.setdefault(name, {"last_t": None, "hours": {}})
+    folded=0
+    for s in ring.read(t["last_t"], None):
+      if t["last_t"] is not None and s["t"]<=t["last_t"]: continue
+      hour=str(int(s["t"])//HOUR*HOUR)
+      _fold(t["hours"].setdefault(hour, _new_acc()), s)
+      t["last_t"]=s["t"]; folded+=1
+    for h in [h for h in t["hours"] if int(h)<horizon]: del t["hours"][h]
+    if folded: print(f"Folded {folded} new samples for {name}")
+  live=set(store.names())
+  for name in [n for n in targets if n not in live]: del targets[name]
+
+def _window_stats(acc):
+  return {"samples": acc["n"],
+          "availability": round(100.0*acc["ok"]/acc["n"], 3) if acc["n"] else None,
+          "p50_ms": _percentile(acc["h"],0.50), "p95_ms": _percentile(acc["h"],0.95),
+          "p99_ms": _percentile(acc["h"],0.99)}
+
+def slo_stats(cache, store, now):
+  out={}
+  for name, t in sorted(cache.get("targets", {}).items()):
+    stats={}
+    acc=_new_acc()
+    for s in store.ring(name).read(now-WINDOWS[0][1], None): _fold(acc, s)
+    stats[WINDOWS[0][0]]=_window_stats(acc)
+    for label, secs in WINDOWS[1:]:
+      acc=_new_acc(); start=now-secs
+      for h, b in t["hours"].items():
+        if int(h)+HOUR<=start: continue
+        acc["n"]+=b["n"]; acc["ok"]+=b["ok"]
+        for k, v in b["h"].items(): acc["h"][int(k)]=acc["h"].get(int(k),0)+v
+      stats[label]=_window_stats(acc)
+    out[name]=stats
+  return out
+
+def _fmt(v, suffix=""): return "–" if v is None else f"{v}{suffix}"
+
+def render_html(doc, now):
+  rows=[]
+  for name, stats in doc["slo"].items():
+    cells="".join(f"<td>{_fmt(stats[w]['availability'],'%')}<br><small>p50 {_fmt(stats[w]['p50_ms'],' ms')} · p95 {_fmt(stats[w]['p95_ms'],' ms')} · p99 {_fmt(stats[w]['p99_ms'],' ms')}</small></td>" for w,_ in WINDOWS)
+    rows.append(f"<tr><th>{_html.escape(name)}</th>{cells}</tr>")
+  head="".join(f"<th>{w}</th>" for w,_ in WINDOWS)
+  slo=f"<table border='1' cellpadding='4'><tr><th>Target</th>{head}</tr>{''.join(rows)}</table>" if rows else "<p>No uptime samples yet.</p>"
+  extra=""
+  if doc.get("org_scan"): extra+=f"<h2>Org scan</h2><pre>{_html.escape(json.dumps(doc['org_scan'], indent=2))}</pre>"
+  if doc.get("workflows"): extra+=f"<h2>Workflows</h2><pre>{_html.escape(json.dumps(doc['workflows'], indent=2))}</pre>"
+  return f"<!doctype html><html><head><meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'><title>StegVerse Status</title></head><body><h1>StegVerse Status</h1><p>Generated: {now}</p><p>Version: {_html.escape(doc['version'])}</p><h2>Availability &amp; latency</h2>{slo}{extra}<h2>Deploy</h2><pre>{_html.escape(json.dumps(doc['deploy'], indent=2))}</pre></body></html>"
+
 def main():
-  state=read_state()
-  ver = latest_tag() or "n/a"
+  now_t=time.time()
+  cache=_read_json(ROLLUPS) or {}
+  if cache.get("sig")!=SIG: cache={"sig": SIG}
+  store=uptime_store.Store(os.path.join(reports,"uptime"), writer=False)
+  try:
+    update_rollups(cache, store, now_t)
+    doc={"version": latest_tag(cache) or "n/a", "deploy": read_state(),
+         "slo": slo_stats(cache, store, now_t),
+         "org_scan": (_cached_summary(cache, "org_scan", ORG_SCAN_STREAM, summarize_org_scan, _read_stream)
+                      if os.path.exists(ORG_SCAN_STREAM) else
+                      _cached_summary(cache, "org_scan", ORG_SCAN, summarize_org_scan)),
+         "workflows": _cached_summary(cache, "workflows", LATEST_INDEX, summarize_workflows)}
+  finally:
+    store.close()
+  os.makedirs(os.path.dirname(ROLLUPS), exist_ok=True)
+  json.dump(cache, open(ROLLUPS,"w",encoding="utf-8"), separators=(",",":"))
+
+  digest=hashlib.sha256(json.dumps(doc, sort_keys=True).encode("utf-8")).hexdigest()
+  json_path=os.path.join(status_dir,"status.json")
+  prev=_read_json(json_path) or {}
+  if prev.get("digest")==digest and os.path.exists(os.path.join(status_dir,"status.html")):
+    print("Status unchanged."); return
   now = datetime.datetime.utcnow().isoformat()+"Z"
-  html = f"<!doctype html><html><head><meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'><title>StegVerse Status</title></head><body><h1>StegVerse Status</h1><p>Generated: {now}</p><p>Version: {ver}</p><pre>{json.dumps(state, indent=2)}</pre></body></html>"
   os.makedirs(status_dir, exist_ok=True)
-  open(os.path.join(status_dir,"status.html"),"w",encoding="utf-8").write(html)
-  os.makedirs(reports, exist_ok=True)
-  json.dump({"generated": now, "version": ver, "deploy": state}, open(os.path.join(status_dir,"status.json"),"w",encoding="utf-8"))
+  open(os.path.join(status_dir,"status.html"),"w",encoding="utf-8").write(render_html(doc, now))
+  json.dump(dict(doc, generated=now, digest=digest), open(json_path,"w",encoding="utf-8"))
   print("Status site generated.")
 if __name__ == "__main__":
   main()
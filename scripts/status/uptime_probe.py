@@ -1,27 +1,154 @@
-
 #!/usr/bin/env python3
-import os, json, datetime, requests
-STATE="reports/DEPLOY_STATE.json"; UPTIME="reports/uptime.json"
-def get_target():
-  if os.path.exists(STATE):
+"""
+Uptime prober: probes every target concurrently and records latency.
+
+Targets (merged, de-duplicated by URL):
+- reports/DEPLOY_STATE.json: "url", plus optional "urls" / "targets"
+- env UPTIME_URL, UPTIME_URLS (comma separated)
+- UPTIME_TARGETS_FILE (default reports/uptime_targets.json):
+    [{"name": "site", "url": "https://...", "timeout": 10, "retries": 1}, ...]
+
+Per target: DNS, connect (TCP+TLS), TTFB and total latency in ms, with a
+per-target timeout and retry policy. Connections are pooled per
+scheme/host/port, so targets sharing a host (and retries) reuse them.
+
+Samples are appended to the per-target ring files of uptime_store
+(reports/uptime/), and reports/uptime_latest.json holds only this run.
+"""
+import os, json, time, socket, ssl, datetime, threading, http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin
+import uptime_store
+
+STATE="reports/DEPLOY_STATE.json"; LATEST="reports/uptime_latest.json"
+TARGETS_FILE=os.getenv("UPTIME_TARGETS_FILE","reports/uptime_targets.json")
+DEFAULT_TIMEOUT=float(os.getenv("UPTIME_TIMEOUT","10"))
+DEFAULT_RETRIES=int(os.getenv("UPTIME_RETRIES","1"))
+MAX_WORKERS=32; MAX_REDIRECTS=5; UA="StegVerse-Uptime/2"
+
+def _now(): return datetime.datetime.utcnow().isoformat()+"Z"
+
+def _ms(a, b): return round((b-a)*1000, 2)
+
+def _read_json(p):
+  try: return json.load(open(p,"r",encoding="utf-8"))
+  except Exception: return None
+
+def get_targets():
+  out=[]
+  st=_read_json(STATE) or {}
+  if isinstance(st, dict):
+    if st.get("url"): out.append({"url": st["url"]})
+    out += [{"url": u} for u in st.get("urls") or [] if u]
+    out += [t for t in st.get("targets") or [] if isinstance(t, dict) and t.get("url")]
+  if os.getenv("UPTIME_URL"): out.append({"url": os.getenv("UPTIME_URL")})
+  out += [{"url": u.strip()} for u in os.getenv("UPTIME_URLS","").split(",") if u.strip()]
+  cfg=_read_json(TARGETS_FILE)
+  if isinstance(cfg, list): out += [t for t in cfg if isinstance(t, dict) and t.get("url")]
+  seen=set(); targets=[]
+  for t in out:
+    if t["url"] in seen: continue
+    seen.add(t["url"])
+    u=urlparse(t["url"])
+    targets.append({"name": t.get("name") or (u.netloc+u.path).rstrip("/") or t["url"], "url": t["url"],
+                    "timeout": float(t.get("timeout", DEFAULT_TIMEOUT)),
+                    "retries": int(t.get("retries", DEFAULT_RETRIES))})
+  return targets
+
+class _Conn(http.client.HTTPConnection):
+  """HTTP(S) connection to a pre-resolved address, so DNS and connect are timed apart."""
+  def __init__(self, host, port, timeout, addr, tls):
+    super().__init__(host, port, timeout=timeout)
+    self._addr=addr; self._tls=tls
+  def connect(self):
+    sock=socket.create_connection(self._addr[:2], self.timeout)
+    if self._tls:
+      sock=ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+    self.sock=sock
+
+class ConnPool:
+  def __init__(self):
+    self._idle={}; self._lock=threading.Lock()
+  def get(self, key):
+    with self._lock:
+      idle=self._idle.get(key)
+      return idle.pop() if idle else None
+  def put(self, key, conn):
+    with self._lock: self._idle.setdefault(key, []).append(conn)
+  def close(self):
+    with self._lock:
+      for conns in self._idle.values():
+        for c in conns: c.close()
+      self._idle.clear()
+
+def _fetch(pool, url, timeout, timing):
+  u=urlparse(url); tls=u.scheme=="https"
+  port=u.port or (443 if tls else 80); key=(u.scheme, u.hostname, port)
+  conn=pool.get(key)
+  if conn is None:
+    t0=time.perf_counter()
+    addr=socket.getaddrinfo(u.hostname, port, type=socket.SOCK_STREAM)[0][4]
+    t1=time.perf_counter()
+    conn=_Conn(u.hostname, port, timeout, addr, tls); conn.connect()
+    t2=time.perf_counter()
+    timing["dns_ms"]+=_ms(t0,t1); timing["connect_ms"]+=_ms(t1,t2)
+  else:
+    conn.timeout=timeout
+    if conn.sock is not None: conn.sock.settimeout(timeout)
+  path=(u.path or "/")+("?"+u.query if u.query else "")
+  t3=time.perf_counter()
+  try:
+    conn.request("GET", path, headers={"User-Agent": UA, "Connection": "keep-alive"})
+    resp=conn.getresponse()
+    timing["ttfb_ms"]+=_ms(t3, time.perf_counter())
+    resp.read()
+  except Exception:
+    conn.close(); raise
+  if resp.will_close: conn.close()
+  else: pool.put(key, conn)
+  return resp
+
+def probe(pool, target):
+  rec={"t": _now(), "target": target["name"], "url": target["url"], "ok": False, "attempts": 0}
+  err=None
+  for attempt in range(target["retries"]+1):
+    if attempt: time.sleep(min(0.5*2**(attempt-1), 4))
+    rec["attempts"]=attempt+1
+    timing={"dns_ms": 0.0, "connect_ms": 0.0, "ttfb_ms": 0.0}
+    t0=time.perf_counter(); url=target["url"]
     try:
-      st=json.load(open(STATE,"r",encoding="utf-8")); return st.get("url")
-    except: return None
-def probe(url, timeout=10):
+      for _ in range(MAX_REDIRECTS+1):
+        resp=_fetch(pool, url, target["timeout"], timing)
+        loc=resp.getheader("Location")
+        if resp.status in (301,302,303,307,308) and loc: url=urljoin(url, loc); continue
+        break
+      rec.update(timing, total_ms=_ms(t0, time.perf_counter()), code=resp.status, ok=200<=resp.status<400)
+      rec.pop("err", None)
+      if resp.status<500: return rec
+    except Exception as e:
+      err=f"{type(e).__name__}: {e}"
+      rec.update(timing, total_ms=_ms(t0, time.perf_counter()), err=err)
+      rec.pop("code", None)
+  return rec
+
+def probe_all(targets):
+  pool=ConnPool()
   try:
-    import requests
-    r=requests.get(url, timeout=timeout); ok=r.ok
-    return {"t": datetime.datetime.utcnow().isoformat()+"Z", "ok": ok, "code": r.status_code}
-  except Exception as e:
-    return {"t": datetime.datetime.utcnow().isoformat()+"Z", "ok": False, "err": str(e)}
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(targets)))) as ex:
+      return list(ex.map(lambda t: probe(pool, t), targets))
+  finally:
+    pool.close()
+
 def main():
-  url=os.getenv("UPTIME_URL") or get_target()
-  if not url: print("No target URL"); return
-  rec=probe(url); data=[]
-  if os.path.exists(UPTIME):
-    try: data=json.load(open(UPTIME,"r",encoding="utf-8"))
-    except: data=[]
-  data.append(rec); data=data[-500:]
-  json.dump(data, open(UPTIME,"w",encoding="utf-8"), indent=2)
-  print("Probed", url, rec)
+  targets=get_targets()
+  if not targets: print("No target URL"); return
+  recs=probe_all(targets)
+  store=uptime_store.Store()
+  try:
+    for r in recs: store.append(r)
+  finally:
+    store.close()
+  os.makedirs(os.path.dirname(LATEST), exist_ok=True)
+  json.dump(recs, open(LATEST,"w",encoding="utf-8"), indent=2)
+  for r in recs: print("Probed", r["url"], r)
 if __name__=="__main__": main()
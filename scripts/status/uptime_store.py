@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Append-only uptime sample store: one memory-mapped ring file per target.
+
+File layout (little endian):
+  header  64 bytes  magic "SVUPRING", version, record size, capacity,
+                    head (next slot), count, interval_s, retention_s
+  records 32 bytes  t (epoch seconds, f64), ok (u8), attempts (u8), code (u16),
+                    dns_ms, connect_ms, ttfb_ms, total_ms (f32, NaN = not measured)
+
+Appends write one record and the header in place: O(1) regardless of history.
+Capacity is retention / probe interval, so the oldest samples are overwritten
+once the ring is full. Reads by time window binary-search the ring
+(records are appended in time order), so a window costs O(log n + k).
+
+Config: UPTIME_STORE_DIR (reports/uptime), UPTIME_RETENTION_DAYS (30),
+UPTIME_INTERVAL_SECONDS (60).
+
+Usage:
+  python scripts/status/uptime_store.py read [--target NAME] [--hours 24]
+"""
+import os, re, sys, json, math, mmap, struct, hashlib, argparse, time, calendar, datetime
+
+STORE_DIR=os.getenv("UPTIME_STORE_DIR","reports/uptime")
+RETENTION_DAYS=float(os.getenv("UPTIME_RETENTION_DAYS","30"))
+INTERVAL_S=int(os.getenv("UPTIME_INTERVAL_SECONDS","60"))
+
+MAGIC=b"SVUPRING"; VERSION=1
+HDR=struct.Struct("<8sHHIIIII28x")   # 64 bytes
+REC=struct.Struct("<dBBHffff4x")     # 32 bytes
+FIELDS=("t","ok","attempts","code","dns_ms","connect_ms","ttfb_ms","total_ms")
+NAN=float("nan")
+
+def capacity_for(retention_days, interval_s):
+  return max(1, math.ceil(retention_days*86400/max(1, interval_s)))
+
+def parse_ts(ts):
+  """ISO-8601 '...Z' (as written by the prober) -> epoch seconds."""
+  dt=datetime.datetime.fromisoformat(ts.rstrip("Z"))
+  return calendar.timegm(dt.timetuple())+dt.microsecond/1e6
+
+def _f(v): return NAN if v is None else float(v)
+
+class Ring:
+  """One target's ring file."""
+  def __init__(self, path, retention_days=RETENTION_DAYS, interval_s=INTERVAL_S, resize=True):
+    self.path=path
+    cap=capacity_for(retention_days, interval_s)
+    retention_s=int(retention_days*86400)
+    if not os.path.exists(path):
+      self._create(path, cap, interval_s, retention_s)
+    self._open()
+    if resize and self.capacity!=cap:
+      self._resize(cap, interval_s, retention_s)
+
+  @staticmethod
+  def _create(path, cap, interval_s, retention_s):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path,"wb") as f:
+      f.write(HDR.pack(MAGIC, VERSION, REC.size, cap, 0, 0, interval_s, retention_s))
+      f.truncate(HDR.size+cap*REC.size)
+
+  def _open(self):
+    self._f=open(self.path,"r+b")
+    self._mm=mmap.mmap(self._f.fileno(), 0)
+    magic, ver, rs, cap, head, count, interval_s, retention_s=HDR.unpack_from(self._mm, 0)
+    if magic!=MAGIC or ver!=VERSION or rs!=REC.size:
+      raise ValueError(f"{self.path}: not an uptime ring file")
+    self.capacity, self.head, self.count=cap, head, count
+    self.interval_s, self.retention_s=interval_s, retention_s
+
+  def _resize(self, cap, interval_s, retention_s):
+    # Retention/interval changed: rewrite once, keeping the newest samples.
+    keep=[self._get(i) for i in range(max(0, self.count-cap), self.count)]
+    self.close()
+    tmp=self.path+".tmp"
+    self._create(tmp, cap, interval_s, retention_s)
+    os.replace(tmp, self.path)
+    self._open()
+    for r in keep: self._put(r)
+    self._write_header()
+
+  def _write_header(self):
+    HDR.pack_into(self._mm, 0, MAGIC, VERSION, REC.size, self.capacity, self.head, self.count,
+                  self.interval_s, self.retention_s)
+
+  def _slot(self, i):
+    return (self.head-self.count+i)%self.capacity
+
+  def _get(self, i):
+    return REC.unpack_from(self._mm, HDR.size+self._slot(i)*REC.size)
+
+  def _put(self, values):
+    REC.pack_into(self._mm, HDR.size+self.head*REC.size, *values)
+    self.head=(self.head+1)%self.capacity
+    self.count=min(self.count+1, self.capacity)
+
+  def append(self, rec):
+    """Append one prober record (dict with t/ok/code/attempts/*_ms)."""
+    t=rec["t"] if isinstance(rec["t"], (int, float)) else parse_ts(rec["t"])
+    self._put((float(t), 1 if rec.get("ok") else 0, int(rec.get("attempts", 1)) & 0xFF,
+               int(rec.get("code") or 0), _f(rec.get("dns_ms")), _f(rec.get("connect_ms")),
+               _f(rec.get("ttfb_ms")), _f(rec.get("total_ms"))))
+    self._write_header()
+
+  def _lower_bound(self, t):
+    lo, hi=0, self.count
+    while lo<hi:
+      mid=(lo+hi)//2
+      if self._get(mid)[0]<t: lo=mid+1
+      else: hi=mid
+    return lo
+
+  def read(self, start=None, end=None):
+    """Samples with start <= t < end (epoch seconds), oldest first, as dicts."""
+    i=self._lower_bound(start) if start is not None else 0
+    j=self._lower_bound(end) if end is not None else self.count
+    out=[]
+    for k in range(i, j):
+      vals=self._get(k)
+      d=dict(zip(FIELDS, vals)); d["ok"]=bool(d["ok"])
+      for f in ("dns_ms","connect_ms","ttfb_ms","total_ms"):
+        if math.isnan(d[f]): d[f]=None
+      out.append(d)
+    return out
+
+  def last_t(self):
+    return self._get(self.count-1)[0] if self.count else None
+
+  def close(self):
+    self._mm.flush(); self._mm.close(); self._f.close()
+
+def slug(name):
+  base=re.sub(r"[^A-Za-z0-9._-]+","_", name).strip("_")[:60] or "target"
+  return f"{base}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+class Store:
+  """Directory of ring files plus targets.json (slug -> name/url).
+
+  Only the writer (writer=True) resizes rings to the configured retention;
+  readers use each ring as found.
+  """
+  def __init__(self, root=STORE_DIR, retention_days=RETENTION_DAYS, interval_s=INTERVAL_S, writer=True):
+    self.root=root; self.retention_days=retention_days; self.interval_s=interval_s; self.writer=writer
+    self._rings={}
+    self._index_path=os.path.join(root,"targets.json")
+    try: self.targets=json.load(open(self._index_path,"r",encoding="utf-8"))
+    except Exception: self.targets={}
+
+  def ring(self, name, url=None):
+    s=slug(name)
+    if s not in self._rings:
+      self._rings[s]=Ring(os.path.join(self.root, s+".ring"), self.retention_days, self.interval_s, self.writer)
+    if self.targets.get(s, {}).get("url")!=url and url is not None:
+      self.targets[s]={"name": name, "url": url}
+      os.makedirs(self.root, exist_ok=True)
+      json.dump(self.targets, open(self._index_path,"w",encoding="utf-8"), indent=2)
+    return self._rings[s]
+
+  def append(self, rec):
+    self.ring(rec["target"], rec.get("url")).append(rec)
+
+  def names(self):
+    return sorted(v["name"] for v in self.targets.values())
+
+  def close(self):
+    for r in self._rings.values(): r.close()
+    self._rings.clear()
+
+def main(argv=None):
+  ap=argparse.ArgumentParser(description="Uptime sample store")
+  sub=ap.add_subparsers(dest="cmd", required=True)
+  rd=sub.add_parser("read", help="Print samples in a time window as JSON lines")
+  rd.add_argument("--target", default=None, help="Target name (default: all)")
+  rd.add_argument("--hours", type=float, default=24)
+  args=ap.parse_args(argv)
+  store=Store(writer=False); now=time.time()
+  for name in ([args.target] if args.target else store.names()):
+    for s in store.ring(name).read(now-args.hours*3600, None):
+      s["target"]=name; print(json.dumps(s))
+  store.close()
+  return 0
+
+if __name__=="__main__": sys.exit(main())
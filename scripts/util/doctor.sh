@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
 set -euo pipefail
 echo "[doctor] SCW quick health check"
-python scw/scw_core.py self-test --org "${ORG_GITHUB:-StegVerse-Labs}" --target-repo "${TARGET_REPO:-StegVerse-Labs/SCW}"
+python -m scw doctor
 echo "[doctor] done"
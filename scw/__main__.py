@@ -0,0 +1,7 @@
+"""`python -m scw <command>`: see cli.py."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
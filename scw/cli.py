@@ -0,0 +1,357 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/cli.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW CLI (v1)
+
+Subcommand registry behind `python -m scw` and `python -m scw.scw_core`.
+Each command is registered with @command and imports what it needs
+(requests, yaml, org_health, ...) only when it runs, so short checks like
+`doctor` start in a few milliseconds.
+
+  python -m scw <command> [flags]
+  python -m scw.scw_core [flags]          # command from SCW_CMD (default org-scan)
+
+Every flag falls back to an env var (shown in --help), so workflows can keep
+configuring steps through `env:`. GH_TOKEN is only demanded by commands that
+talk to GitHub. Startup cost: scripts/bench/startup_bench.py.
+"""
+
+from __future__ import annotations
+
+import os, sys, pathlib, argparse
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+def log(msg): print(f"[SCW_CORE] {msg}", flush=True)
+
+# NamedTuple rather than a dataclass: dataclasses pulls in inspect, a visible share of startup.
+class Command(NamedTuple):
+    name: str
+    run: Callable
+    help: str
+    needs_token: bool
+    args: List[Tuple[tuple, dict]]
+
+COMMANDS: Dict[str, Command] = {}
+
+def command(name:str, help:str, needs_token:bool=True, args:Optional[List[Tuple[tuple, dict]]]=None):
+    """Register fn(ctx, args) as subcommand `name`; args are (flags, add_argument kwargs) pairs."""
+    def deco(fn):
+        COMMANDS[name] = Command(name, fn, help, needs_token, list(args or []))
+        return fn
+    return deco
+
+def arg(*flags, env:Optional[str]=None, **kw)->Tuple[tuple, dict]:
+    """add_argument spec whose default comes from `env` (kw default otherwise)."""
+    if env:
+        val = os.getenv(env)
+        if val is not None and val.strip() != "":
+            kw["default"] = val
+        kw["help"] = (kw.get("help", "") + f" (env {env})").strip()
+    return flags, kw
+
+def _csv(val)->List[str]:
+    if isinstance(val, list):
+        return val
+    return [v.strip() for v in (val or "").split(",") if v.strip()]
+
+def _true(val)->bool:
+    return str(val).strip().lower() in ("1", "true", "yes")
+
+class Context:
+    """What every command may need; policy is parsed on first use (yaml import included)."""
+
+    def __init__(self, root:pathlib.Path, token:Optional[str]):
+        self.root, self.token = root, token
+        self._policy = None
+
+    @property
+    def policy(self)->dict:
+        if self._policy is None:
+            # Same file as org_health.load_policy, without importing requests for doctor.
+            import yaml
+            self._policy = yaml.safe_load((self.root/"scw"/"policy.yml").read_text())
+        return self._policy
+
+ORGS = arg("--orgs", env="SCW_ORGS", default="StegVerse,StegVerse-Labs", help="Comma separated orgs")
+
+# --- commands ----------------------------------------------------------------
+
+@command("org-scan", "produce reports/org_scan.jsonl.gz (streaming) + fix queue", args=[
+    ORGS,
+    arg("--shard", env="SCW_SHARD", help="Scan only this shard, i/N with 0 <= i < N"),
+])
+def cmd_org_scan(ctx:Context, args):
+    from .org_health import write_org_scan, parse_shard
+    write_org_scan(ctx.root, ctx.token, _csv(args.orgs), ctx.policy, parse_shard(args.shard))
+    log("org-scan complete")
+
+@command("merge", "combine sharded org-scans into the report", needs_token=False, args=[
+    arg("--shard-dir", env="SCW_SHARD_DIR", help="Where the shard reports are (default reports/)"),
+])
+def cmd_merge(ctx:Context, args):
+    from . import report as scan_report, snapshot
+    shard_dir = pathlib.Path(args.shard_dir or ctx.root/"reports")
+    out_path = scan_report.report_path(ctx.root)
+    fmt = scan_report.report_format()
+    # Merge beside the report first, so a failed merge keeps the current one.
+    merged = out_path.with_name("org_scan.merged" + "".join(out_path.suffixes))
+    scan_report.merge_shards(sorted(shard_dir.rglob(scan_report.SHARD_GLOB)), merged, fmt)
+    if fmt == "jsonl":
+        scan_report.rotate(out_path)
+    os.replace(merged, out_path)
+    snap_path = snapshot.snapshot_path(ctx.root)
+    shard_snaps = sorted(shard_dir.rglob(snapshot.SHARD_GLOB))
+    if snap_path and shard_snaps:
+        # All shards present (merge_shards checked), so their union is the whole fleet.
+        fresh = snap_path.with_name(snap_path.name + ".merged")
+        fresh.unlink(missing_ok=True)
+        with snapshot.Snapshot(fresh) as snap:
+            n = snap.merge_from(shard_snaps)
+        os.replace(fresh, snap_path)
+        log(f"Snapshot {snap_path}: {n} repos from {len(shard_snaps)} shards")
+    log("merge complete")
+
+@command("autopatch", "apply pending structure fixes repo-by-repo", args=[
+    arg("--plan", env="SCW_PLAN", help="Only the items this plan selected (reports/scw_plan.json from `plan`)"),
+    arg("--dry-run", env="DRY_RUN", default="false",
+        help="true: write the plan of every intended change instead (no clone, push or PR)"),
+])
+def cmd_autopatch(ctx:Context, args):
+    import json
+    from . import report as scan_report
+    from .scw_core import autopatch
+    if _true(args.dry_run):
+        from . import planner
+        planner.write_plan(ctx.root, planner.make_plan(ctx.root, ctx.token, ctx.policy, ["autopatch"]))
+        log("autopatch dry run complete")
+        return
+    only = None
+    if args.plan:
+        from .planner import load_selection
+        only = load_selection(pathlib.Path(args.plan))
+        log(f"autopatch limited to {len(only)} planned items ({args.plan})")
+    report_path = scan_report.report_path(ctx.root)
+    if not report_path.exists():
+        raise SystemExit(f"No reports/{report_path.name}; run org-scan first.")
+    if scan_report.report_format() == "jsonl":
+        # Only the fix items are loaded; repo records are streamed through on rewrite.
+        queue = {"items": list(scan_report.iter_fix_items(report_path))}
+        autopatch(queue, ctx.policy, only)
+        scan_report.rewrite_fix_items(report_path, queue["items"])
+    else:
+        report = json.loads(report_path.read_text())
+        autopatch(report.get("fix_queue",{}), ctx.policy, only)
+        report_path.write_text(json.dumps(report, indent=2))
+    log("autopatch complete")
+
+@command("plan", "API calls, clones, pushes and time per phase vs the rate limit; dry-run autopatch",
+         needs_token=False, args=[
+    arg("--phases", env="SCW_PLAN_PHASES", default="scan,autopatch", help="Comma separated: scan, autopatch"),
+    arg("--timeout-minutes", env="SCW_JOB_TIMEOUT_MINUTES", default="360", type=float,
+        help="Job timeout the run must fit in (0: no time budget)"),
+    arg("--reserve", env="SCW_PLAN_RESERVE", default="200", type=int,
+        help="API calls left for other jobs sharing the token"),
+    arg("--offline", env="SCW_PLAN_OFFLINE", default="false",
+        help="true: no GitHub calls (no rate limit, no compare; every rendered item counts as a write)"),
+    arg("--db", help="Snapshot file (default SCW_SNAPSHOT_DB or .steg/state/scw_snapshot.sqlite)"),
+])
+def cmd_plan(ctx:Context, args):
+    from . import planner
+    offline = _true(args.offline)
+    if not offline and not ctx.token:
+        raise SystemExit("Missing GH_TOKEN (or pass --offline true)")
+    doc = planner.make_plan(ctx.root, ctx.token, ctx.policy, _csv(args.phases), offline,
+                            float(args.timeout_minutes), int(args.reserve),
+                            pathlib.Path(args.db) if args.db else None)
+    planner.write_plan(ctx.root, doc)
+    log("plan complete")
+
+@command("scan-patch", "org-scan and autopatch at once: high-risk items are patched during the scan", args=[
+    ORGS,
+    arg("--scan-workers", env="SCW_SCAN_WORKERS", default="4", type=int, help="Repos scanned concurrently"),
+    arg("--patch-workers", env="SCW_PATCH_WORKERS", default="2", type=int, help="Items patched concurrently"),
+    arg("--queue-size", env="SCW_PATCH_QUEUE", default="64", type=int,
+        help="Patch queue slots; a full queue pauses the scan"),
+    arg("--critical-only", env="SCW_CRITICAL_ONLY", default="false",
+        help="true: leave items below risk.warn_score_threshold pending for autopatch"),
+])
+def cmd_scan_patch(ctx:Context, args):
+    from . import pipeline
+    pipeline.run(ctx.root, ctx.token, _csv(args.orgs), ctx.policy, max(1, int(args.scan_workers)),
+                 max(1, int(args.patch_workers)), max(1, int(args.queue_size)), _true(args.critical_only))
+    log("scan-patch complete")
+
+@command("scan-diff", "new/resolved/changed fix items vs the previous scan", needs_token=False, args=[
+    arg("--old", env="SCW_DIFF_OLD", help="Older report (default reports/org_scan.prev.jsonl.gz)"),
+    arg("--new", env="SCW_DIFF_NEW", help="Newer report (default reports/org_scan.jsonl.gz)"),
+])
+def cmd_scan_diff(ctx:Context, args):
+    from . import report as scan_report
+    reports = ctx.root/"reports"
+    old = pathlib.Path(args.old or reports/scan_report.PREV_NAME)
+    new = pathlib.Path(args.new or reports/scan_report.REPORT_NAME)
+    for p in (old, new):
+        if not p.exists():
+            raise SystemExit(f"scan-diff: {p} not found (needs two streaming org-scans).")
+    scan_report.write_diff(old, new, reports/scan_report.DIFF_NAME)
+    log("scan-diff complete")
+
+@command("simulate", "fix queue a candidate policy would produce, offline from the snapshot",
+         needs_token=False, args=[
+    arg("--policy", env="SCW_SIMULATE_POLICY", help="Candidate policy file"),
+    arg("--db", help="Snapshot file (default SCW_SNAPSHOT_DB or .steg/state/scw_snapshot.sqlite)"),
+])
+def cmd_simulate(ctx:Context, args):
+    from . import snapshot
+    if not args.policy:
+        raise SystemExit("simulate: pass --policy new_policy.yml (or SCW_SIMULATE_POLICY).")
+    snapshot.run_simulate(ctx.root, pathlib.Path(args.policy), pathlib.Path(args.db) if args.db else None)
+    log("simulate complete")
+
+@command("fleet-index", "newest version per required file and the repos behind it, from the snapshot",
+         needs_token=False, args=[
+    arg("--path", action="append", help="Only this file (repeatable)"),
+    arg("--module", help="Only files of this sv_module"),
+    arg("--db", help="Snapshot file (default SCW_SNAPSHOT_DB or .steg/state/scw_snapshot.sqlite)"),
+])
+def cmd_fleet_index(ctx:Context, args):
+    import json
+    from . import snapshot
+    db = pathlib.Path(args.db) if args.db else snapshot.snapshot_path(ctx.root) or ctx.root/snapshot.SNAPSHOT_PATH
+    with snapshot.Snapshot(db, readonly=True) as snap:
+        idx = snap.fleet_index()
+    paths = args.path or (idx.paths_for_module(args.module) if args.module else None)
+    doc = snapshot.fleet_report(idx, paths)
+    (ctx.root/"reports").mkdir(exist_ok=True)
+    out_path = ctx.root/"reports"/snapshot.FLEET_INDEX_NAME
+    out_path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    for f in doc["files"]:
+        if f.get("known") is False:
+            log(f"{f['path']}: not in snapshot")
+            continue
+        n = f["newest"]
+        log(f"{f['path']}: newest epoch {n['sv_epoch']} v{n['sv_version']} ({n['sv_build_id']}); "
+            f"{f['current']} current, {f['behind']} behind, {f['missing']} missing")
+    log(f"fleet-index complete -> {out_path}")
+
+@command("fleet-first-aid", "heal workflows across all scanned repos, patch via autopatch", args=[
+    ORGS,
+    arg("--dry-run", env="DRY_RUN", default="false", help="true: report only, no patches"),
+])
+def cmd_fleet_first_aid(ctx:Context, args):
+    import json
+    from .fleet_first_aid import EVENT_LOG, fleet_first_aid, record_events
+    from .scw_core import autopatch
+    result, healed = fleet_first_aid(ctx.token, _csv(args.orgs), ctx.policy)
+    (ctx.root/"reports").mkdir(exist_ok=True)
+    out_path = ctx.root/"reports"/"fleet_first_aid.json"
+    out_path.write_text(json.dumps(result, indent=2))
+    if not _true(args.dry_run):
+        autopatch(result["fix_queue"], ctx.policy)
+        out_path.write_text(json.dumps(result, indent=2))
+        # Only now do the items say which files really landed; a dry run records nothing.
+        n = record_events(healed, result["fix_queue"], ctx.root/EVENT_LOG)
+        log(f"Recorded {n} workflow_first_aid events in {EVENT_LOG}")
+    log("fleet-first-aid complete")
+
+@command("webhook-serve", "keep the report current from GitHub events (see webhooks.py)", args=[
+    ORGS,
+    arg("--host", env="SCW_WEBHOOK_HOST", default="127.0.0.1"),
+    arg("--port", env="SCW_WEBHOOK_PORT", default="8787", type=int),
+])
+def cmd_webhook_serve(ctx:Context, args):
+    from . import webhooks
+    ing = webhooks.Ingestor(ctx.root, ctx.token, ctx.policy, _csv(args.orgs))
+    try:
+        webhooks.serve(ing, args.host, int(args.port))
+    finally:
+        ing.close()
+    log("webhook-serve complete")
+
+@command("webhook-replay", "apply recorded webhook deliveries", args=[
+    ORGS,
+    arg("files", nargs="*", help="Delivery files (JSONL, or one payload each with --event)"),
+    arg("--event", env="SCW_WEBHOOK_EVENT", help="Event name when each file is one raw payload"),
+])
+def cmd_webhook_replay(ctx:Context, args):
+    from . import webhooks
+    files = args.files or _csv(os.getenv("SCW_WEBHOOK_REPLAY", ""))
+    if not files:
+        raise SystemExit("webhook-replay: pass delivery files (or SCW_WEBHOOK_REPLAY, comma separated).")
+    ing = webhooks.Ingestor(ctx.root, ctx.token, ctx.policy, _csv(args.orgs))
+    try:
+        webhooks.replay(ing, webhooks.iter_deliveries(files, args.event))
+    finally:
+        ing.close()
+    log("webhook-replay complete")
+
+@command("doctor", "local sanity checks (no GitHub access needed)", needs_token=False)
+def cmd_doctor(ctx:Context, args):
+    problems = []
+    if sys.version_info < (3, 10):
+        problems.append(f"python {sys.version.split()[0]} < 3.10")
+    policy_file = ctx.root/"scw"/"policy.yml"
+    if not policy_file.exists():
+        problems.append(f"missing {policy_file}")
+    else:
+        try:
+            policy = ctx.policy
+        except Exception as e:
+            problems.append(f"policy.yml unreadable: {type(e).__name__}: {e}")
+        else:
+            keys = ("policy_epoch", "min_versions", "required_files", "structure_allowlist_globs", "scan")
+            missing = [k for k in keys if k not in (policy or {})]
+            if missing:
+                problems.append(f"policy.yml lacks {', '.join(missing)}")
+            else:
+                log(f"doctor: policy epoch {policy['policy_epoch']}, {len(policy['required_files'])} required files")
+    log(f"doctor: GH_TOKEN {'set' if ctx.token else 'not set (needed for org-scan/autopatch)'}")
+    for p in problems:
+        log(f"doctor: {p}")
+    if problems:
+        raise SystemExit(f"doctor: {len(problems)} problem(s)")
+    log("doctor: ok (v4)")
+
+# --- entry point -------------------------------------------------------------
+
+def build_parser()->argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m scw", description="SCW core")
+    sub = ap.add_subparsers(dest="cmd", metavar="command")
+    for c in COMMANDS.values():
+        p = sub.add_parser(c.name, help=c.help, description=c.help)
+        for flags, kw in c.args:
+            p.add_argument(*flags, **kw)
+    return ap
+
+def main(argv:Optional[List[str]]=None)->int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # No command on the line: take SCW_CMD (workflows set it through env).
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv.insert(0, os.getenv("SCW_CMD", "org-scan").strip())
+    if argv[0] not in COMMANDS and not argv[0].startswith("-"):
+        raise SystemExit(f"Unknown SCW_CMD={argv[0]} (commands: {', '.join(COMMANDS)})")
+    args = build_parser().parse_args(argv)
+    cmd = COMMANDS[args.cmd]
+
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    token = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
+    if cmd.needs_token and not token:
+        raise SystemExit("Missing GH_TOKEN")
+
+    from . import metrics
+    with metrics.command(root, cmd.name):
+        cmd.run(Context(root, token), args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/first_aid.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Workflow First-Aid (v1)
+
+Heals .github/workflows/*.y*ml for the Workflows First-Aid Sweep:
+- expands inline `env: { A: b }` maps into block form
+- wraps script lines that fell outside a `run:` block in `run: |`
+- injects `workflow_dispatch` into `on:` (skips workflow_call-only files)
+
+Each file is healed by a single forward pass of a line classifier
+(O(lines), no look-back windows, no mid-loop inserts). Files are healed
+in parallel across a process pool and the run writes FIRST_AID_SUMMARY.json
+in the shape `scripts/state_engine.py first-aid` consumes. Parsing goes
+through the shared scw.wfload cache.
+
+Incremental sweeps (`--mode hash|git`) only heal workflows whose content
+changed since the state engine last recorded them; `--mode full` (the
+default) forces a sweep of every file.
+
+Usage:
+  python -m scw.first_aid --out .github/autopatch_out [--mode git]
+"""
+
+from __future__ import annotations
+
+import argparse, json, os, pathlib, re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from .wfload import (CACHE_PATH, LATEST_INDEX_PATH, SWEEP_MODES, ParseCache,
+                     load_latest_index, select_changed, workflow_paths)
+
+def log(msg): print(f"[FIRST_AID] {msg}", flush=True)
+
+ENV_INLINE_RE = re.compile(r"^(\s*)env:\s*\{\s*([^}]+)\s*\}\s*$")
+STEP_START_RE = re.compile(r"^\s*-\s+name:\s")
+RUN_KEY_RE = re.compile(r"^\s*(?:-\s+)?run\s*:")
+STEPS_KEY_RE = re.compile(r"^\s*steps\s*:")
+# `key: |` / `- key: >-` etc.; group(1) ends where the key starts.
+BLOCK_SCALAR_RE = re.compile(r"^(\s*(?:-\s+)?)[^\s#:][^:#]*:\s*[|>][0-9+-]*\s*(?:#.*)?$")
+
+SCRIPT_LEADERS = (
+    "import ","from ","set -e","set -eu","set -euo pipefail",
+    "#!/usr/bin/env","python ","bash ","sh ","node ",
+    "ROOT=","SHA=","git ","curl ","jq ","ts=","echo ","{","}","if [","fi"
+)
+
+# Below this many files a process pool costs more than it saves.
+POOL_MIN_FILES = 8
+
+def indent_of(line:str)->int: return len(line) - len(line.lstrip(" "))
+
+def is_scriptish(line:str)->bool:
+    return line.lstrip().startswith(SCRIPT_LEADERS)
+
+def expand_inline_env(line:str)->Optional[List[str]]:
+    """`env: { A: 1, B: 2 }` -> block lines, or None if the line is not an inline env map."""
+    m = ENV_INLINE_RE.match(line)
+    if not m:
+        return None
+    base, inner = m.group(1), m.group(2)
+    out = [f"{base}env:\n"]
+    for part in inner.split(","):
+        part = part.strip()
+        if ":" in part:
+            k, v = part.split(":", 1)
+            out.append(f"{base}  {k.strip()}: {v.strip()}\n")
+    return out
+
+def _reindent(line:str, col:int)->str:
+    if not line.strip() or line.lstrip().startswith("#"):
+        return line
+    return " " * col + line.lstrip(" ")
+
+def heal_lines(lines:List[str])->Tuple[List[str], bool]:
+    """
+    Single forward pass over a workflow's lines.
+
+    State carried between lines:
+    - block_col: key column of the enclosing block scalar (`run: |`,
+      `script: |`, ...); deeper lines are opaque payload and never healed.
+    - anchor: the nearest structural line seen so far ("run", "step" or
+      "top"); a scriptish line needs a `run:` unless the anchor is "run".
+    - head: output index just past the last step start / `steps:` line and
+      the indent an injected `run: |` would get there.
+    - run_col: set after an injection; following lines are re-indented under
+      the injected `run: |` until the next step start or top-level line.
+
+    Lines between `head` and an injection point are re-indented once and
+    `head` is then cleared, so every line is touched a bounded number of times.
+    """
+    out: List[str] = []
+    changed = False
+    block_col: Optional[int] = None
+    anchor: Optional[str] = None
+    head: Optional[Tuple[int, int]] = None
+    run_col: Optional[int] = None
+
+    for line in lines:
+        stripped = line.strip()
+        ind = indent_of(line)
+
+        if run_col is not None:
+            if stripped and (STEP_START_RE.match(line) or ind == 0):
+                run_col = None
+            else:
+                new = _reindent(line, run_col + 2)
+                changed |= new != line
+                out.append(new)
+                continue
+
+        if block_col is not None:
+            if not stripped or ind > block_col:
+                out.append(line)
+                continue
+            block_col = None
+
+        if not stripped:
+            out.append(line)
+            continue
+
+        expanded = expand_inline_env(line)
+        if expanded is not None:
+            out.extend(expanded)
+            changed = True
+            if ind == 0:
+                anchor, head = "top", None
+            continue
+
+        if stripped.startswith("#"):
+            if ind == 0:
+                anchor, head = "top", None
+            out.append(line)
+            continue
+
+        if ind == 0:
+            anchor, head = "top", None
+        elif STEP_START_RE.match(line):
+            anchor, head = "step", (len(out) + 1, ind + 2)
+        elif RUN_KEY_RE.match(line):
+            anchor = "run"
+        elif STEPS_KEY_RE.match(line):
+            head = (len(out) + 1, ind + 2)
+        elif anchor != "run" and is_scriptish(line):
+            at, col = head if head else (len(out), max(2, ind))
+            tail = out[at:]
+            del out[at:]
+            out.append(" " * col + "run: |\n")
+            out.extend(_reindent(t, col + 2) for t in tail)
+            out.append(_reindent(line, col + 2))
+            anchor, head, run_col = "run", None, col
+            changed = True
+            continue
+
+        out.append(line)
+        m = BLOCK_SCALAR_RE.match(line)
+        if m:
+            block_col = len(m.group(1))
+
+    return out, changed
+
+def _normalize_on_key(model:dict)->None:
+    # YAML 1.1 reads a bare `on:` key as boolean True; GitHub reads it as "on".
+    if True in model and "on" not in model:
+        items = [("on" if k is True else k, v) for k, v in model.items()]
+        model.clear()
+        model.update(items)
+
+def has_workflow_call_only(on)->bool:
+    return isinstance(on, dict) and set(on.keys()) == {"workflow_call"}
+
+def ensure_dispatch(model)->bool:
+    if not isinstance(model, dict): return False
+    _normalize_on_key(model)
+    on = model.get("on")
+    if on is None:
+        model["on"] = {"workflow_dispatch": {}}
+        return True
+    if isinstance(on, str):
+        model["on"] = on = {on: {}}
+    if isinstance(on, list):
+        model["on"] = on = {k: {} for k in on if isinstance(k, str)}
+    if has_workflow_call_only(on):
+        return False
+    if "workflow_dispatch" not in on:
+        on["workflow_dispatch"] = {}
+        return True
+    return False
+
+def heal_text(text:str, cache:ParseCache)->Tuple[str, bool, Optional[str]]:
+    """
+    Heal one workflow body.
+    Returns (healed_text, dispatch_added, parse_error_type_of_result).
+    """
+    lines, changed = heal_lines(text.splitlines(keepends=True))
+    healed = "".join(lines) if changed else text
+    model, err = cache.parse(healed)
+
+    if err is not None and changed:
+        # Text repairs must never break a file that parsed before them.
+        base_model, base_err = cache.parse(text)
+        if base_err is None:
+            healed, model, err = text, base_model, None
+
+    if err is None and ensure_dispatch(model):
+        dumped = yaml.safe_dump(model, sort_keys=False, allow_unicode=True)
+        cache.status(dumped)  # warm the cache for the console / quarantine jobs
+        return dumped, True, None
+    return healed, False, err
+
+# Per-process cache; pool workers load a read-only copy and ship new entries back.
+_CACHE: Optional[ParseCache] = None
+
+def _init_worker(cache_path:Optional[str])->None:
+    global _CACHE
+    _CACHE = ParseCache(pathlib.Path(cache_path) if cache_path else None)
+
+def heal_file(path:str)->Dict[str, Any]:
+    p = pathlib.Path(path)
+    text = p.read_text(encoding="utf-8", errors="ignore")
+    healed, dispatch_added, err = heal_text(text, _CACHE)
+    if healed != text:
+        p.write_text(healed, encoding="utf-8")
+    return {
+        "name": p.name,
+        "changed": healed != text,
+        "added_dispatch": dispatch_added,
+        "error": err,
+        "cache": _CACHE.take_fresh(),
+    }
+
+def heal_blob(name:str, text:str)->Dict[str, Any]:
+    """heal_file for content fetched from another repo; nothing is written locally."""
+    global _CACHE
+    if _CACHE is None:
+        _init_worker(None)
+    healed, dispatch_added, err = heal_text(text, _CACHE)
+    changed = healed != text
+    return {
+        "name": name,
+        "changed": changed,
+        "added_dispatch": dispatch_added,
+        "error": err,
+        "was_broken": changed and _CACHE.status(text) is not None,
+        "text": healed if changed else None,
+    }
+
+def sweep(wf_dir:pathlib.Path, workers:Optional[int]=None,
+          cache_path:Optional[pathlib.Path]=CACHE_PATH, mode:str="full",
+          index_path:pathlib.Path=LATEST_INDEX_PATH, git_base:Optional[str]=None)->Dict[str, list]:
+    global _CACHE
+    todo, unchanged = select_changed(workflow_paths(wf_dir), mode,
+                                     load_latest_index(index_path) if mode != "full" else None,
+                                     git_base)
+    paths = [str(p) for p in todo]
+    workers = workers or os.cpu_count() or 1
+    cache_arg = str(cache_path) if cache_path else None
+    if workers > 1 and len(paths) >= POOL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cache_arg,)) as pool:
+            results = list(pool.map(heal_file, paths, chunksize=max(1, len(paths)//(workers*4))))
+        _init_worker(cache_arg)
+        for r in results:
+            _CACHE.merge(r["cache"])
+    else:
+        _init_worker(cache_arg)
+        results = [heal_file(p) for p in paths]
+    _CACHE.save()
+
+    summary: Dict[str, list] = {"fixed": [], "added_dispatch": [], "still_broken": [],
+                                "ok": [], "skipped": [p.name for p in unchanged]}
+    for r in results:
+        if r["added_dispatch"]:
+            summary["added_dispatch"].append(r["name"])
+        if r["error"] is not None:
+            summary["still_broken"].append((r["name"], r["error"]))
+        elif r["changed"]:
+            summary["fixed"].append(r["name"])
+        else:
+            summary["ok"].append(r["name"])
+    return summary
+
+def main(argv: Optional[list] = None) -> int:
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    parser = argparse.ArgumentParser(description="SCW Workflow First-Aid – heal workflow YAML")
+    parser.add_argument("--workflows-dir", default=str(root/".github"/"workflows"))
+    parser.add_argument("--out", default=str(root/".github"/"autopatch_out"),
+                        help="Directory for FIRST_AID_SUMMARY.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process pool size (default: CPU count; 1 = serial)")
+    parser.add_argument("--cache", default=str(root/CACHE_PATH),
+                        help="Shared parse cache (scw.wfload); '' disables it")
+    parser.add_argument("--mode", choices=SWEEP_MODES, default="full",
+                        help="full: every file; hash/git: only files changed since last recorded state")
+    parser.add_argument("--latest-index", default=str(root/LATEST_INDEX_PATH),
+                        help="latest_per_workflow.json written by scripts/state_reader.py")
+    parser.add_argument("--git-base", default="auto",
+                        help="Base commit for --mode git (default: SHA of the newest indexed event)")
+    args = parser.parse_args(argv)
+
+    summary = sweep(pathlib.Path(args.workflows_dir), args.workers,
+                    pathlib.Path(args.cache) if args.cache else None,
+                    args.mode, pathlib.Path(args.latest_index), args.git_base)
+
+    outdir = pathlib.Path(args.out)
+    outdir.mkdir(parents=True, exist_ok=True)
+    (outdir/"FIRST_AID_SUMMARY.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    log(f"fixed={len(summary['fixed'])} added_dispatch={len(summary['added_dispatch'])} "
+        f"still_broken={len(summary['still_broken'])} ok={len(summary['ok'])} "
+        f"skipped={len(summary['skipped'])} mode={args.mode}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/fleet_first_aid.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Fleet First-Aid (v1)
+
+Runs the workflow healer (scw.first_aid) across every repo org-scan manages,
+from one process instead of one Actions run per repo:
+- repo list from org_health.iter_org_repos (same excludes as org-scan)
+- all .github/workflows files of FETCH_BATCH repos fetched per GraphQL call
+- healing in a local process pool
+- healed files become fix queue items with inline `content`, applied by
+  scw_core.autopatch like any other structure fix
+- one workflow_first_aid state event per touched file, tagged with the repo,
+  recorded after autopatch: "fixed" only once the file's fix item is done
+
+Called by scw_core.py (SCW_CMD=fleet-first-aid).
+"""
+
+from __future__ import annotations
+
+import datetime as dt, hashlib, json, os, pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .first_aid import heal_blob
+from .org_health import get_file, gh_graphql, iter_org_repos
+from .risk import RiskInputs, score as risk_score
+
+def log(msg): print(f"[FLEET_FIRST_AID] {msg}", flush=True)
+
+WF_PATH = ".github/workflows"
+FETCH_BATCH = 25
+EVENT_LOG = pathlib.Path(".steg") / "state" / "events.jsonl"
+
+_REPO_FIELDS = """
+  nameWithOwner
+  defaultBranchRef { name }
+  object(expression: "HEAD:.github/workflows") {
+    ... on Tree { entries { name type object { ... on Blob { text isBinary } } } }
+  }
+"""
+
+def _batch_query(n:int)->str:
+    params = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(n))
+    body = "\n".join(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{_REPO_FIELDS}}}" for i in range(n))
+    return f"query({params}) {{\n{body}\n}}"
+
+def fetch_workflows(token:str, repos:List[str], batch:int=FETCH_BATCH)->Dict[str, dict]:
+    """
+    repo -> {"ref": default_branch, "files": {name: text}} for every *.y*ml under
+    .github/workflows. Blobs GraphQL returns without text (too large) are
+    fetched through the contents API.
+    """
+    out: Dict[str, dict] = {}
+    for start in range(0, len(repos), batch):
+        chunk = repos[start:start+batch]
+        variables = {}
+        for i, full in enumerate(chunk):
+            variables[f"o{i}"], variables[f"n{i}"] = full.split("/")
+        data = gh_graphql(token, _batch_query(len(chunk)), variables)
+        for i, full in enumerate(chunk):
+            node = data.get(f"r{i}")
+            if not node:
+                log(f"{full}: not visible to token; skipped")
+                continue
+            ref = (node.get("defaultBranchRef") or {}).get("name", "main")
+            files = {}
+            for e in ((node.get("object") or {}).get("entries") or []):
+                name = e.get("name","")
+                if e.get("type") != "blob" or not name.endswith((".yml",".yaml")):
+                    continue
+                blob = e.get("object") or {}
+                if blob.get("isBinary"):
+                    continue
+                text = blob.get("text")
+                if text is None:
+                    text = get_file(token, full, f"{WF_PATH}/{name}", ref)
+                if text is not None:
+                    files[name] = text
+            out[full] = {"ref": ref, "files": files}
+        log(f"fetched workflows for {min(start+batch, len(repos))}/{len(repos)} repos")
+    return out
+
+def _heal_job(job)->Dict[str, Any]:
+    repo, name, text = job
+    res = heal_blob(name, text)
+    res["repo"] = repo
+    return res
+
+def heal_fleet(fetched:Dict[str, dict], workers:Optional[int]=None)->List[Dict[str, Any]]:
+    jobs = [(repo, name, text) for repo, info in sorted(fetched.items())
+            for name, text in sorted(info["files"].items())]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_heal_job, jobs, chunksize=max(1, len(jobs)//(workers*4))))
+    return [_heal_job(j) for j in jobs]
+
+def build_fix_queue(results:Iterable[Dict[str, Any]], fetched:Dict[str, dict], policy:dict)->dict:
+    items = []
+    for r in results:
+        if not r["changed"] or r["error"] is not None:
+            continue
+        items.append({
+            "repo": r["repo"],
+            "ref": fetched[r["repo"]]["ref"],
+            "path": f"{WF_PATH}/{r['name']}",
+            "action": "replace",
+            "reason": "first_aid(dispatch)" if r["added_dispatch"] and not r["was_broken"] else "first_aid(repair)",
+            "wanted_epoch": policy["policy_epoch"],
+            "wanted_version": policy["min_versions"].get("workflow","0.0.0"),
+            "status": "pending",
+            "last_attempt_utc": None,
+            "risk_score": risk_score(RiskInputs(fail_adjacent_risk=1.0 if r["was_broken"] else 0.3)),
+            "content": r["text"],
+        })
+    return {"sig": "fixqueue:v1", "items": items}
+
+def record_events(results:Iterable[Dict[str, Any]], fix_queue:dict, event_log:pathlib.Path=EVENT_LOG)->int:
+    """
+    Append workflow_first_aid events (same shape as scripts/state_engine.py)
+    tagged with the repo. Call after autopatch: a healed file is "fixed" when
+    its fix item is done, else "pending" with the item's status.
+    """
+    statuses = {(i["repo"], i["path"]): i["status"] for i in fix_queue.get("items", [])}
+    env = os.environ
+    now = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    meta = {"repo": env.get("GITHUB_REPOSITORY"), "workflow": env.get("GITHUB_WORKFLOW"),
+            "run_id": env.get("GITHUB_RUN_ID"), "sha": env.get("GITHUB_SHA")}
+    n = 0
+    event_log.parent.mkdir(parents=True, exist_ok=True)
+    with event_log.open("a", encoding="utf-8") as f:
+        for r in results:
+            if not r["changed"] and r["error"] is None:
+                continue
+            path = f"{WF_PATH}/{r['name']}"
+            patched = statuses.get((r["repo"], path)) if r["error"] is None else None
+            if r["error"] is not None:
+                status = "still_broken"
+            else:
+                status = "fixed" if patched == "done" else "pending"
+            event = {
+                "ts": now,
+                "namespace": "SCW",
+                "kind": "workflow_first_aid",
+                "event_type": "repair",
+                "status": status,
+                "resource_type": "workflow",
+                "resource_name": f"{r['repo']}:{r['name']}",
+                "target_repo": r["repo"],
+                "path": path,
+                "post_checksum": hashlib.sha256(r["text"].encode("utf-8")).hexdigest() if r["text"] else None,
+                "labels": ["first_aid", "fleet", r["repo"],
+                           "dispatch_injected" if r["added_dispatch"] else "no_dispatch_change"],
+                "meta": meta,
+            }
+            if r["error"] is not None:
+                event["error_type"] = r["error"]
+            elif status != "fixed":
+                event["patch_status"] = patched
+            f.write(json.dumps(event) + "\n")
+            n += 1
+    return n
+
+def fleet_first_aid(token:str, orgs:List[str], policy:dict,
+                    workers:Optional[int]=None)->Tuple[dict, List[Dict[str, Any]]]:
+    """(report with the fix queue, per-file heal results for record_events once autopatch ran)."""
+    repos = list(iter_org_repos(token, orgs, policy))
+    fetched = fetch_workflows(token, repos)
+    results = heal_fleet(fetched, workers)
+    queue = build_fix_queue(results, fetched, policy)
+    summary = {
+        "repos": len(fetched),
+        "files": len(results),
+        "fixed": sum(1 for r in results if r["changed"] and r["error"] is None),
+        "still_broken": [[r["repo"], r["name"], r["error"]] for r in results if r["error"] is not None],
+    }
+    log(f"repos={summary['repos']} files={summary['files']} fixed={summary['fixed']} "
+        f"still_broken={len(summary['still_broken'])}")
+    return {
+        "sig": "fleetfirstaid:v1",
+        "generated_utc": dt.datetime.utcnow().isoformat()+"Z",
+        "summary": summary,
+        "fix_queue": queue,
+    }, results
@@ -0,0 +1,214 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/metrics.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Metrics (v1)
+
+In-process instrumentation for scw_core commands:
+- span(name, **attrs): timed block; aggregated per name and kept as a trace
+  event (attrs such as repo/path make slow repos and calls visible)
+- timed(name, attr_fn): decorator form of span
+- inc(name, value, **labels): counters (API calls, bytes, cache hits, ...)
+- api_response(method, r): API call/byte/status counters + rate-limit gauges
+- rate_limit_wait(r): sleep out an exhausted GitHub rate limit (counted)
+
+command(root, cmd) wraps one command and writes:
+- reports/scw_trace.json    spans, counters, slowest events
+- reports/scw_metrics.prom  Prometheus textfile (node_exporter collector)
+- reports/scw_profile_<cmd>.pstats when SCW_PROFILE=1
+
+SCW_METRICS=0 disables the report files (instrumentation stays in place).
+"""
+
+from __future__ import annotations
+
+import os, json, time, threading, pathlib, contextlib, functools, datetime as dt
+from typing import Any, Callable, Dict, Optional, Tuple
+
+SIG = "scwtrace:v1"
+MAX_EVENTS = 20000
+SLOWEST = 50
+RATE_LIMIT_MAX_WAIT = float(os.getenv("SCW_RATE_LIMIT_MAX_WAIT", "300"))
+
+def log(msg): print(f"[METRICS] {msg}", flush=True)
+
+_lock = threading.Lock()
+_t0 = time.perf_counter()
+_spans: Dict[str, list] = {}                        # name -> [count, total_s, max_s]
+_counters: Dict[Tuple[str, Tuple], float] = {}      # (name, sorted labels) -> value
+_gauges: Dict[str, float] = {}
+_events: list = []
+_dropped = 0
+
+def reset()->None:
+    global _t0, _dropped
+    with _lock:
+        _t0 = time.perf_counter()
+        _spans.clear(); _counters.clear(); _gauges.clear(); _events.clear()
+        _dropped = 0
+
+def inc(name:str, value:float=1, **labels)->None:
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def gauge(name:str, value:float)->None:
+    with _lock:
+        _gauges[name] = value
+
+def _record(name:str, start:float, dur:float, attrs:dict)->None:
+    global _dropped
+    with _lock:
+        agg = _spans.setdefault(name, [0, 0.0, 0.0])
+        agg[0] += 1; agg[1] += dur
+        if dur > agg[2]: agg[2] = dur
+        if len(_events) < MAX_EVENTS:
+            _events.append({"name": name, "start_ms": round((start-_t0)*1000, 3),
+                            "dur_ms": round(dur*1000, 3), **attrs})
+        else:
+            _dropped += 1
+
+@contextlib.contextmanager
+def span(name:str, **attrs):
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _record(name, start, time.perf_counter()-start, attrs)
+
+def timed(name:str, attr_fn:Optional[Callable[..., dict]]=None):
+    """Decorator: run the function inside span(name, **attr_fn(*args, **kwargs))."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            attrs = attr_fn(*args, **kwargs) if attr_fn else {}
+            with span(name, **attrs):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def api_response(method:str, r)->None:
+    """Count one GitHub API response (calls, bytes, status class, rate-limit headers)."""
+    inc("api_calls", method=method)
+    inc("api_bytes", len(r.content or b""))
+    inc("api_responses", status=f"{r.status_code // 100}xx")
+    remaining = r.headers.get("X-RateLimit-Remaining")
+    if remaining is not None and remaining.isdigit():
+        gauge("rate_limit_remaining", int(remaining))
+
+def rate_limit_wait(r)->bool:
+    """
+    If `r` is a rate-limit rejection (403/429 with Retry-After or an exhausted
+    X-RateLimit-Remaining), sleep until it clears (capped) and return True so
+    the caller retries once. Otherwise return False.
+    """
+    if r.status_code not in (403, 429):
+        return False
+    retry_after = r.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        wait = float(retry_after)
+    elif r.headers.get("X-RateLimit-Remaining") == "0" and r.headers.get("X-RateLimit-Reset", "").isdigit():
+        wait = max(0.0, float(r.headers["X-RateLimit-Reset"]) - time.time()) + 1
+    else:
+        return False
+    if wait > RATE_LIMIT_MAX_WAIT:
+        log(f"Rate limited; reset in {wait:.0f}s exceeds SCW_RATE_LIMIT_MAX_WAIT, not waiting")
+        return False
+    log(f"Rate limited; waiting {wait:.0f}s")
+    inc("rate_limit_waits")
+    inc("rate_limit_wait_seconds", wait)
+    time.sleep(wait)
+    return True
+
+def snapshot()->Dict[str, Any]:
+    with _lock:
+        spans = {n: {"count": c, "total_ms": round(t*1000, 3), "max_ms": round(m*1000, 3),
+                     "mean_ms": round(t*1000/c, 3) if c else 0.0}
+                 for n, (c, t, m) in sorted(_spans.items(), key=lambda kv: -kv[1][1])}
+        counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(_counters.items())]
+        events = list(_events)
+        return {"wall_s": round(time.perf_counter()-_t0, 3), "spans": spans, "counters": counters,
+                "gauges": dict(_gauges), "slowest": sorted(events, key=lambda e: -e["dur_ms"])[:SLOWEST],
+                "events": events, "events_dropped": _dropped}
+
+def _prom_labels(labels:dict)->str:
+    if not labels: return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def prometheus_text(snap:Dict[str, Any], cmd:str)->str:
+    base = {"command": cmd}
+    lines = ["# HELP scw_span_seconds_total Time spent in instrumented spans.",
+             "# TYPE scw_span_seconds_total counter"]
+    lines += [f"scw_span_seconds_total{_prom_labels({**base, 'span': n})} {s['total_ms']/1000:.6f}"
+              for n, s in snap["spans"].items()]
+    lines += ["# HELP scw_span_count_total Instrumented span executions.",
+              "# TYPE scw_span_count_total counter"]
+    lines += [f"scw_span_count_total{_prom_labels({**base, 'span': n})} {s['count']}"
+              for n, s in snap["spans"].items()]
+    lines += ["# HELP scw_span_max_seconds Slowest single span execution.",
+              "# TYPE scw_span_max_seconds gauge"]
+    lines += [f"scw_span_max_seconds{_prom_labels({**base, 'span': n})} {s['max_ms']/1000:.6f}"
+              for n, s in snap["spans"].items()]
+    seen = set()
+    for c in snap["counters"]:
+        metric = f"scw_{c['name']}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter"); seen.add(metric)
+        lines.append(f"{metric}{_prom_labels({**base, **c['labels']})} {c['value']:g}")
+    for name, v in sorted(snap["gauges"].items()):
+        lines += [f"# TYPE scw_{name} gauge", f"scw_{name}{_prom_labels(base)} {v:g}"]
+    lines += ["# TYPE scw_run_seconds gauge", f"scw_run_seconds{_prom_labels(base)} {snap['wall_s']:.3f}",
+              "# TYPE scw_last_run_timestamp_seconds gauge",
+              f"scw_last_run_timestamp_seconds{_prom_labels(base)} {time.time():.0f}"]
+    return "\n".join(lines) + "\n"
+
+def write_reports(root:pathlib.Path, cmd:str, started_utc:str)->None:
+    snap = snapshot()
+    out = root/"reports"
+    out.mkdir(parents=True, exist_ok=True)
+    trace = {"sig": SIG, "command": cmd, "started_utc": started_utc, **snap}
+    (out/"scw_trace.json").write_text(json.dumps(trace, indent=2), encoding="utf-8")
+    # Write-then-rename so a textfile collector never reads a partial file.
+    tmp = out/"scw_metrics.prom.tmp"
+    tmp.write_text(prometheus_text(snap, cmd), encoding="utf-8")
+    os.replace(tmp, out/"scw_metrics.prom")
+    top = ", ".join(f"{n}={s['total_ms']/1000:.1f}s" for n, s in list(snap["spans"].items())[:5])
+    log(f"{cmd}: {snap['wall_s']:.1f}s wall; top spans: {top or 'none'}")
+
+@contextlib.contextmanager
+def command(root:pathlib.Path, cmd:str):
+    """Instrument one scw_core command (metrics files + optional cProfile)."""
+    reset()
+    started = dt.datetime.utcnow().isoformat()+"Z"
+    profiler = None
+    if os.getenv("SCW_PROFILE", "0") == "1":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with span("command", command=cmd):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            import pstats
+            (root/"reports").mkdir(parents=True, exist_ok=True)
+            prof_path = root/"reports"/f"scw_profile_{cmd}.pstats"
+            profiler.dump_stats(str(prof_path))
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+            log(f"Wrote {prof_path}")
+        if os.getenv("SCW_METRICS", "1") != "0":
+            write_reports(root, cmd, started)
@@ -30,10 +30,12 @@ from typing import Dict, List, Any, Optional, Tuple
 import requests
 import yaml
 
-from .svmeta import SvMeta, compare, strip_metadata
+from .svmeta import SvMeta, compare, parse_semver, strip_metadata
 from .risk import RiskInputs, score as risk_score
+from . import metrics
 
-API = "https://api.github.com"
+# SCW_API_URL points SCW at GitHub Enterprise or a local stand-in (scripts/bench/fake_github.py).
+API = os.getenv("SCW_API_URL", "https://api.github.com").rstrip("/")
 
 def log(msg): print(f"[ORG_HEALTH] {msg}", flush=True)
 
@@ -42,18 +44,37 @@ def gh_headers(token:str)->dict:
             "Accept":"application/vnd.github+json",
             "User-Agent":"StegVerse-SCW-v4"}
 
+def gh_request(method:str, url:str, **kw):
+    """requests.request + API metrics; waits out a rate limit and retries once."""
+    r = requests.request(method, url, **kw)
+    metrics.api_response(method, r)
+    if metrics.rate_limit_wait(r):
+        r = requests.request(method, url, **kw)
+        metrics.api_response(method, r)
+    return r
+
 def gh_get(token, path, params=None):
-    r = requests.get(f"{API}{path}", headers=gh_headers(token), params=params, timeout=30)
+    r = gh_request("GET", f"{API}{path}", headers=gh_headers(token), params=params, timeout=30)
     if r.status_code >= 300:
         raise RuntimeError(f"GitHub GET {path} failed: {r.status_code} {r.text[:200]}")
     return r.json()
 
 def gh_put(token, path, data):
-    r = requests.put(f"{API}{path}", headers=gh_headers(token), json=data, timeout=30)
+    r = gh_request("PUT", f"{API}{path}", headers=gh_headers(token), json=data, timeout=30)
     if r.status_code >= 300:
         raise RuntimeError(f"GitHub PUT {path} failed: {r.status_code} {r.text[:200]}")
     return r.json()
 
+def gh_graphql(token, query, variables=None):
+    r = gh_request("POST", f"{API}/graphql", headers=gh_headers(token),
+                   json={"query": query, "variables": variables or {}}, timeout=60)
+    if r.status_code >= 300:
+        raise RuntimeError(f"GitHub GraphQL failed: {r.status_code} {r.text[:200]}")
+    data = r.json()
+    if data.get("errors") and not data.get("data"):
+        raise RuntimeError(f"GitHub GraphQL failed: {str(data['errors'])[:200]}")
+    return data.get("data") or {}
+
 def glob_any(name:str, patterns:List[str])->bool:
     return any(fnmatch.fnmatch(name, pat) for pat in patterns)
 
@@ -61,6 +82,7 @@ def load_policy(root: pathlib.Path) -> dict:
     p = root / "scw" / "policy.yml"
     return yaml.safe_load(p.read_text())
 
+@metrics.timed("list_org_repos", lambda token, org: {"org": org})
 def list_org_repos(token:str, org:str):
     repos=[]
     page=1
@@ -71,19 +93,56 @@ def list_org_repos(token:str, org:str):
         if page>10: break
     return repos
 
-def repo_default_branch(token:str, full_name:str)->str:
+def parse_shard(spec:Optional[str])->Optional[Tuple[int,int]]:
+    """ "i/N" (0 <= i < N) -> (i, N); empty -> None (no sharding)."""
+    if not spec or not spec.strip():
+        return None
+    try:
+        i, n = (int(x) for x in spec.strip().split("/"))
+    except ValueError:
+        raise SystemExit(f"Invalid shard {spec!r}; expected i/N, e.g. 0/4")
+    if n < 1 or not 0 <= i < n:
+        raise SystemExit(f"Invalid shard {spec!r}; need 0 <= i < N")
+    return i, n
+
+def shard_of(full_name:str, n:int)->int:
+    """Stable shard for a repo: same full name, same shard, on every runner and run."""
+    digest = hashlib.sha256(full_name.lower().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n
+
+def iter_org_repos(token:str, orgs:List[str], policy:dict, shard:Optional[Tuple[int,int]]=None):
+    """Full names of every repo SCW manages in `orgs` (policy excludes applied, one shard if given)."""
+    for org in orgs:
+        log(f"Scanning org {org}..." + (f" (shard {shard[0]}/{shard[1]})" if shard else ""))
+        for r in list_org_repos(token, org):
+            full = r["full_name"]
+            if glob_any(full, policy.get("exclude_repos_globs", [])):
+                continue
+            if shard and shard_of(full, shard[1]) != shard[0]:
+                continue
+            yield full
+
+def repo_info(token:str, full_name:str)->dict:
     owner, repo = full_name.split("/")
-    info = gh_get(token, f"/repos/{owner}/{repo}")
-    return info.get("default_branch","main")
+    return gh_get(token, f"/repos/{owner}/{repo}")
+
+def repo_default_branch(token:str, full_name:str)->str:
+    return repo_info(token, full_name).get("default_branch","main")
 
+@metrics.timed("get_file", lambda token, full_name, path, ref: {"repo": full_name, "path": path})
 def get_file(token:str, full_name:str, path:str, ref:str)->Optional[str]:
+    blob = get_blob(token, full_name, path, ref)
+    return blob["text"] if blob else None
+
+def get_blob(token:str, full_name:str, path:str, ref:str)->Optional[dict]:
+    """{"sha": git blob sha, "text": decoded content} of one file, None when absent or unreadable."""
     owner, repo = full_name.split("/")
     try:
         blob = gh_get(token, f"/repos/{owner}/{repo}/contents/{path}", {"ref":ref})
         if blob.get("type") != "file":
             return None
         import base64
-        return base64.b64decode(blob["content"]).decode("utf-8", errors="replace")
+        return {"sha": blob.get("sha"), "text": base64.b64decode(blob["content"]).decode("utf-8", errors="replace")}
     except Exception:
         return None
 
@@ -106,33 +165,65 @@ def read_index_if_present(token, full_name, ref)->Optional[dict]:
     return data
 
 def staleness(policy_epoch:int, min_ver:str, meta:SvMeta)->bool:
-    if meta.sv_epoch < policy_epoch: return True
-    # semver compare
-    def semver_tuple(v): 
-        parts=v.split("."); 
-        return tuple(int(x) if x.isdigit() else 0 for x in (parts+["0","0","0"])[:3])
-    if semver_tuple(meta.sv_version) < semver_tuple(min_ver): return True
-    return False
+    # meta.key is (epoch, semver, build_id), parsed once per meta; min_ver parses are cached.
+    epoch, semver, _ = meta.key
+    return epoch < policy_epoch or semver < parse_semver(min_ver)
 
 def build_required_map(policy:dict)->Dict[str,dict]:
     return {f["path"]:f for f in policy["required_files"]}
 
-def scan_repo(token:str, full_name:str, policy:dict)->dict:
-    ref = repo_default_branch(token, full_name)
-    required = build_required_map(policy)
-    policy_epoch = policy["policy_epoch"]
-
-    # Index-first
+def observe_files(token:str, full_name:str, ref:str, policy:dict)->Tuple[bool, Dict[str,dict]]:
+    """
+    What the API says about each required file: (index_present, {path: obs}),
+    obs = {"state": "present"|"missing", "source": "index"|"tree", "meta": SvMeta|None,
+    "hash": content hash or None}. Index-first when policy.scan.index_first.
+    """
     index = read_index_if_present(token, full_name, ref) if policy["scan"]["index_first"] else None
+    file_states = {f["path"]: f for f in index.get("files",[])} if index else {}
 
+    observed = {}
+    for path in build_required_map(policy):
+        if index and path in file_states:
+            # index says file exists with meta summary
+            metrics.inc("cache_hits", cache="file_index")
+            st = file_states[path]
+            meta = SvMeta(
+                sv_file=path,
+                sv_kind=st.get("kind",""),
+                sv_module=st.get("module",""),
+                sv_version=st.get("sv_version","0.0.0"),
+                sv_build_id=st.get("sv_build_id",""),
+                sv_epoch=int(st.get("sv_epoch",0)),
+                sv_hash=st.get("sv_hash",""),
+            )
+            observed[path] = {"state": "present", "source": "index", "meta": meta, "hash": st.get("sv_hash") or None}
+            continue
+        # fall back to tree read for required paths
+        if index: metrics.inc("cache_misses", cache="file_index")
+        txt = get_file(token, full_name, path, ref)
+        if not txt:
+            observed[path] = {"state": "missing", "source": "tree", "meta": None, "hash": None}
+        else:
+            observed[path] = {"state": "present", "source": "tree", "meta": SvMeta.from_text(txt),
+                              "hash": content_hash(txt)}
+    return bool(index), observed
+
+def classify_repo(full_name:str, ref:str, index_present:bool, observed:Dict[str,dict], policy:dict,
+                  scanned_utc:Optional[str]=None)->dict:
+    """
+    Repo report from observations alone (no API calls): staleness, structure vs
+    logic queue and risk per required file. Paths with no observation (e.g. a
+    newly required file replayed from a snapshot) are listed in notes.
+    """
+    policy_epoch = policy["policy_epoch"]
     report = {
         "repo": full_name,
         "ref": ref,
-        "scanned_utc": dt.datetime.utcnow().isoformat()+"Z",
+        "scanned_utc": scanned_utc or dt.datetime.utcnow().isoformat()+"Z",
         "structure_queue": [],
         "logic_queue": [],
         "notes": [],
-        "index_present": bool(index),
+        "index_present": index_present,
     }
 
     def queue_item(path, action, reason, meta=None, depends=None, risk=0.0):
@@ -142,53 +233,95 @@ def scan_repo(token:str, full_name:str, policy:dict)->dict:
             "reason": reason,
             "wanted_epoch": policy_epoch,
             "wanted_version": policy["min_versions"].get("workflow","0.0.0"),
-            "meta_found": meta.__dict__ if meta else {},
+            "meta_found": meta.as_dict() if meta else {},
             "depends_on_secrets": depends or [],
             "risk_score": risk,
         }
         is_structure = glob_any(path, policy["structure_allowlist_globs"])
         (report["structure_queue"] if is_structure else report["logic_queue"]).append(item)
 
-    # Use index data if possible
-    file_states = {}
-    if index:
-        for f in index.get("files",[]):
-            file_states[f["path"]] = f
-
     # Required files checks
-    for path, spec in required.items():
+    for path, spec in build_required_map(policy).items():
         depends = spec.get("depends_on_secrets", [])
         min_ver = policy["min_versions"].get("workflow","0.0.0")
+        obs = observed.get(path)
+        if obs is None:
+            report["notes"].append(f"unobserved:{path}")
+            continue
+        if obs["state"] == "missing":
+            r = risk_score(RiskInputs(freshness_risk=1.0))
+            queue_item(path, "add", "missing_required", None, depends, r)
+        elif staleness(policy_epoch, min_ver, obs["meta"]):
+            r = risk_score(RiskInputs(freshness_risk=1.0))
+            queue_item(path, "replace", f"stale_metadata({obs['source']})", obs["meta"], depends, r)
 
-        if index and path in file_states:
-            # index says file exists with meta summary
-            meta = SvMeta(
-                sv_file=path,
-                sv_kind=file_states[path].get("kind",""),
-                sv_module=file_states[path].get("module",""),
-                sv_version=file_states[path].get("sv_version","0.0.0"),
-                sv_build_id=file_states[path].get("sv_build_id",""),
-                sv_epoch=int(file_states[path].get("sv_epoch",0)),
-                sv_hash=file_states[path].get("sv_hash",""),
-            )
-            if staleness(policy_epoch, min_ver, meta):
-                r = risk_score(RiskInputs(freshness_risk=1.0))
-                queue_item(path, "replace", "stale_metadata(index)", meta, depends, r)
-        else:
-            # fall back to tree read for required paths
-            txt = get_file(token, full_name, path, ref)
-            if not txt:
-                r = risk_score(RiskInputs(freshness_risk=1.0))
-                queue_item(path, "add", "missing_required", None, depends, r)
-                continue
-            meta = SvMeta.from_text(txt)
-            if staleness(policy_epoch, min_ver, meta):
-                r = risk_score(RiskInputs(freshness_risk=1.0))
-                queue_item(path, "replace", "stale_metadata(tree)", meta, depends, r)
+    return report
 
+@metrics.timed("scan_repo", lambda token, full_name, policy, snapshot=None: {"repo": full_name})
+def scan_repo(token:str, full_name:str, policy:dict, snapshot=None)->dict:
+    """
+    Scan one repo; with a snapshot (snapshot.Snapshot) the observations are also
+    recorded for `simulate`. With policy secrets.check, queue items learn which
+    of their depends_on_secrets the repo lacks (secret_check.py).
+    """
+    info = repo_info(token, full_name)
+    ref = info.get("default_branch","main")
+    index_present, observed = observe_files(token, full_name, ref, policy)
+    report = classify_repo(full_name, ref, index_present, observed, policy)
+    if (policy.get("secrets") or {}).get("check"):
+        from .secret_check import annotate
+        report["private"] = info.get("private")   # fix items keep it for the pre-patch recheck
+        annotate(token, report, policy, report["private"])
+    if snapshot is not None:
+        snapshot.record(full_name, ref, index_present, observed, report["scanned_utc"])
     return report
 
-def scan_org(token:str, orgs:List[str], policy:dict)->dict:
+def _fix_items(full:str, rep:dict)->List[dict]:
+    """Fix queue items for one repo report (structure + logic, logic queued as triage only)."""
+    items = []
+    for item in rep["structure_queue"]:
+        fix = {
+            "repo": full,
+            "path": item["path"],
+            "action": item["action"],
+            "reason": item["reason"],
+            "wanted_epoch": item["wanted_epoch"],
+            "wanted_version": item["wanted_version"],
+            "status": "pending",
+            "last_attempt_utc": None,
+            "risk_score": item["risk_score"],
+        }
+        if item.get("depends_on_secrets"):
+            fix["depends_on_secrets"] = item["depends_on_secrets"]
+            if "private" in rep:
+                fix["private"] = rep["private"]
+        if "secrets_missing" in item:
+            # Checked at scan time; missing secrets park the item before autopatch clones anything.
+            fix["secrets_missing"] = item["secrets_missing"]
+            if item["secrets_missing"]:
+                fix["status"] = "pending-secrets"
+        items.append(fix)
+    for item in rep["logic_queue"]:
+        items.append({
+            "repo": full,
+            "path": item["path"],
+            "action": "triage",
+            "reason": item["reason"],
+            "wanted_epoch": item["wanted_epoch"],
+            "wanted_version": item["wanted_version"],
+            "status": "triage",
+            "last_attempt_utc": None,
+            "risk_score": item["risk_score"],
+        })
+    return items
+
+def iter_scan(token:str, orgs:List[str], policy:dict, shard:Optional[Tuple[int,int]]=None, snapshot=None):
+    """(repo report, fix items) per managed repo, as each scan finishes."""
+    for full in iter_org_repos(token, orgs, policy, shard):
+        rep = scan_repo(token, full, policy, snapshot)
+        yield rep, _fix_items(full, rep)
+
+def scan_org(token:str, orgs:List[str], policy:dict, snapshot=None)->dict:
     out = {
         "sig":"orgscan:v4",
         "generated_utc": dt.datetime.utcnow().isoformat()+"Z",
@@ -197,44 +330,71 @@ def scan_org(token:str, orgs:List[str], policy:dict)->dict:
         "fix_queue": {"sig":"fixqueue:v1","items":[]}
     }
 
-    for org in orgs:
-        log(f"Scanning org {org}...")
-        repos = list_org_repos(token, org)
-        for r in repos:
-            full = r["full_name"]
-            if glob_any(full, policy.get("exclude_repos_globs", [])):
-                continue
-            rep = scan_repo(token, full, policy)
-            out["repos"].append(rep)
-
-            # Accumulate fix queue from structure+logic (logic queued as triage only)
-            for item in rep["structure_queue"]:
-                out["fix_queue"]["items"].append({
-                    "repo": full,
-                    "path": item["path"],
-                    "action": item["action"],
-                    "reason": item["reason"],
-                    "wanted_epoch": item["wanted_epoch"],
-                    "wanted_version": item["wanted_version"],
-                    "status": "pending",
-                    "last_attempt_utc": None,
-                    "risk_score": item["risk_score"],
-                })
-            for item in rep["logic_queue"]:
-                out["fix_queue"]["items"].append({
-                    "repo": full,
-                    "path": item["path"],
-                    "action": "triage",
-                    "reason": item["reason"],
-                    "wanted_epoch": item["wanted_epoch"],
-                    "wanted_version": item["wanted_version"],
-                    "status": "triage",
-                    "last_attempt_utc": None,
-                    "risk_score": item["risk_score"],
-                })
+    for rep, items in iter_scan(token, orgs, policy, snapshot=snapshot):
+        out["repos"].append(rep)
+        out["fix_queue"]["items"].extend(items)
 
     return out
 
+def scan_org_stream(token:str, orgs:List[str], policy:dict, path:pathlib.Path,
+                    shard:Optional[Tuple[int,int]]=None, snapshot=None, rotate_prev:bool=False)->dict:
+    """
+    Streaming org-scan: each repo and its fix items are written to the JSONL
+    report (see report.py) as soon as the repo is scanned; nothing accumulates.
+    rotate_prev: keep the report being replaced as the previous one, once the
+    new one is complete.
+    """
+    from .report import ReportWriter
+    extra = {"shard": shard[0], "shards": shard[1]} if shard else {}
+    with ReportWriter(path, rotate_prev=rotate_prev, policy_epoch=policy["policy_epoch"], orgs=orgs, **extra) as w:
+        for rep, items in iter_scan(token, orgs, policy, shard, snapshot):
+            w.repo(rep)
+            for item in items:
+                w.fix(item)
+        counts = {"repos": w.repos, "fix_items": w.fix_items}
+    log(f"Wrote {path} ({counts['repos']} repos, {counts['fix_items']} fix items)")
+    return counts
+
+def write_org_scan(root:pathlib.Path, token:str, orgs:List[str], policy:dict,
+                   shard:Optional[Tuple[int,int]]=None)->pathlib.Path:
+    """
+    org-scan into reports/: streaming JSONL (previous scan rotated once the
+    new one is complete) or legacy JSON. With a shard, only that shard's repos
+    are scanned into a partial report (always JSONL) for `merge`. Observations go to the local snapshot
+    (snapshot.py) unless SCW_SNAPSHOT_DB=off; shards get their own file.
+    """
+    from .report import report_format, report_path, shard_name
+    from .snapshot import Snapshot, snapshot_path, shard_snapshot_name
+    (root/"reports").mkdir(exist_ok=True)
+    snap_path = snapshot_path(root)
+    if shard:
+        out_path = root/"reports"/shard_name(*shard)
+        snap = None
+        if snap_path:
+            snap_path = root/"reports"/shard_snapshot_name(*shard)
+            snap_path.unlink(missing_ok=True)
+            snap = Snapshot(snap_path)
+        try:
+            scan_org_stream(token, orgs, policy, out_path, shard, snap)
+        finally:
+            if snap: snap.close()
+        return out_path
+    out_path = report_path(root)
+    snap = Snapshot(snap_path) if snap_path else None
+    try:
+        if report_format() == "jsonl":
+            scan_org_stream(token, orgs, policy, out_path, snapshot=snap, rotate_prev=True)
+        else:
+            report = scan_org(token, orgs, policy, snap)
+            out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            log(f"Wrote {out_path}")
+        if snap:
+            pruned = snap.prune()
+            log(f"Snapshot {snap_path} updated" + (f" ({pruned} repos no longer scanned)" if pruned else ""))
+    finally:
+        if snap: snap.close()
+    return out_path
+
 def main():
     root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
     token = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
@@ -243,12 +403,9 @@ def main():
     policy = load_policy(root)
     orgs = os.getenv("SCW_ORGS","StegVerse,StegVerse-Labs").split(",")
 
-    report = scan_org(token, [o.strip() for o in orgs if o.strip()], policy)
-
-    (root/"reports").mkdir(exist_ok=True)
-    out_path = root/"reports"/"org_scan.json"
-    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
-    log(f"Wrote {out_path}")
+    with metrics.command(root, "org-scan"):
+        write_org_scan(root, token, [o.strip() for o in orgs if o.strip()], policy,
+                       parse_shard(os.getenv("SCW_SHARD")))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,173 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/pipeline.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Pipeline (v1)
+
+scan-patch: org-scan and autopatch in one process. Scan workers feed a
+bounded priority queue (highest risk_score first) that patch workers drain
+while later repos are still being scanned, so critical drift is remediated
+in roughly max(scan, patch) time instead of scan + patch:
+
+  scan workers (SCW_SCAN_WORKERS) -> report + snapshot (in repo order)
+        | items >= policy risk.warn_score_threshold, as each repo finishes
+        v
+  PatchQueue (SCW_PATCH_QUEUE slots; a full queue pauses the scan)
+        |
+        v
+  patch workers (SCW_PATCH_WORKERS) -> scw_core.patch_item under repo_lock
+
+Once the scan is done, the remaining pending items are queued too (unless
+critical_only), and the report's fix items are rewritten with the outcome,
+as `autopatch` does. Only the streaming (jsonl) report is supported.
+"""
+
+from __future__ import annotations
+
+import time, queue, pathlib, itertools, threading, collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import metrics
+
+SCAN_WORKERS = 4
+PATCH_WORKERS = 2
+QUEUE_SIZE = 64
+
+def log(msg): print(f"[PIPELINE] {msg}", flush=True)
+
+class PatchQueue:
+    """Bounded priority queue of (fix item, ref), highest risk first; put() blocks while full."""
+
+    _DONE = float("inf")
+
+    def __init__(self, maxsize:int=QUEUE_SIZE):
+        self._q = queue.PriorityQueue(maxsize)
+        self._seq = itertools.count()   # FIFO among equal risk, never compares the dicts
+
+    def put(self, item:dict, ref:Optional[str]=None)->None:
+        self._q.put((-float(item.get("risk_score", 0.0)), next(self._seq), (item, ref)))
+
+    def get(self):
+        """(item, ref), or None once close() has been reached."""
+        return self._q.get()[2]
+
+    def close(self, workers:int)->None:
+        # Sentinels sort after every real item, so queued work is drained first.
+        for _ in range(workers):
+            self._q.put((self._DONE, next(self._seq), None))
+
+def _patchable(item:dict)->bool:
+    return item["status"] == "pending" and item["action"] in ("add", "replace")
+
+def _patch_worker(q:PatchQueue, token:str, policy:dict, templates, tmpdir:pathlib.Path,
+                  t0:float, first:Dict[str, float])->None:
+    from .scw_core import patch_item, repo_lock
+    while True:
+        job = q.get()
+        if job is None:
+            return
+        item, ref = job
+        with repo_lock(item["repo"]):
+            try:
+                patch_item(token, item, policy, templates, tmpdir, ref)
+            except Exception as e:
+                log(f"{item['repo']}:{item['path']}: {type(e).__name__}: {e}")
+                item["status"] = "pending"
+        metrics.inc("pipeline_patched", status=item["status"])
+        if item["status"] == "done":
+            first.setdefault("done", time.perf_counter() - t0)
+
+def run(root:pathlib.Path, token:str, orgs:List[str], policy:dict, scan_workers:int=SCAN_WORKERS,
+        patch_workers:int=PATCH_WORKERS, queue_size:int=QUEUE_SIZE, critical_only:bool=False)->dict:
+    """Scan and patch concurrently into reports/; returns counts and timings."""
+    from . import report as scan_report, templating
+    from .org_health import iter_org_repos, scan_repo, _fix_items
+    from .scw_core import WORKDIR
+    from .snapshot import Snapshot, snapshot_path
+
+    if scan_report.report_format() != "jsonl":
+        raise SystemExit("scan-patch writes the streaming report; unset SCW_REPORT_FORMAT=json.")
+    threshold = float((policy.get("risk") or {}).get("warn_score_threshold", 0.0))
+    (root/"reports").mkdir(exist_ok=True)
+    out_path = scan_report.report_path(root)
+    snap_path = snapshot_path(root)
+    snap = Snapshot(snap_path) if snap_path else None
+    WORKDIR.mkdir(parents=True, exist_ok=True)
+    templates = templating.load(policy)
+
+    q = PatchQueue(queue_size)
+    t0 = time.perf_counter()
+    first: Dict[str, float] = {}
+    patchers = [threading.Thread(target=_patch_worker, name=f"scw-patch-{i}", daemon=True,
+                                 args=(q, token, policy, templates, WORKDIR, t0, first))
+                for i in range(patch_workers)]
+    for t in patchers:
+        t.start()
+
+    items: List[dict] = []
+    later: List[tuple] = []
+    critical = 0
+    scan_s = None
+
+    def consume(rep:dict)->None:
+        nonlocal critical
+        w.repo(rep)
+        for item in _fix_items(rep["repo"], rep):
+            w.fix(item)
+            items.append(item)
+            if not _patchable(item):
+                continue
+            if float(item.get("risk_score", 0.0)) >= threshold:
+                critical += 1
+                q.put(item, rep["ref"])
+            else:
+                later.append((item, rep["ref"]))
+
+    try:
+        with scan_report.ReportWriter(out_path, rotate_prev=True, policy_epoch=policy["policy_epoch"],
+                                      orgs=orgs) as w, \
+                ThreadPoolExecutor(scan_workers, thread_name_prefix="scw-scan") as pool:
+            # At most 2x scan_workers repos in flight; results are consumed in repo order,
+            # so the report comes out the same as a serial org-scan.
+            inflight = collections.deque()
+            for full in iter_org_repos(token, orgs, policy):
+                inflight.append(pool.submit(scan_repo, token, full, policy, snap))
+                while len(inflight) >= 2 * scan_workers:
+                    consume(inflight.popleft().result())
+            while inflight:
+                consume(inflight.popleft().result())
+        scan_s = time.perf_counter() - t0
+        log(f"Scan done in {scan_s:.1f}s: {len(items)} fix items, {critical} queued during the scan")
+        if not critical_only:
+            for item, ref in later:
+                q.put(item, ref)
+    finally:
+        # Also on failure: let the patch workers finish what is queued, then stop.
+        q.close(patch_workers)
+        for t in patchers:
+            t.join()
+        if snap:
+            # Only a completed scan may forget repos it did not see.
+            pruned = snap.prune() if scan_s is not None else 0
+            snap.close()
+    if snap:
+        log(f"Snapshot {snap_path} updated" + (f" ({pruned} repos no longer scanned)" if pruned else ""))
+    scan_report.rewrite_fix_items(out_path, items)
+    total_s = time.perf_counter() - t0
+    statuses = collections.Counter(i["status"] for i in items)
+    result = {"fix_items": len(items), "critical": critical, "statuses": dict(statuses),
+              "scan_seconds": round(scan_s, 3), "total_seconds": round(total_s, 3),
+              "first_fix_seconds": round(first["done"], 3) if "done" in first else None}
+    first_fix = f"first fix after {result['first_fix_seconds']}s" if "done" in first else "no fix landed"
+    log(f"Wrote {out_path}: {dict(statuses)}; {first_fix}, all done in {total_s:.1f}s")
+    return result
@@ -0,0 +1,324 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/planner.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Planner (v1)
+
+Will the next org-scan / autopatch fit the rate limit and the job timeout?
+`plan` estimates per phase, from what is already on disk:
+- scan:      repos and index coverage from the snapshot (snapshot.py; the
+             report's repo records otherwise) -> API calls
+- autopatch: a dry run over the current fix queue (scw_core.plan_item: secrets,
+             render, compare with the default branch; nothing is cloned or
+             pushed) -> API calls, clones, pushes, and every intended change
+Wall time uses per-call / per-clone / per-push costs measured by the previous
+command (reports/scw_trace.json), with defaults for anything not measured yet.
+
+The budget is GET /rate_limit core.remaining minus a reserve, and the job
+timeout. Autopatch work is trimmed to it, highest risk first, and the chosen
+items are written to reports/scw_plan.json. `autopatch --plan` (SCW_PLAN) then
+patches only those. When the scan alone does not fit, shards_needed says how
+many scw_org_scan_sharded.yml shards would.
+"""
+
+from __future__ import annotations
+
+import json, math, time, difflib, pathlib, collections, datetime as dt
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+
+PLAN_NAME = "scw_plan.json"
+PHASES = ("scan", "autopatch")
+# Seconds per unit when the last trace did not measure it (GitHub-hosted runner, api.github.com).
+DEFAULT_COSTS = {"api_s": 0.25, "clone_s": 3.0, "push_s": 2.0, "git_s": 0.3}
+# Trace spans that are exactly one API call each.
+API_SPANS = ("get_file", "remote_compare", "create_pr")
+GIT_LOCAL_SPANS = ("git_checkout", "git_add", "git_commit")
+TIME_MARGIN = 0.9
+
+def log(msg): print(f"[PLAN] {msg}", flush=True)
+
+def item_key(item:dict)->Tuple[str, str, str]:
+    """What a plan selects by (autopatch(only=...) matches the same tuple)."""
+    return (item.get("repo"), item["path"], item["action"])
+
+def calibrate(root:pathlib.Path)->Dict[str, object]:
+    """Per-unit costs from the last command's trace, DEFAULT_COSTS for the rest."""
+    costs: Dict[str, object] = dict(DEFAULT_COSTS)
+    measured = []
+    path = root/"reports"/"scw_trace.json"
+    try:
+        spans = json.loads(path.read_text(encoding="utf-8")).get("spans", {})
+    except (OSError, ValueError):
+        spans = {}
+    calls = sum(spans[n]["count"] for n in API_SPANS if n in spans)
+    if calls:
+        costs["api_s"] = sum(spans[n]["total_ms"] for n in API_SPANS if n in spans) / calls / 1000
+        measured.append("api_s")
+    for key, span in (("clone_s", "git_clone"), ("push_s", "git_push")):
+        if span in spans and spans[span]["count"]:
+            costs[key] = spans[span]["mean_ms"] / 1000
+            measured.append(key)
+    if all(n in spans for n in GIT_LOCAL_SPANS):
+        costs["git_s"] = sum(spans[n]["mean_ms"] for n in GIT_LOCAL_SPANS) / 1000
+        measured.append("git_s")
+    costs = {k: round(v, 4) for k, v in costs.items()}
+    costs["measured"] = measured
+    return costs
+
+def rate_limit(token:str)->Optional[dict]:
+    """core {limit, remaining, reset} from GET /rate_limit (which does not count against it); None if unavailable."""
+    from .org_health import API, gh_headers, gh_request
+    try:
+        r = gh_request("GET", f"{API}/rate_limit", headers=gh_headers(token), timeout=30)
+        if r.status_code >= 300:
+            return None
+        data = r.json()
+        core = data.get("resources", {}).get("core") or data.get("rate")
+        return {"limit": int(core["limit"]), "remaining": int(core["remaining"]), "reset": int(core["reset"])}
+    except Exception:
+        return None
+
+def _scan_state(root:pathlib.Path, repos:List[dict], policy:dict, db:Optional[pathlib.Path])->Tuple[str, List[Tuple[str, bool, int]]]:
+    """(source, [(repo, index_present, files read one by one)]) from the snapshot, else the report."""
+    from .snapshot import Snapshot, snapshot_path
+    db = db or snapshot_path(root)
+    if db and pathlib.Path(db).exists():
+        with Snapshot(db, readonly=True) as snap:
+            return "snapshot", [(full, idx, sum(1 for o in observed.values() if o["source"] == "tree"))
+                                for full, _, idx, _, observed in snap.iter_repos()]
+    n_required = len(policy.get("required_files", []))
+    # Without a snapshot: indexed repos are assumed to need no per-file reads.
+    return "report", [(r["repo"], bool(r.get("index_present")), 0 if r.get("index_present") else n_required)
+                      for r in repos]
+
+def estimate_scan(state:List[Tuple[str, bool, int]], items:List[dict], policy:dict, costs:dict)->dict:
+    """API calls of a full org-scan over the repos in `state`."""
+    per_org = collections.Counter(full.split("/")[0] for full, _, _ in state)
+    listing = sum(max(1, math.ceil(n / 100)) for n in per_org.values())
+    index_calls = len(state) if (policy.get("scan") or {}).get("index_first") else 0
+    repo_calls = len(state) + index_calls + sum(tree for _, _, tree in state)
+    secret_calls = 0
+    if (policy.get("secrets") or {}).get("check"):
+        names = {n for f in policy.get("required_files", []) for n in f.get("depends_on_secrets") or []}
+        short = {i["repo"] for i in items if i.get("secrets_missing")}
+        secret_calls = len(per_org) * (1 + len(names)) + len(short)
+    calls = listing + repo_calls + secret_calls
+    return {"repos": len(state), "api_calls": calls,
+            "detail": {"listing": listing, "per_repo": repo_calls, "secrets": secret_calls},
+            "seconds": round(calls * costs["api_s"], 1)}
+
+def _line_changes(old:Optional[str], new:str)->Tuple[int, int]:
+    a = (old or "").splitlines()
+    b = new.splitlines()
+    added = removed = 0
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag != "equal":
+            removed += i2 - i1
+            added += j2 - j1
+    return added, removed
+
+def dry_run(token:str, items:Iterable[dict], policy:dict, repo_refs:Dict[str, str],
+            offline:bool=False)->List[dict]:
+    """
+    Every change autopatch would make, without cloning or pushing: one record per
+    add/replace item that is not done, with the decision and (for writes) the
+    rendered blob and its line delta against the default branch. offline: no
+    API calls, every rendered item counts as a write.
+    """
+    from . import templating, secret_check
+    from .scw_core import plan_item
+    templates = templating.load(policy)
+    secrets = secret_check.settings(policy)
+    changes = []
+    for item in sorted(items, key=lambda i: (-float(i.get("risk_score", 0.0)), i.get("repo", ""), i["path"])):
+        probe = dict(item)   # plan_item may note secrets_missing; the queue stays untouched
+        if offline:
+            probe.pop("depends_on_secrets", None)
+        # The report's refs spare the dry run a /repos call per item (offline: "main" if unknown).
+        ref = repo_refs.get(item.get("repo")) or ("main" if offline else None)
+        decision, content, ref = plan_item(token, probe, policy, templates, ref, remote=False)
+        if decision == "skip":
+            continue
+        rec = {"repo": item.get("repo"), "path": item["path"], "action": item["action"],
+               "reason": item.get("reason"), "risk_score": float(item.get("risk_score", 0.0)),
+               "ref": ref, "ref_known": bool(item.get("ref")), "decision": decision}
+        if secrets["check"] and probe.get("depends_on_secrets"):
+            # What the recheck costs autopatch, from the listings this dry run just fetched.
+            org_calls, repo_calls = secret_check.cache(policy).calls(
+                token, item["repo"], probe["depends_on_secrets"], secrets["require"], probe.get("private"))
+            rec["secret_calls"] = {"org": org_calls, "repo": repo_calls,
+                                   "repo_info": 0 if item.get("private") is not None else 1}
+        if content is not None:
+            remote = None
+            if not offline:
+                with metrics.span("remote_compare", repo=item.get("repo"), path=item["path"]):
+                    same, remote = templating.compare_remote(token, item["repo"], item["path"], ref, content)
+                if same:
+                    rec["decision"] = "identical"
+            data = content.encode("utf-8")
+            rec.update(blob_sha=templating.git_blob_sha(data), bytes=len(data))
+            if rec["decision"] == "write":
+                rec["lines_added"], rec["lines_removed"] = _line_changes(remote, content)
+                rec["remote_exists"] = remote is not None if not offline else None
+        changes.append(rec)
+    return changes
+
+def change_cost(rec:dict, cloned:set, costs:dict, secrets_seen:set, check_secrets:bool)->Dict[str, float]:
+    """
+    API calls / clones / pushes / seconds autopatch spends on one dry-run record
+    (updates cloned, secrets_seen). Secrets listings are cached per org / repo,
+    so each is charged the first time it is needed.
+    """
+    api = clones = pushes = 0
+    git_s = 0.0
+    sc = rec.get("secret_calls")
+    if check_secrets and sc:
+        org = rec["repo"].split("/")[0]
+        if org not in secrets_seen:
+            secrets_seen.add(org)
+            api += sc["org"]
+        if sc["repo"] and rec["repo"] not in secrets_seen:
+            secrets_seen.add(rec["repo"])
+            api += sc["repo"]
+        api += sc["repo_info"]   # privacy lookup for items from reports without it
+    if rec["decision"] not in ("pending-secrets", "no-template"):
+        api += (0 if rec["ref_known"] else 1) + 1   # default branch + remote compare
+    if rec["decision"] == "write":
+        if rec["repo"] not in cloned:
+            cloned.add(rec["repo"])
+            clones = 1
+        else:
+            git_s += 2 * costs["git_s"]   # fetch + reset of the existing checkout
+        pushes = 1
+        api += 1   # pull request
+        git_s += costs["git_s"]
+    seconds = api * costs["api_s"] + clones * costs["clone_s"] + pushes * costs["push_s"] + git_s
+    return {"api_calls": api, "clones": clones, "pushes": pushes, "seconds": seconds}
+
+def trim(changes:List[dict], costs:dict, api_budget:Optional[int], seconds_budget:Optional[float],
+         check_secrets:bool)->dict:
+    """
+    Walk the dry-run records highest risk first and select them while the
+    running total stays within both budgets; the first that does not fit ends
+    the selection (strict risk order). Only writes and identical items are
+    selected: the rest would be skipped by autopatch anyway.
+    """
+    cloned, secrets_seen = set(), set()
+    total = {"api_calls": 0, "clones": 0, "pushes": 0, "seconds": 0.0}
+    chosen = {"api_calls": 0, "clones": 0, "pushes": 0, "seconds": 0.0}
+    full = True
+    for rec in changes:
+        c = change_cost(rec, cloned, costs, secrets_seen, check_secrets)
+        for k in total:
+            total[k] += c[k]
+        rec["selected"] = False
+        if rec["decision"] not in ("write", "identical") or not full:
+            continue
+        if ((api_budget is not None and chosen["api_calls"] + c["api_calls"] > api_budget)
+                or (seconds_budget is not None and chosen["seconds"] + c["seconds"] > seconds_budget)):
+            full = False
+            continue
+        rec["selected"] = True
+        for k in chosen:
+            chosen[k] += c[k]
+    decisions = collections.Counter(r["decision"] for r in changes)
+    return {"items": len(changes), "decisions": dict(decisions),
+            "api_calls": total["api_calls"], "clones": total["clones"], "pushes": total["pushes"],
+            "seconds": round(total["seconds"], 1),
+            "selected": {"items": sum(1 for r in changes if r["selected"]), **chosen,
+                         "seconds": round(chosen["seconds"], 1)},
+            "deferred": sum(1 for r in changes if r["decision"] in ("write", "identical") and not r["selected"])}
+
+def make_plan(root:pathlib.Path, token:Optional[str], policy:dict, phases:Iterable[str]=PHASES,
+              offline:bool=False, timeout_minutes:float=360.0, reserve:int=200,
+              db:Optional[pathlib.Path]=None)->dict:
+    """The plan document (see module docstring); nothing is written to GitHub."""
+    from . import report as scan_report
+    phases = [p for p in phases if p]
+    unknown = [p for p in phases if p not in PHASES]
+    if unknown:
+        raise SystemExit(f"plan: unknown phase(s) {', '.join(unknown)} (choose from {', '.join(PHASES)})")
+    report_path = scan_report.report_path(root)
+    if not report_path.exists():
+        raise SystemExit(f"No reports/{report_path.name}; run org-scan first.")
+    _, repos, items = scan_report.load_report(report_path)
+    costs = calibrate(root)
+    check_secrets = bool((policy.get("secrets") or {}).get("check")) and not offline
+
+    doc = {"sig": "scwplan:v1", "generated_utc": dt.datetime.utcnow().isoformat()+"Z",
+           "report": report_path.name, "phases": {}, "costs": costs, "offline": offline}
+    t0 = time.perf_counter()
+    if "autopatch" in phases:
+        refs = {r["repo"]: r["ref"] for r in repos if r.get("ref")}
+        changes = dry_run(token, items, policy, refs, offline)
+        doc["dry_run_seconds"] = round(time.perf_counter() - t0, 2)
+
+    limits = None if offline else rate_limit(token)
+    api_budget = max(0, limits["remaining"] - reserve) if limits else None
+    seconds_budget = timeout_minutes * 60 * TIME_MARGIN if timeout_minutes else None
+    doc["budget"] = {"rate_limit": limits, "reserve": reserve, "api_calls": api_budget,
+                     "timeout_minutes": timeout_minutes,
+                     "seconds": round(seconds_budget, 1) if seconds_budget is not None else None}
+
+    if "scan" in phases:
+        source, state = _scan_state(root, repos, policy, db)
+        scan = estimate_scan(state, items, policy, costs)
+        scan["source"] = source
+        fits_api = api_budget is None or scan["api_calls"] <= api_budget
+        fits_time = seconds_budget is None or scan["seconds"] <= seconds_budget
+        scan["fits"] = fits_api and fits_time
+        if not scan["fits"]:
+            need = [scan["api_calls"] / max(1, api_budget) if api_budget is not None else 0,
+                    scan["seconds"] / seconds_budget if seconds_budget else 0]
+            scan["shards_needed"] = max(2, math.ceil(max(need)))
+        doc["phases"]["scan"] = scan
+        # What the scan spends is gone before autopatch starts.
+        if api_budget is not None:
+            api_budget = max(0, api_budget - scan["api_calls"])
+        if seconds_budget is not None:
+            seconds_budget = max(0.0, seconds_budget - scan["seconds"])
+
+    if "autopatch" in phases:
+        doc["phases"]["autopatch"] = trim(changes, costs, api_budget, seconds_budget, check_secrets)
+        doc["selected"] = [list(item_key(r)) for r in changes if r["selected"]]
+        doc["changes"] = changes
+    return doc
+
+def write_plan(root:pathlib.Path, doc:dict)->pathlib.Path:
+    (root/"reports").mkdir(exist_ok=True)
+    out = root/"reports"/PLAN_NAME
+    out.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    b = doc["budget"]
+    log(f"Budget: {b['api_calls'] if b['api_calls'] is not None else 'unknown'} API calls "
+        f"(reserve {b['reserve']}), {b['seconds']}s")
+    scan = doc["phases"].get("scan")
+    if scan:
+        log(f"scan: {scan['repos']} repos, ~{scan['api_calls']} API calls, ~{scan['seconds']}s"
+            + ("" if scan["fits"] else f"; does not fit, needs {scan['shards_needed']} shards"))
+    ap = doc["phases"].get("autopatch")
+    if ap:
+        sel = ap["selected"]
+        log(f"autopatch: {ap['decisions']}; all: ~{ap['api_calls']} API calls, {ap['clones']} clones, "
+            f"{ap['pushes']} pushes, ~{ap['seconds']}s")
+        log(f"autopatch: selected {sel['items']} items (~{sel['api_calls']} API calls, ~{sel['seconds']}s), "
+            f"deferred {ap['deferred']}")
+    log(f"Wrote {out}")
+    return out
+
+def load_selection(path:pathlib.Path)->set:
+    """Item keys a plan selected, for autopatch(only=...)."""
+    doc = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    if doc.get("sig") != "scwplan:v1":
+        raise SystemExit(f"{path}: not an SCW plan")
+    return {tuple(k) for k in doc.get("selected", [])}
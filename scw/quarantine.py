@@ -0,0 +1,102 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/quarantine.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Workflow Auto-Quarantine (v1)
+
+Moves workflows that fail to parse into .github/workflows/_quarantine_auto/
+and drops a dispatch-only stub in their place so the Actions UI stays usable.
+Parse status comes from the shared scw.wfload cache. With `--mode hash|git`
+only workflows changed since the last recorded state (plus those recorded as
+still_broken) are validated.
+
+Usage:
+  python -m scw.quarantine [--mode git]
+"""
+
+from __future__ import annotations
+
+import argparse, datetime as dt, json, os, pathlib, shutil
+from typing import Any, Dict, Optional
+
+from .wfload import (CACHE_PATH, LATEST_INDEX_PATH, SWEEP_MODES, ParseCache,
+                     load_latest_index, select_changed, workflow_paths)
+
+def log(msg): print(f"[QUARANTINE] {msg}", flush=True)
+
+STUB = """name: {stem} (quarantined)
+
+on:
+  workflow_dispatch: {{}}
+
+jobs:
+  disabled:
+    runs-on: ubuntu-latest
+    steps:
+      - run: echo 'Original workflow moved to .github/workflows/_quarantine_auto/{name} due to YAML parse error ({err}).'
+"""
+
+def quarantine(wf_dir:pathlib.Path, cache:ParseCache, mode:str="full",
+               index_path:pathlib.Path=LATEST_INDEX_PATH)->Dict[str, Any]:
+    q_dir = wf_dir / "_quarantine_auto"
+    quarantined, ok_files = [], []
+
+    # Skip helper / quarantine files
+    paths = [p for p in workflow_paths(wf_dir) if not p.name.startswith("_")]
+    todo, unchanged = select_changed(paths, mode,
+                                     load_latest_index(index_path) if mode != "full" else None,
+                                     recheck_status=("still_broken",))
+
+    for p in todo:
+        err = cache.status(p.read_text(encoding="utf-8", errors="ignore"))
+        if err is None:
+            ok_files.append(p.name)
+            continue
+
+        q_dir.mkdir(parents=True, exist_ok=True)
+        dest = q_dir / p.name
+        shutil.move(str(p), dest)
+        p.write_text(STUB.format(stem=p.stem, name=p.name, err=err), encoding="utf-8")
+        quarantined.append({"file": p.name, "error": err, "quarantine_path": str(dest)})
+
+    return {
+        "generated_at": dt.datetime.utcnow().isoformat() + "Z",
+        "quarantined": quarantined,
+        "ok": ok_files,
+        "skipped": [p.name for p in unchanged],
+    }
+
+def main(argv: Optional[list] = None) -> int:
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    parser = argparse.ArgumentParser(description="SCW Workflow Auto-Quarantine")
+    parser.add_argument("--workflows-dir", default=str(root/".github"/"workflows"))
+    parser.add_argument("--report", default=str(root/".steg"/"state"/"workflows_auto_quarantine.json"))
+    parser.add_argument("--cache", default=str(root/CACHE_PATH))
+    parser.add_argument("--mode", choices=SWEEP_MODES, default="full",
+                        help="full: validate every file; hash/git: only files changed since last recorded state")
+    parser.add_argument("--latest-index", default=str(root/LATEST_INDEX_PATH))
+    args = parser.parse_args(argv)
+
+    cache = ParseCache(pathlib.Path(args.cache) if args.cache else None)
+    report = quarantine(pathlib.Path(args.workflows_dir), cache, args.mode,
+                        pathlib.Path(args.latest_index))
+    cache.save()
+
+    out = pathlib.Path(args.report)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    # Also print to logs for quick visibility
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
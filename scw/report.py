@@ -0,0 +1,362 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/report.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW streaming org-scan report (v1)
+
+One JSON object per line, gzip-compressed when the path ends in .gz:
+  {"type":"header", "sig":"orgscan-stream:v1", "generated_utc", "policy_epoch", ...}
+  {"type":"repo",   repo, ref, scanned_utc, notes, index_present, structure/logic counts}
+  {"type":"fix",    one fix queue item (same fields as org_scan.json items)}
+  {"type":"footer", "repos", "fix_items", "completed_utc"}
+Records are written as scanning proceeds (to <path>.partial, renamed into
+place by close()), and read back lazily; a missing footer means the scan
+did not finish.
+
+Sharded scans (org-scan --shard i/N) write org_scan.shard-<i>-of-<N>.jsonl.gz;
+merge checks that all N shards are present and complete and writes the
+canonical report: repos by name, fix items by risk (highest first, then
+repo, path), so the result does not depend on shard timing.
+
+scan-diff compares two reports keyed by (repo, path) and writes only
+new / resolved / changed fix items plus added / removed repos, so
+consumers process deltas instead of whole reports.
+
+CLI:
+  python -m scw.report diff OLD NEW [--out reports/org_scan_diff.jsonl]
+  python -m scw.report to-json REPORT [--out reports/org_scan.json]
+  python -m scw.report merge SHARD... [--out reports/org_scan.jsonl.gz]
+"""
+
+from __future__ import annotations
+
+import os, sys, json, gzip, argparse, pathlib, datetime as dt
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SIG = "orgscan-stream:v1"
+DIFF_SIG = "orgscan-diff:v1"
+REPORT_NAME = "org_scan.jsonl.gz"
+PREV_NAME = "org_scan.prev.jsonl.gz"
+DIFF_NAME = "org_scan_diff.jsonl"
+LEGACY_NAME = "org_scan.json"
+SHARD_GLOB = "org_scan.shard-*-of-*.jsonl.gz"
+# Fields that make a fix item "changed" between scans (timestamps excluded).
+ITEM_FIELDS = ("action", "reason", "status", "wanted_epoch", "wanted_version", "risk_score")
+
+def log(msg): print(f"[REPORT] {msg}", flush=True)
+
+def report_format()->str:
+    """SCW_REPORT_FORMAT: "jsonl" (streaming, default) or "json" (legacy org_scan.json)."""
+    fmt = os.getenv("SCW_REPORT_FORMAT", "jsonl").strip().lower()
+    return fmt if fmt in ("jsonl", "json") else "jsonl"
+
+def report_path(root:pathlib.Path)->pathlib.Path:
+    return root/"reports"/(REPORT_NAME if report_format() == "jsonl" else LEGACY_NAME)
+
+def rotate(path:pathlib.Path)->Optional[pathlib.Path]:
+    """Keep the previous streaming report as org_scan.prev.jsonl.gz for scan-diff."""
+    if not path.exists():
+        return None
+    prev = path.with_name(PREV_NAME)
+    os.replace(path, prev)
+    return prev
+
+def _open(path:pathlib.Path, mode:str, gz:Optional[bool]=None):
+    if str(path).endswith(".gz") if gz is None else gz:
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(path, mode, encoding="utf-8")
+
+def repo_record(rep:dict)->dict:
+    """Repo report as stored in the stream: queues replaced by their sizes (they live in fix records)."""
+    if "structure_queue" not in rep and "logic_queue" not in rep:
+        return rep
+    rec = {k: v for k, v in rep.items() if k not in ("structure_queue", "logic_queue")}
+    rec["structure_items"] = len(rep.get("structure_queue", []))
+    rec["logic_items"] = len(rep.get("logic_queue", []))
+    return rec
+
+class ReportWriter:
+    """
+    Append-only JSONL writer; the file appears at `path` only on close().
+    rotate_prev: the report it replaces becomes org_scan.prev.jsonl.gz at that
+    moment, so a failed or interrupted scan leaves the current one in place.
+    """
+
+    def __init__(self, path:pathlib.Path, header:Optional[dict]=None, rotate_prev:bool=False, **fields):
+        self.path = pathlib.Path(path)
+        self.rotate_prev = rotate_prev
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(self.path.name + ".partial")
+        self._f = _open(self._tmp, "w", gz=self.path.name.endswith(".gz"))
+        self.repos = self.fix_items = self.records = 0
+        self.raw(header or {"type": "header", "sig": SIG,
+                            "generated_utc": dt.datetime.utcnow().isoformat()+"Z", **fields})
+
+    def raw(self, rec:dict)->None:
+        """Write one already-shaped record."""
+        self._f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self.records += 1
+        t = rec.get("type")
+        if t == "repo": self.repos += 1
+        elif t == "fix": self.fix_items += 1
+
+    def repo(self, rep:dict)->None:
+        self.raw({"type": "repo", **repo_record(rep)})
+
+    def fix(self, item:dict)->None:
+        self.raw({"type": "fix", **item})
+
+    def close(self)->None:
+        self.raw({"type": "footer", "repos": self.repos, "fix_items": self.fix_items,
+                  "records": self.records + 1, "completed_utc": dt.datetime.utcnow().isoformat()+"Z"})
+        self._f.close()
+        if self.rotate_prev:
+            rotate(self.path)
+        os.replace(self._tmp, self.path)
+
+    def abort(self)->None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None: self.close()
+        else: self.abort()
+
+def read_records(path:pathlib.Path)->Iterator[dict]:
+    with _open(pathlib.Path(path), "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _strip(rec:dict)->dict:
+    rec = dict(rec); rec.pop("type", None)
+    return rec
+
+def iter_fix_items(path:pathlib.Path)->Iterator[dict]:
+    for rec in read_records(path):
+        if rec.get("type") == "fix":
+            yield _strip(rec)
+
+def iter_repos(path:pathlib.Path)->Iterator[dict]:
+    for rec in read_records(path):
+        if rec.get("type") == "repo":
+            yield _strip(rec)
+
+def read_header(path:pathlib.Path)->dict:
+    for rec in read_records(path):
+        return rec if rec.get("type") == "header" else {}
+    return {}
+
+def rewrite_fix_items(path:pathlib.Path, items:Iterable[dict])->None:
+    """Replace the fix records of a report (e.g. after autopatch updated statuses)."""
+    path = pathlib.Path(path)
+    with ReportWriter(path, header=read_header(path) or None) as w:
+        for rec in read_records(path):
+            if rec.get("type") == "repo":
+                w.raw(rec)
+        for item in items:
+            w.fix(item)
+
+def shard_name(i:int, n:int)->str:
+    return f"org_scan.shard-{i:03d}-of-{n:03d}.jsonl.gz"
+
+def _fix_order(item:dict)->tuple:
+    return (-float(item.get("risk_score", 0.0)), item.get("repo", ""), item.get("path", ""))
+
+def merge_shards(paths:Iterable[pathlib.Path], out_path:pathlib.Path, fmt:str="jsonl")->dict:
+    """
+    Combine complete shard reports into one canonical report at `out_path`
+    (JSONL stream, or the legacy org_scan.json document when fmt == "json").
+    """
+    paths = sorted(pathlib.Path(p) for p in paths)
+    if not paths:
+        raise SystemExit("merge: no shard reports found")
+    headers, repos, items = [], [], []
+    for p in paths:
+        header, footer = {}, None
+        for rec in read_records(p):
+            t = rec.get("type")
+            if t == "header": header = rec
+            elif t == "repo": repos.append(_strip(rec))
+            elif t == "fix": items.append(_strip(rec))
+            elif t == "footer": footer = rec
+        if footer is None:
+            raise SystemExit(f"merge: {p} is incomplete (no footer)")
+        if "shards" not in header:
+            raise SystemExit(f"merge: {p} is not a shard report")
+        headers.append(header)
+
+    n = {h["shards"] for h in headers}
+    epochs = {h.get("policy_epoch") for h in headers}
+    if len(n) != 1 or len(epochs) != 1:
+        raise SystemExit(f"merge: shards disagree (shard counts {sorted(n)}, policy epochs {sorted(epochs)})")
+    n = n.pop()
+    have = sorted(h["shard"] for h in headers)
+    if have != list(range(n)):
+        raise SystemExit(f"merge: expected shards 0..{n-1}, got {have}")
+
+    header = {"policy_epoch": epochs.pop(), "orgs": headers[0].get("orgs"), "merged_shards": n,
+              "generated_utc": max(h.get("generated_utc", "") for h in headers)}
+    write_report(out_path, header, repos, items, fmt)
+    log(f"merge: {n} shards -> {out_path} ({len(repos)} repos, {len(items)} fix items)")
+    return {"shards": n, "repos": len(repos), "fix_items": len(items)}
+
+def write_report(out_path:pathlib.Path, header:dict, repos:List[dict], items:List[dict], fmt:str="jsonl")->None:
+    """Canonical report: repos by name, fix items by risk; stream or legacy document."""
+    repos = sorted(repos, key=lambda r: r.get("repo", ""))
+    items = sorted(items, key=_fix_order)
+    header = {k: v for k, v in header.items() if k not in ("type", "sig")}
+    if fmt == "json":
+        doc = {"sig": "orgscan:v4", "generated_utc": header.get("generated_utc"),
+               "policy_epoch": header.get("policy_epoch"), "repos": repos,
+               "fix_queue": {"sig": "fixqueue:v1", "items": items}}
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out_path.with_name(out_path.name + ".partial")
+        tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        os.replace(tmp, out_path)
+    else:
+        with ReportWriter(out_path, header={"type": "header", "sig": SIG, **header}) as w:
+            for r in repos: w.repo(r)
+            for it in items: w.fix(it)
+
+def load_report(path:pathlib.Path)->Tuple[dict, List[dict], List[dict]]:
+    """(header, repos, fix items) from a streaming report or a legacy org_scan.json."""
+    path = pathlib.Path(path)
+    if path.suffix == ".json":
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        header = {"generated_utc": doc.get("generated_utc"), "policy_epoch": doc.get("policy_epoch")}
+        return header, list(doc.get("repos", [])), list((doc.get("fix_queue") or {}).get("items", []))
+    header, repos, items = {}, [], []
+    for rec in read_records(path):
+        t = rec.get("type")
+        if t == "header": header = _strip(rec)
+        elif t == "repo": repos.append(_strip(rec))
+        elif t == "fix": items.append(_strip(rec))
+    return header, repos, items
+
+def carry_status(old_items:Iterable[dict], items:List[dict])->int:
+    """Give re-found items the status/last attempt of the same (repo, path, action, reason) before; returns hits."""
+    prev = {(i.get("repo"), i["path"], i["action"], i["reason"]): i for i in old_items}
+    kept = 0
+    for it in items:
+        old = prev.get((it.get("repo"), it["path"], it["action"], it["reason"]))
+        if old is not None:
+            fresh_secrets = "secrets_missing" in it
+            if not (fresh_secrets and "pending-secrets" in (it["status"], old.get("status"))):
+                it["status"] = old.get("status", it["status"])
+            if not fresh_secrets and "secrets_missing" in old:
+                it["secrets_missing"] = old["secrets_missing"]
+                if "private" in old:
+                    it.setdefault("private", old["private"])
+            it["last_attempt_utc"] = old.get("last_attempt_utc")
+            kept += 1
+    return kept
+
+def load_legacy(path:pathlib.Path)->dict:
+    """Materialize a stream as the org_scan.json document (orgscan:v4 shape)."""
+    out = {"sig": "orgscan:v4", "repos": [], "fix_queue": {"sig": "fixqueue:v1", "items": []}}
+    for rec in read_records(path):
+        t = rec.get("type")
+        if t == "header":
+            out["generated_utc"] = rec.get("generated_utc")
+            out["policy_epoch"] = rec.get("policy_epoch")
+        elif t == "repo":
+            out["repos"].append(_strip(rec))
+        elif t == "fix":
+            out["fix_queue"]["items"].append(_strip(rec))
+    return out
+
+def _item_key(item:dict)->Tuple[str, str]:
+    return (item.get("repo", ""), item.get("path", ""))
+
+def _item_sig(item:dict)->tuple:
+    return tuple(item.get(f) for f in ITEM_FIELDS)
+
+def scan_diff(old_path:pathlib.Path, new_path:pathlib.Path)->Iterator[dict]:
+    """
+    Delta records between two reports. Holds one compact signature per old
+    item and per repo name in memory; the new report is streamed.
+    """
+    old_items: Dict[Tuple[str, str], dict] = {}
+    old_repos = set()
+    for rec in read_records(old_path):
+        if rec.get("type") == "fix":
+            old_items[_item_key(rec)] = {f: rec.get(f) for f in ITEM_FIELDS}
+        elif rec.get("type") == "repo":
+            old_repos.add(rec.get("repo"))
+
+    counts = {"new": 0, "resolved": 0, "changed": 0, "repo_added": 0, "repo_removed": 0}
+    new_repos = set()
+    for rec in read_records(new_path):
+        t = rec.get("type")
+        if t == "repo":
+            new_repos.add(rec.get("repo"))
+            if rec.get("repo") not in old_repos:
+                counts["repo_added"] += 1
+                yield {"type": "repo_added", "repo": rec.get("repo")}
+        elif t == "fix":
+            was = old_items.pop(_item_key(rec), None)
+            if was is None:
+                counts["new"] += 1
+                yield {"type": "new", "item": _strip(rec)}
+            elif _item_sig(was) != _item_sig(rec):
+                counts["changed"] += 1
+                yield {"type": "changed", "item": _strip(rec), "was": was}
+    for (repo, path), was in old_items.items():
+        counts["resolved"] += 1
+        yield {"type": "resolved", "repo": repo, "path": path, "was": was}
+    for repo in sorted(old_repos - new_repos):
+        counts["repo_removed"] += 1
+        yield {"type": "repo_removed", "repo": repo}
+    yield {"type": "summary", "sig": DIFF_SIG, "old_report": str(old_path), "new_report": str(new_path),
+           **counts}
+
+def write_diff(old_path:pathlib.Path, new_path:pathlib.Path, out_path:pathlib.Path)->dict:
+    summary = {}
+    with ReportWriter(out_path, kind="diff", old_report=str(old_path), new_report=str(new_path)) as w:
+        for rec in scan_diff(old_path, new_path):
+            if rec["type"] == "summary":
+                summary = rec
+            w.raw(rec)
+    log(f"scan-diff: {summary.get('new',0)} new, {summary.get('resolved',0)} resolved, "
+        f"{summary.get('changed',0)} changed -> {out_path}")
+    return summary
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap = argparse.ArgumentParser(description="SCW streaming org-scan report tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("diff", help="Delta between two reports")
+    d.add_argument("old"); d.add_argument("new")
+    d.add_argument("--out", default=f"reports/{DIFF_NAME}")
+    j = sub.add_parser("to-json", help="Write the legacy org_scan.json document")
+    j.add_argument("report")
+    j.add_argument("--out", default=f"reports/{LEGACY_NAME}")
+    m = sub.add_parser("merge", help="Combine shard reports into the canonical report")
+    m.add_argument("shards", nargs="+")
+    m.add_argument("--out", default=f"reports/{REPORT_NAME}")
+    args = ap.parse_args(argv)
+    if args.cmd == "merge":
+        out = pathlib.Path(args.out)
+        merge_shards(args.shards, out, "json" if out.suffix == ".json" else "jsonl")
+    elif args.cmd == "diff":
+        write_diff(pathlib.Path(args.old), pathlib.Path(args.new), pathlib.Path(args.out))
+    else:
+        pathlib.Path(args.out).write_text(json.dumps(load_legacy(pathlib.Path(args.report)), indent=2),
+                                          encoding="utf-8")
+        log(f"Wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/secret_check.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Secret Check (v1)
+
+Does a repo have the Actions secrets a required file depends on
+(policy required_files[].depends_on_secrets)? Names only, never values:
+- GET /orgs/{org}/actions/secrets                      once per org
+- GET /orgs/{org}/actions/secrets/{name}/repositories  per "selected" secret, once per org
+- GET /repos/{o}/{r}/actions/secrets                   only when org secrets fall short
+Results are cached per org / repo for policy secrets.ttl_seconds
+(SCW_SECRETS_TTL_SECONDS overrides), so a scan pays the org calls once and a
+long-running webhook receiver refreshes them periodically.
+
+policy.yml:
+  secrets:
+    check: true        # run the check during scans / before autopatch
+    require: any       # any: one listed secret suffices (workflows use A || B); all: every one
+    ttl_seconds: 900
+
+Verdicts per fix item: ok, missing (status "pending-secrets", skipped by
+autopatch before any clone) or unknown (token cannot list secrets: the item
+proceeds as before).
+"""
+
+from __future__ import annotations
+
+import os, time, threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import metrics
+
+PER_PAGE = 100
+MAX_PAGES = 10
+
+def log(msg): print(f"[SECRETS] {msg}", flush=True)
+
+def settings(policy:dict)->dict:
+    s = dict(policy.get("secrets") or {})
+    s.setdefault("check", False)
+    s.setdefault("require", "any")
+    s["ttl_seconds"] = float(os.getenv("SCW_SECRETS_TTL_SECONDS") or s.get("ttl_seconds", 900))
+    return s
+
+def _list(token:str, path:str, key:str)->Optional[list]:
+    """All pages of a secrets-style listing; None when the token may not list it (403/404)."""
+    from .org_health import API, gh_headers, gh_request
+    out = []
+    for page in range(1, MAX_PAGES + 1):
+        r = gh_request("GET", f"{API}{path}", headers=gh_headers(token),
+                       params={"per_page": PER_PAGE, "page": page}, timeout=30)
+        if r.status_code in (403, 404):
+            return None
+        if r.status_code >= 300:
+            raise RuntimeError(f"GitHub GET {path} failed: {r.status_code} {r.text[:200]}")
+        data = r.json()
+        batch = data.get(key) or []
+        out.extend(batch)
+        if len(batch) < PER_PAGE or len(out) >= int(data.get("total_count", len(out))):
+            break
+    return out
+
+class SecretCache:
+    """TTL cache of secret names per org (with visibility) and per repo; thread-safe."""
+
+    def __init__(self, ttl:float=900.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()   # guards _key_locks only; fetches hold their key's lock
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._orgs: Dict[str, Tuple[float, Optional[Dict[str, Tuple[str, Optional[Set[str]]]]]]] = {}
+        self._repos: Dict[str, Tuple[float, Optional[Set[str]]]] = {}
+
+    def _fresh(self, entry)->bool:
+        return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def _key_lock(self, kind:str, key:str)->threading.Lock:
+        """One lock per org / repo: a second caller for the same key waits for the fetch, others do not."""
+        with self._lock:
+            return self._key_locks.setdefault((kind, key), threading.Lock())
+
+    def org_secrets(self, token:str, org:str)->Optional[Dict[str, Tuple[str, Optional[Set[str]]]]]:
+        """name -> (visibility, repos for "selected" else None); None when not listable."""
+        with self._key_lock("org", org):
+            entry = self._orgs.get(org)
+            if self._fresh(entry):
+                metrics.inc("cache_hits", cache="org_secrets")
+                return entry[1]
+            metrics.inc("cache_misses", cache="org_secrets")
+            listed = _list(token, f"/orgs/{org}/actions/secrets", "secrets")
+            secrets = None
+            if listed is not None:
+                secrets = {}
+                for s in listed:
+                    vis = s.get("visibility", "all")
+                    repos = None
+                    if vis == "selected":
+                        sel = _list(token, f"/orgs/{org}/actions/secrets/{s['name']}/repositories", "repositories")
+                        repos = {r["full_name"] for r in sel or []}
+                    secrets[s["name"]] = (vis, repos)
+            self._orgs[org] = (time.monotonic(), secrets)
+            return secrets
+
+    def repo_secrets(self, token:str, full:str)->Optional[Set[str]]:
+        with self._key_lock("repo", full):
+            entry = self._repos.get(full)
+            if self._fresh(entry):
+                metrics.inc("cache_hits", cache="repo_secrets")
+                return entry[1]
+            metrics.inc("cache_misses", cache="repo_secrets")
+            listed = _list(token, f"/repos/{full}/actions/secrets", "secrets")
+            names = {s["name"] for s in listed} if listed is not None else None
+            self._repos[full] = (time.monotonic(), names)
+            return names
+
+    def missing(self, token:str, full:str, wanted:List[str], require:str="any",
+                private:Optional[bool]=None)->Optional[List[str]]:
+        """Names still missing for `full` ([] when satisfied); None when it cannot be told."""
+        if not wanted:
+            return []
+        org_secrets = self.org_secrets(token, full.split("/")[0])
+        known = org_secrets is not None
+        have = _org_have(org_secrets, full, wanted, private)
+        if not _satisfied(wanted, have, require):
+            repo_secrets = self.repo_secrets(token, full)
+            if repo_secrets is not None:
+                known = True
+                have |= repo_secrets & set(wanted)
+        if _satisfied(wanted, have, require):
+            return []
+        if not known:
+            return None
+        return [n for n in wanted if n not in have]
+
+    def calls(self, token:str, full:str, wanted:List[str], require:str="any",
+              private:Optional[bool]=None)->Tuple[int, int]:
+        """
+        API calls missing() spends on a cold cache: (org listing incl. one per
+        "selected" secret, paged; repo listing 0 or 1). Answered from the cache.
+        """
+        if not wanted:
+            return 0, 0
+        org_secrets = self.org_secrets(token, full.split("/")[0])
+        if org_secrets is None:
+            return 1, 1
+        org = _pages(len(org_secrets)) + sum(_pages(len(repos or ())) for vis, repos in org_secrets.values()
+                                             if vis == "selected")
+        return org, 0 if _satisfied(wanted, _org_have(org_secrets, full, wanted, private), require) else 1
+
+def _pages(n:int)->int:
+    return min(MAX_PAGES, max(1, -(-n // PER_PAGE)))
+
+def _org_have(org_secrets, full:str, wanted:List[str], private:Optional[bool])->Set[str]:
+    have: Set[str] = set()
+    for name in wanted:
+        vis, repos = (org_secrets or {}).get(name, (None, None))
+        if vis == "all" or (vis == "private" and private is not False) or (repos is not None and full in repos):
+            have.add(name)
+    return have
+
+def _satisfied(wanted:List[str], have:Set[str], require:str)->bool:
+    return bool(have) if require == "any" else all(n in have for n in wanted)
+
+_cache: Optional[SecretCache] = None
+
+def cache(policy:dict)->SecretCache:
+    """Process-wide cache (shared by scan, webhook rescans and autopatch)."""
+    global _cache
+    ttl = settings(policy)["ttl_seconds"]
+    if _cache is None:
+        _cache = SecretCache(ttl)
+    _cache.ttl = ttl
+    return _cache
+
+def annotate(token:str, report:dict, policy:dict, private:Optional[bool]=None)->None:
+    """Set secrets_missing (list, or None if unknown) on structure queue items that depend on secrets."""
+    s = settings(policy)
+    c = cache(policy)
+    for item in report["structure_queue"]:
+        if not item.get("depends_on_secrets"):
+            continue
+        missing = c.missing(token, report["repo"], item["depends_on_secrets"], s["require"], private)
+        item["secrets_missing"] = missing
+        metrics.inc("secret_checks", verdict="unknown" if missing is None else "missing" if missing else "ok")
+
+def recheck(token:str, item:dict, policy:dict)->bool:
+    """Before patching an item flagged pending-secrets: True when its secrets are there now."""
+    s = settings(policy)
+    private = item.get("private")
+    if private is None:
+        # Item from a report without the flag: a public repo must not count "private" org secrets.
+        from .org_health import repo_info
+        try:
+            private = item["private"] = repo_info(token, item["repo"]).get("private")
+        except Exception:
+            private = None
+    missing = cache(policy).missing(token, item["repo"], item.get("depends_on_secrets") or [], s["require"], private)
+    item["secrets_missing"] = missing
+    return not missing
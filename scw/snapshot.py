@@ -0,0 +1,299 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/snapshot.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Org Snapshot (v1)
+
+Local SQLite mirror of what the last scans observed: per repo the default
+branch and whether scw/file_index.json was read, per required file its
+state (present/missing), where it was read from (index/tree), the svmeta
+fields and content hash. Filled as a by-product of org-scan (and webhook
+rescans); nothing here calls the API.
+
+`simulate` replays the snapshot through org_health.classify_repo under a
+candidate policy and writes the fix queue that policy would produce, plus a
+diff against the current report:
+
+  python -m scw.snapshot simulate --policy new_policy.yml
+  python -m scw.snapshot stats
+  python -m scw.snapshot behind --path .github/workflows/scw_orchestrator.yml
+  (or SCW_CMD=simulate SCW_SIMULATE_POLICY=new_policy.yml)
+
+Files a repo was never observed for (a newly required path) cannot be
+judged offline; they are counted as "unobserved" and noted per repo.
+
+Location: SCW_SNAPSHOT_DB (default .steg/state/scw_snapshot.sqlite; "off"
+disables recording). Sharded scans write reports/scw_snapshot.shard-*.sqlite
+next to their report; `merge` unions them into the snapshot.
+"""
+
+from __future__ import annotations
+
+import os, sys, json, time, sqlite3, pathlib, argparse, threading, datetime as dt
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .svmeta import FleetIndex, SvMeta, META_FIELDS
+
+SNAPSHOT_PATH = ".steg/state/scw_snapshot.sqlite"
+SHARD_GLOB = "scw_snapshot.shard-*-of-*.sqlite"
+SIMULATED_NAME = "org_scan.simulated.jsonl.gz"
+SIMULATED_DIFF_NAME = "simulate_diff.jsonl"
+FLEET_INDEX_NAME = "fleet_index.json"
+SCHEMA_VERSION = 1
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS repos (
+  repo TEXT PRIMARY KEY,
+  ref TEXT NOT NULL,
+  index_present INTEGER NOT NULL,
+  scanned_utc TEXT NOT NULL,
+  scan_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+  repo TEXT NOT NULL,
+  path TEXT NOT NULL,
+  state TEXT NOT NULL,
+  source TEXT NOT NULL,
+  content_hash TEXT,
+  {", ".join(f + (" INTEGER" if f == "sv_epoch" else " TEXT") for f in META_FIELDS)},
+  PRIMARY KEY (repo, path)
+) WITHOUT ROWID;
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+def log(msg): print(f"[SNAPSHOT] {msg}", flush=True)
+
+def snapshot_path(root:pathlib.Path)->Optional[pathlib.Path]:
+    """SCW_SNAPSHOT_DB, else .steg/state/scw_snapshot.sqlite; None when recording is off."""
+    env = os.getenv("SCW_SNAPSHOT_DB", "").strip()
+    if env.lower() in ("0", "off", "false", "none"):
+        return None
+    return pathlib.Path(env) if env else root/SNAPSHOT_PATH
+
+def shard_snapshot_name(i:int, n:int)->str:
+    return f"scw_snapshot.shard-{i:03d}-of-{n:03d}.sqlite"
+
+class Snapshot:
+    """One SQLite file. Writes are batched; close() (or leaving the with-block) commits."""
+
+    COMMIT_EVERY = 200
+
+    def __init__(self, path:pathlib.Path, readonly:bool=False):
+        self.path = pathlib.Path(path)
+        if readonly:
+            if not self.path.exists():
+                raise SystemExit(f"No snapshot at {self.path}; run org-scan first.")
+            self.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The webhook worker and pipeline scan workers record from their own threads;
+            # every write (record, drop, merge_from, commit) takes self._lock: one writer at a time.
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            raise SystemExit(f"{self.path}: snapshot schema v{version}, expected v{SCHEMA_VERSION}")
+        self.scan_id = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S.%fZ")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def record(self, full:str, ref:str, index_present:bool, observed:Dict[str, dict],
+               scanned_utc:str)->None:
+        """Replace everything known about one repo with a fresh observation (see org_health.observe_files)."""
+        rows = []
+        for path, obs in observed.items():
+            meta = obs.get("meta")
+            rows.append((full, path, obs["state"], obs["source"], obs.get("hash"),
+                         *((getattr(meta, f) for f in META_FIELDS) if meta else (None,) * len(META_FIELDS))))
+        db = self.db
+        with self._lock:
+            db.execute("INSERT OR REPLACE INTO repos VALUES (?,?,?,?,?)",
+                       (full, ref, int(index_present), scanned_utc, self.scan_id))
+            db.execute("DELETE FROM files WHERE repo=?", (full,))
+            db.executemany(f"INSERT INTO files VALUES ({','.join('?' * (5 + len(META_FIELDS)))})", rows)
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                db.commit()
+                self._pending = 0
+
+    def drop(self, full:str)->None:
+        with self._lock:
+            self.db.execute("DELETE FROM repos WHERE repo=?", (full,))
+            self.db.execute("DELETE FROM files WHERE repo=?", (full,))
+            self._pending += 1
+
+    def prune(self)->int:
+        """After a complete (unsharded) scan: forget repos this scan did not see."""
+        with self._lock:
+            gone = [r for (r,) in self.db.execute("SELECT repo FROM repos WHERE scan_id != ?", (self.scan_id,))]
+        for full in gone:
+            self.drop(full)
+        return len(gone)
+
+    def merge_from(self, paths:Iterable[pathlib.Path])->int:
+        """Copy every repo from other snapshot files (e.g. per-shard ones) into this one."""
+        n = 0
+        for p in paths:
+            with self._lock:
+                self.db.commit()
+                self.db.execute("ATTACH DATABASE ? AS other", (str(p),))
+                try:
+                    self.db.execute("DELETE FROM files WHERE repo IN (SELECT repo FROM other.repos)")
+                    self.db.execute("INSERT OR REPLACE INTO repos SELECT * FROM other.repos")
+                    self.db.execute("INSERT INTO files SELECT * FROM other.files")
+                    n += self.db.execute("SELECT COUNT(*) FROM other.repos").fetchone()[0]
+                    self.db.commit()
+                finally:
+                    self.db.execute("DETACH DATABASE other")
+        return n
+
+    def iter_repos(self)->Iterator[Tuple[str, str, bool, str, Dict[str, dict]]]:
+        """(repo, ref, index_present, scanned_utc, observed) in repo order, observed as from observe_files."""
+        files = self.db.execute(f"SELECT repo, path, state, source, content_hash, {', '.join(META_FIELDS)} "
+                                "FROM files ORDER BY repo")
+        pending = next(files, None)
+        for full, ref, idx, scanned in self.db.execute(
+                "SELECT repo, ref, index_present, scanned_utc FROM repos ORDER BY repo"):
+            observed = {}
+            while pending is not None and pending[0] < full:
+                pending = next(files, None)
+            while pending is not None and pending[0] == full:
+                _, path, state, source, chash, *meta = pending
+                observed[path] = {"state": state, "source": source, "hash": chash,
+                                  "meta": SvMeta(**dict(zip(META_FIELDS, meta))) if state == "present" else None}
+                pending = next(files, None)
+            yield full, ref, bool(idx), scanned, observed
+
+    def fleet_index(self)->FleetIndex:
+        """Newest version per required file across the snapshot and who is behind (svmeta.FleetIndex)."""
+        idx = FleetIndex()
+        for full, path, state, *meta in self.db.execute(f"SELECT repo, path, state, {', '.join(META_FIELDS)} FROM files"):
+            idx.add(full, path, SvMeta(**dict(zip(META_FIELDS, meta))) if state == "present" else None)
+        return idx
+
+    def stats(self)->dict:
+        q = lambda sql: self.db.execute(sql).fetchone()[0]
+        return {"path": str(self.path), "repos": q("SELECT COUNT(*) FROM repos"),
+                "files": q("SELECT COUNT(*) FROM files"),
+                "missing": q("SELECT COUNT(*) FROM files WHERE state='missing'"),
+                "oldest_scan_utc": q("SELECT MIN(scanned_utc) FROM repos"),
+                "newest_scan_utc": q("SELECT MAX(scanned_utc) FROM repos")}
+
+    def commit(self)->None:
+        with self._lock:
+            self.db.commit()
+            self._pending = 0
+
+    def close(self)->None:
+        self.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def simulate(snap:Snapshot, policy:dict)->Tuple[List[dict], List[dict], dict]:
+    """Repo reports and fix items `policy` would produce for the snapshot; zero API calls."""
+    from .org_health import classify_repo, glob_any, _fix_items
+    repos, items = [], []
+    stats = {"repos": 0, "excluded": 0, "unobserved": 0, "actions": {}, "reasons": {}}
+    excludes = policy.get("exclude_repos_globs", [])
+    for full, ref, idx, scanned, observed in snap.iter_repos():
+        if glob_any(full, excludes):
+            stats["excluded"] += 1
+            continue
+        rep = classify_repo(full, ref, idx, observed, policy, scanned)
+        stats["repos"] += 1
+        stats["unobserved"] += sum(1 for n in rep["notes"] if n.startswith("unobserved:"))
+        repos.append(rep)
+        for it in _fix_items(full, rep):
+            stats["actions"][it["action"]] = stats["actions"].get(it["action"], 0) + 1
+            stats["reasons"][it["reason"]] = stats["reasons"].get(it["reason"], 0) + 1
+            items.append(it)
+    stats["fix_items"] = len(items)
+    return repos, items, stats
+
+def run_simulate(root:pathlib.Path, policy_path:pathlib.Path, db:Optional[pathlib.Path]=None,
+                 out_dir:Optional[pathlib.Path]=None)->dict:
+    """simulate + write reports/org_scan.simulated.jsonl.gz and its diff vs the current report."""
+    import yaml
+    from . import report as scan_report
+    policy = yaml.safe_load(pathlib.Path(policy_path).read_text(encoding="utf-8"))
+    out_dir = out_dir or root/"reports"
+    t0 = time.perf_counter()
+    with Snapshot(db or snapshot_path(root) or root/SNAPSHOT_PATH, readonly=True) as snap:
+        repos, items, stats = simulate(snap, policy)
+    stats["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    current = out_dir/scan_report.REPORT_NAME
+    if current.exists():
+        # Keep autopatch progress so the diff shows what the policy changes, not queue resets.
+        scan_report.carry_status(scan_report.iter_fix_items(current), items)
+
+    out = out_dir/SIMULATED_NAME
+    header = {"policy_epoch": policy["policy_epoch"], "simulated_policy": str(policy_path),
+              "generated_utc": dt.datetime.utcnow().isoformat()+"Z"}
+    scan_report.write_report(out, header, repos, items, "jsonl")
+    if current.exists():
+        stats["diff"] = {k: v for k, v in scan_report.write_diff(current, out, out_dir/SIMULATED_DIFF_NAME).items()
+                         if k in ("new", "resolved", "changed", "repo_added", "repo_removed")}
+    log(f"simulate: {stats['repos']} repos, {stats['fix_items']} fix items, "
+        f"{stats['unobserved']} unobserved files in {stats['elapsed_ms']} ms -> {out}")
+    return stats
+
+def fleet_report(idx:FleetIndex, paths:Optional[Iterable[str]]=None)->dict:
+    """Per path: newest known svmeta, counts, and the lagging repos with the version each has."""
+    files = []
+    for path in (paths if paths is not None else idx.paths()):
+        entry = idx.summary(path)
+        behind = idx.behind(path)
+        entry["behind_repos"] = [{"repo": r, "sv_epoch": m.sv_epoch, "sv_version": m.sv_version,
+                                  "sv_build_id": m.sv_build_id}
+                                 for r, m in sorted(behind.items(), key=lambda kv: (kv[1].key, kv[0]))]
+        entry["missing_repos"] = sorted(idx.missing(path))
+        files.append(entry)
+    return {"sig": "fleetindex:v1", "generated_utc": dt.datetime.utcnow().isoformat()+"Z", "files": files}
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap = argparse.ArgumentParser(description="SCW local org snapshot")
+    ap.add_argument("--db", default=None, help="Snapshot file (default SCW_SNAPSHOT_DB or .steg/state/scw_snapshot.sqlite)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("simulate", help="Fix queue a candidate policy would produce, offline")
+    s.add_argument("--policy", required=True)
+    s.add_argument("--out-dir", default=None)
+    sub.add_parser("stats", help="Snapshot size and age")
+    b = sub.add_parser("behind", help="Repos behind the newest known version of a file")
+    b.add_argument("--path", action="append", default=None, help="File path (repeatable; default all)")
+    b.add_argument("--module", default=None, help="All files of this sv_module")
+    args = ap.parse_args(argv)
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    db = pathlib.Path(args.db) if args.db else None
+    if args.cmd in ("stats", "behind"):
+        with Snapshot(db or snapshot_path(root) or root/SNAPSHOT_PATH, readonly=True) as snap:
+            if args.cmd == "stats":
+                print(json.dumps(snap.stats(), indent=2))
+                return 0
+            idx = snap.fleet_index()
+        paths = args.path or (idx.paths_for_module(args.module) if args.module else None)
+        print(json.dumps(fleet_report(idx, paths), indent=2))
+        return 0
+    stats = run_simulate(root, pathlib.Path(args.policy), db,
+                         pathlib.Path(args.out_dir) if args.out_dir else None)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,13 +16,22 @@ svmeta parser + comparator.
 - Extracts STEGVERSE FILE METADATA blocks from YAML/MD/PY.
 - Computes ordering (epoch > semver > build_id).
 - Supports hash-excluding-metadata (optional).
+- FleetIndex: newest known meta per file and which repos lag behind.
+
+SvMeta is slotted: the ordering key is parsed once at construction and
+the low-cardinality strings (file, kind, module, version, build, sig) are
+interned, so fleets of 100k+ metas stay small and sort with
+key=SvMeta.ordering_key without re-parsing anything. Treat instances as
+read-only (key is not recomputed on assignment); not frozen because frozen
+dataclass __init__ costs ~20% of from_text.
 """
 
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import Optional, Dict, Tuple
+import re, sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Dict, List, Set, Tuple
 
 META_RE = re.compile(
     r"(?:^|\n)(?:#|\")\s*===\s*STEGVERSE FILE METADATA\s*===\s*(.*?)"
@@ -30,16 +39,19 @@ META_RE = re.compile(
     re.DOTALL | re.IGNORECASE
 )
 
-KV_RE = re.compile(r"^\s*(sv_[a-z0-9_]+)\s*:\s*(.*?)\s*$", re.IGNORECASE | re.MULTILINE)
+# Keys may sit behind a comment marker (YAML/shell blocks are "# sv_epoch: 9").
+KV_RE = re.compile(r"^\s*(?:#\s*)?(sv_[a-z0-9_]+)\s*:\s*(.*?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+META_FIELDS = ("sv_file", "sv_kind", "sv_module", "sv_version", "sv_build_id", "sv_epoch",
+               "sv_parent_build", "sv_hash", "sv_sig")
 
+@lru_cache(maxsize=1024)
 def parse_semver(v: str) -> Tuple[int, int, int]:
-    try:
-        parts = v.strip().split(".")
-        return (int(parts[0]), int(parts[1]), int(parts[2]))
-    except Exception:
-        return (0, 0, 0)
+    """"4.1.0" -> (4, 1, 0); missing parts and non-numeric parts count as 0."""
+    parts = (v or "").strip().split(".")
+    return tuple(int(x) if x.isdigit() else 0 for x in (parts + ["0", "0", "0"])[:3])
 
-@dataclass
+@dataclass(slots=True)
 class SvMeta:
     sv_file: str = ""
     sv_kind: str = ""
@@ -50,6 +62,15 @@ class SvMeta:
     sv_parent_build: str = ""
     sv_hash: str = ""
     sv_sig: str = ""
+    key: Tuple[int, Tuple[int,int,int], str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        intern = sys.intern
+        self.sv_file = intern(self.sv_file or ""); self.sv_kind = intern(self.sv_kind or "")
+        self.sv_module = intern(self.sv_module or ""); self.sv_version = intern(self.sv_version or "0.0.0")
+        self.sv_build_id = intern(self.sv_build_id or ""); self.sv_sig = intern(self.sv_sig or "")
+        self.sv_epoch = epoch = int(self.sv_epoch or 0)
+        self.key = (epoch, parse_semver(self.sv_version), self.sv_build_id)
 
     @staticmethod
     def from_text(txt: str) -> "SvMeta":
@@ -71,15 +92,110 @@ class SvMeta:
         )
 
     def ordering_key(self) -> Tuple[int, Tuple[int,int,int], str]:
-        return (self.sv_epoch, parse_semver(self.sv_version), self.sv_build_id)
+        return self.key
+
+    def as_dict(self) -> Dict[str, object]:
+        """The svmeta fields (what reports store as meta_found)."""
+        return {f: getattr(self, f) for f in META_FIELDS}
+
+    def __lt__(self, other: "SvMeta") -> bool:
+        return self.key < other.key
 
 def compare(a: SvMeta, b: SvMeta) -> int:
     """Return 1 if a newer, -1 if older, 0 if same."""
-    ka, kb = a.ordering_key(), b.ordering_key()
+    ka, kb = a.key, b.key
     if ka > kb: return 1
     if ka < kb: return -1
     return 0
 
+class _FileVersions:
+    __slots__ = ("metas", "newest", "current", "behind", "missing")
+
+    def __init__(self):
+        self.metas: Dict[str, Optional[SvMeta]] = {}   # repo -> its copy (None: missing)
+        self.newest: Optional[SvMeta] = None
+        self.current: Set[str] = set()                 # repos at the newest key
+        self.behind: Dict[str, SvMeta] = {}            # repos on an older key
+        self.missing: Set[str] = set()
+
+    def place(self, repo: str, meta: Optional[SvMeta]) -> None:
+        if meta is None:
+            self.missing.add(repo)
+        elif self.newest is None or meta.key > self.newest.key:
+            for r in self.current:
+                self.behind[r] = self.metas[r]
+            self.current = {repo}
+            self.newest = meta
+        elif meta.key == self.newest.key:
+            self.current.add(repo)
+        else:
+            self.behind[repo] = meta
+
+class FleetIndex:
+    """
+    Per file path: the newest (epoch, semver, build_id) seen anywhere in the
+    fleet, the repos at it, the repos behind it and the repos missing it.
+    add() is O(1) unless it raises the newest key (the previous holders move
+    to behind) or re-adds the last holder of the newest key (that path is
+    re-derived); newest()/behind()/missing() are lookups.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, _FileVersions] = {}
+        self._modules: Dict[str, Set[str]] = {}
+
+    def add(self, repo: str, path: str, meta: Optional[SvMeta]) -> None:
+        """Record `repo`'s copy of `path` (meta None: the file is missing there); re-adding replaces it."""
+        fv = self._files.get(path)
+        if fv is None:
+            fv = self._files[path] = _FileVersions()
+        if meta is not None and meta.sv_module:
+            self._modules.setdefault(meta.sv_module, set()).add(path)
+        if repo in fv.metas:
+            if repo in fv.current and len(fv.current) == 1:
+                fv.metas[repo] = meta
+                self._rebuild(path)
+                return
+            fv.current.discard(repo)
+            fv.behind.pop(repo, None)
+            fv.missing.discard(repo)
+        fv.metas[repo] = meta
+        fv.place(repo, meta)
+
+    def _rebuild(self, path: str) -> None:
+        old = self._files[path]
+        fv = self._files[path] = _FileVersions()
+        fv.metas = old.metas
+        for repo, meta in old.metas.items():
+            fv.place(repo, meta)
+
+    def paths(self) -> List[str]:
+        return sorted(self._files)
+
+    def paths_for_module(self, module: str) -> List[str]:
+        return sorted(self._modules.get(module, ()))
+
+    def newest(self, path: str) -> Optional[SvMeta]:
+        fv = self._files.get(path)
+        return fv.newest if fv else None
+
+    def behind(self, path: str) -> Dict[str, SvMeta]:
+        """repo -> its (older) meta, for repos not on the newest known version of `path`."""
+        fv = self._files.get(path)
+        return fv.behind if fv else {}
+
+    def missing(self, path: str) -> Set[str]:
+        fv = self._files.get(path)
+        return fv.missing if fv else set()
+
+    def summary(self, path: str) -> Dict[str, object]:
+        fv = self._files.get(path)
+        if fv is None:
+            return {"path": path, "known": False}
+        n = fv.newest
+        return {"path": path, "newest": n.as_dict() if n else None,
+                "current": len(fv.current), "behind": len(fv.behind), "missing": len(fv.missing)}
+
 def strip_metadata(txt: str) -> str:
     """Remove metadata block for stable content hashing."""
     return META_RE.sub("", txt)
@@ -0,0 +1,159 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/templating.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Templating (v1)
+
+Templates autopatch writes into repos, read from the SCW checkout
+(GITHUB_WORKSPACE) once per process and split into literal / variable parts:
+- every required_files[].path, or its required_files[].template source
+  (e.g. template: "scw/templates/SECURITY.md" for path "SECURITY.md")
+- everything under scw/templates/
+- any other structure-allowlisted path, loaded on first use
+
+Variables are written {{NAME}} (GitHub's ${{ ... }} is left alone):
+OWNER, REPO (owner/name), REPO_NAME, MODULE_NAME, DEFAULT_BRANCH and
+SV_BUILD_ID (SCW_BUILD_ID, else the template's own sv_build_id). Unknown
+names are kept as written.
+
+identical(a, b) is the no-op test: same metadata-stripped content hash and
+same sv_epoch / sv_version, so a differing sv_build_id or sv_hash alone never
+causes a write, a commit or a PR.
+"""
+
+from __future__ import annotations
+
+import os, re, fnmatch, hashlib, pathlib, threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from .svmeta import SvMeta, strip_metadata
+
+TEMPLATE_DIR = "scw/templates"
+VAR_RE = re.compile(r"(?<!\$)\{\{\s*([A-Z][A-Z0-9_]*)\s*\}\}")
+
+def log(msg): print(f"[TEMPLATING] {msg}", flush=True)
+
+def body_hash(txt:str)->str:
+    """Same value as org_health.content_hash: sha256 of the text without its metadata block."""
+    return "sha256:" + hashlib.sha256(strip_metadata(txt).encode("utf-8")).hexdigest()
+
+def git_blob_sha(data:bytes)->str:
+    """The sha GitHub reports for a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def identical(a:str, b:str)->bool:
+    if a == b:
+        return True
+    if body_hash(a) != body_hash(b):
+        return False
+    ma, mb = SvMeta.from_text(a), SvMeta.from_text(b)
+    return ma.key[:2] == mb.key[:2]
+
+class Template:
+    """One compiled template: literal strings alternating with (name, as written) variables."""
+    __slots__ = ("source", "parts", "meta", "static")
+
+    def __init__(self, source:str, text:str):
+        self.source = source
+        parts: List[Union[str, Tuple[str, str]]] = []
+        pos = 0
+        for m in VAR_RE.finditer(text):
+            parts.append(text[pos:m.start()])
+            parts.append((m.group(1), m.group(0)))
+            pos = m.end()
+        parts.append(text[pos:])
+        self.parts = tuple(p for p in parts if p != "")
+        self.meta = SvMeta.from_text(text)
+        self.static = text if len(self.parts) <= 1 else None
+
+    def render(self, variables:Dict[str, str])->str:
+        if self.static is not None:
+            return self.static
+        return "".join(p if isinstance(p, str) else variables.get(p[0], p[1]) for p in self.parts)
+
+class TemplateSet:
+    """Templates by target path for one SCW checkout; lookups after the first are memory-only."""
+
+    def __init__(self, root:pathlib.Path, policy:dict):
+        self.root = pathlib.Path(root)
+        self.globs = list(policy.get("structure_allowlist_globs") or [])
+        self.targets = {f["path"]: f.get("template") or f["path"] for f in policy.get("required_files", [])}
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Optional[Template]] = {}
+        for source in self.targets.values():
+            self._load(source)
+        tdir = self.root / TEMPLATE_DIR
+        if tdir.is_dir():
+            for p in sorted(tdir.rglob("*")):
+                if p.is_file():
+                    self._load(p.relative_to(self.root).as_posix())
+
+    def _load(self, source:str)->Optional[Template]:
+        if source not in self._sources:
+            p = self.root / source
+            self._sources[source] = Template(source, p.read_text(encoding="utf-8")) if p.is_file() else None
+        return self._sources[source]
+
+    def get(self, path:str)->Optional[Template]:
+        source = self.targets.get(path)
+        if source is None:
+            if not any(fnmatch.fnmatch(path, g) for g in self.globs):
+                return None
+            source = path
+        with self._lock:
+            return self._load(source)
+
+    def render(self, path:str, full_name:str, ref:str)->Optional[str]:
+        tpl = self.get(path)
+        if tpl is None:
+            return None
+        return tpl.render(variables(full_name, ref, tpl))
+
+    def __len__(self):
+        return sum(1 for t in self._sources.values() if t is not None)
+
+def variables(full_name:str, ref:str, tpl:Optional[Template]=None)->Dict[str, str]:
+    owner, name = full_name.split("/")
+    build = os.getenv("SCW_BUILD_ID") or (tpl.meta.sv_build_id if tpl is not None else "")
+    return {"OWNER": owner, "REPO": full_name, "REPO_NAME": name, "MODULE_NAME": name,
+            "DEFAULT_BRANCH": ref, "SV_BUILD_ID": build}
+
+_sets: Dict[str, TemplateSet] = {}
+_sets_lock = threading.Lock()
+
+def load(policy:dict, root:Optional[pathlib.Path]=None)->TemplateSet:
+    """Process-wide TemplateSet for the SCW checkout (GITHUB_WORKSPACE, else the cwd)."""
+    root = pathlib.Path(root or os.getenv("GITHUB_WORKSPACE", ".")).resolve()
+    with _sets_lock:
+        ts = _sets.get(str(root))
+        if ts is None:
+            ts = _sets[str(root)] = TemplateSet(root, policy)
+            log(f"Loaded {len(ts)} templates from {root}")
+        return ts
+
+def render_item(templates:TemplateSet, item:dict, ref:str)->Optional[str]:
+    """What autopatch would write for a fix item: its inline content (fleet First-Aid) or the rendered template."""
+    if item.get("content") is not None:
+        return item["content"]
+    return templates.render(item["path"], item["repo"], ref)
+
+def compare_remote(token:str, full_name:str, path:str, ref:str, content:str)->Tuple[bool, Optional[str]]:
+    """(file on `ref` already matches `content`, its text or None when absent); blob sha first, then identical()."""
+    from .org_health import get_blob
+    blob = get_blob(token, full_name, path, ref)
+    if blob is None:
+        return False, None
+    same = blob["sha"] == git_blob_sha(content.encode("utf-8")) or identical(blob["text"], content)
+    return same, blob["text"]
+
+def remote_identical(token:str, full_name:str, path:str, ref:str, content:str)->bool:
+    return compare_remote(token, full_name, path, ref, content)[0]
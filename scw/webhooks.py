@@ -0,0 +1,365 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/webhooks.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Webhooks (v1)
+
+Event-driven health updates: instead of a full org-scan, each GitHub event
+re-runs org_health.scan_repo for the one repo it affects and splices the
+result into the persisted report (reports/org_scan.jsonl.gz, or
+org_scan.json with SCW_REPORT_FORMAT=json).
+
+Events:
+- push          default branch only; skipped when the listed commits touch
+                no required file (truncated commit lists always rescan)
+- repository    created/unarchived/publicized/privatized/edited -> rescan,
+                renamed / transferred -> drop old name + rescan,
+                deleted/archived -> drop
+- workflow_run  completed runs of a required workflow file -> rescan
+
+Repos outside SCW_ORGS or matching exclude_repos_globs are ignored. Fix
+items whose (path, action, reason) did not change keep their status and
+last attempt, so an event never resets autopatch progress.
+
+Modes:
+- serve: HTTP receiver (POST /webhook, GET /health). Signatures are checked
+  against SCW_WEBHOOK_SECRET (X-Hub-Signature-256) when it is set. Requests
+  are acknowledged at once; one worker drains the queue, coalescing repeat
+  events for a repo, and writes the report at most every
+  SCW_WEBHOOK_FLUSH_SECONDS.
+- replay: feed recorded deliveries from JSONL files ({"event", "payload"}
+  per line) or single payload files with --event; the report is written once.
+
+  python -m scw.webhooks serve [--host 127.0.0.1] [--port 8787]
+  python -m scw.webhooks replay deliveries.jsonl [...]
+  (or SCW_CMD=webhook-serve / SCW_CMD=webhook-replay SCW_WEBHOOK_REPLAY=...)
+"""
+
+from __future__ import annotations
+
+import os, sys, json, hmac, time, queue, fnmatch, hashlib, pathlib, argparse, threading, datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .org_health import glob_any, load_policy, scan_repo, _fix_items
+from . import metrics, report as scan_report
+from .snapshot import Snapshot, snapshot_path
+
+FLUSH_SECONDS = float(os.getenv("SCW_WEBHOOK_FLUSH_SECONDS", "5"))
+RESCAN_REPO_ACTIONS = {"created", "unarchived", "transferred", "publicized", "privatized", "edited"}
+DROP_REPO_ACTIONS = {"deleted", "archived"}
+# GitHub includes at most 20 commits per push payload.
+PUSH_COMMIT_LIMIT = 20
+
+def log(msg): print(f"[WEBHOOKS] {msg}", flush=True)
+
+def verify_signature(secret:str, body:bytes, header:Optional[str])->bool:
+    if not header or not header.startswith("sha256="):
+        return False
+    want = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(want, header[len("sha256="):])
+
+def _watched_paths(policy:dict)->set:
+    return {f["path"] for f in policy["required_files"]}
+
+def _managed(full:str, policy:dict, orgs:List[str])->bool:
+    if orgs and full.split("/")[0].lower() not in {o.lower() for o in orgs}:
+        return False
+    return not glob_any(full, policy.get("exclude_repos_globs", []))
+
+def plan_event(event:str, payload:dict, policy:dict, orgs:List[str])->List[Tuple[str, str]]:
+    """
+    What an event means for the report: a list of ("scan"|"drop", full_name).
+    Empty when the event cannot change any required file.
+    """
+    repo = payload.get("repository") or {}
+    full = repo.get("full_name")
+    if not full:
+        return []
+    owner = full.split("/")[0]
+    action = payload.get("action")
+    if event == "repository" and action == "transferred":
+        # The old owner/name leaves the report, also when the new owner is not watched.
+        prev = ((payload.get("changes") or {}).get("owner") or {}).get("from") or {}
+        old_owner = (prev.get("organization") or prev.get("user") or {}).get("login")
+        old = f"{old_owner}/{full.split('/')[1]}" if old_owner else None
+        plan = [("drop", old)] if old and old.lower() != full.lower() and _managed(old, policy, orgs) else []
+        return plan + ([("scan", full)] if _managed(full, policy, orgs) else [])
+    if not _managed(full, policy, orgs):
+        return []
+
+    if event == "push":
+        default = repo.get("default_branch") or repo.get("master_branch") or "main"
+        if payload.get("ref") != f"refs/heads/{default}" or payload.get("deleted"):
+            return []
+        commits = payload.get("commits")
+        if commits is None or len(commits) >= PUSH_COMMIT_LIMIT:
+            return [("scan", full)]
+        touched = set()
+        for c in commits:
+            for k in ("added", "modified", "removed"):
+                touched.update(c.get(k) or [])
+        return [("scan", full)] if touched & _watched_paths(policy) else []
+    if event == "repository":
+        if action in DROP_REPO_ACTIONS:
+            return [("drop", full)]
+        if action == "renamed":
+            old = ((payload.get("changes") or {}).get("repository") or {}).get("name", {}).get("from")
+            return ([("drop", f"{owner}/{old}")] if old else []) + [("scan", full)]
+        if action in RESCAN_REPO_ACTIONS:
+            return [("scan", full)]
+        return []
+    if event == "workflow_run":
+        run = payload.get("workflow_run") or {}
+        if action == "completed" and run.get("path") in _watched_paths(policy):
+            return [("scan", full)]
+        return []
+    return []
+
+class ReportState:
+    """The persisted report held in memory, updated one repo at a time."""
+
+    def __init__(self, path:pathlib.Path, fmt:str):
+        self.path, self.fmt = path, fmt
+        self.header: Dict[str, Any] = {}
+        self.repos: Dict[str, dict] = {}
+        self.items: Dict[str, List[dict]] = {}
+        self.dirty = False
+        if path.exists():
+            header, repos, items = scan_report.load_report(path)
+            self.header = header
+            self.repos = {r["repo"]: r for r in repos}
+            for it in items:
+                self.items.setdefault(it["repo"], []).append(it)
+            log(f"Loaded {path} ({len(self.repos)} repos)")
+
+    def update(self, full:str, rep:dict, items:List[dict])->Dict[str, int]:
+        before = len(self.items.get(full, []))
+        kept = scan_report.carry_status(self.items.get(full, []), items)
+        self.repos[full] = rep
+        if items: self.items[full] = items
+        else: self.items.pop(full, None)
+        self.dirty = True
+        return {"items": len(items), "was": before, "kept_status": kept}
+
+    def drop(self, full:str)->bool:
+        hit = self.repos.pop(full, None) is not None
+        hit = self.items.pop(full, None) is not None or hit
+        self.dirty = self.dirty or hit
+        return hit
+
+    def save(self)->None:
+        if not self.dirty:
+            return
+        header = dict(self.header)
+        header["updated_utc"] = dt.datetime.utcnow().isoformat()+"Z"
+        items = [it for lst in self.items.values() for it in lst]
+        scan_report.write_report(self.path, header, list(self.repos.values()), items, self.fmt)
+        self.dirty = False
+        log(f"Wrote {self.path} ({len(self.repos)} repos, {len(items)} fix items)")
+
+class Ingestor:
+    def __init__(self, root:pathlib.Path, token:str, policy:dict, orgs:List[str]):
+        self.token, self.policy, self.orgs = token, policy, orgs
+        fmt = scan_report.report_format()
+        self.state = ReportState(scan_report.report_path(root), fmt)
+        snap_path = snapshot_path(root)
+        self.snapshot = Snapshot(snap_path) if snap_path else None
+        if not self.state.header:
+            self.state.header = {"policy_epoch": policy["policy_epoch"], "orgs": orgs,
+                                 "generated_utc": dt.datetime.utcnow().isoformat()+"Z"}
+
+    def flush(self)->None:
+        self.state.save()
+        if self.snapshot is not None:
+            self.snapshot.commit()
+
+    def close(self)->None:
+        self.flush()
+        if self.snapshot is not None:
+            self.snapshot.close()
+
+    def plan(self, event:str, payload:dict)->List[Tuple[str, str]]:
+        steps = plan_event(event, payload, self.policy, self.orgs)
+        metrics.inc("webhook_events", event=event, outcome="applied" if steps else "ignored")
+        return steps
+
+    def apply(self, op:str, full:str)->None:
+        if op == "drop":
+            if self.state.drop(full):
+                log(f"{full}: removed from report")
+            if self.snapshot is not None:
+                self.snapshot.drop(full)
+            return
+        with metrics.span("webhook_rescan", repo=full):
+            try:
+                rep = scan_repo(self.token, full, self.policy, self.snapshot)
+            except Exception as e:
+                metrics.inc("webhook_errors")
+                log(f"{full}: rescan failed: {e}")
+                return
+        r = self.state.update(full, rep, _fix_items(full, rep))
+        log(f"{full}: rescanned, {r['items']} fix items (was {r['was']}, {r['kept_status']} kept status)")
+
+def iter_deliveries(paths:Iterable[str], event:Optional[str]=None)->Iterator[Tuple[str, dict]]:
+    """(event, payload) from recorded deliveries: JSONL of {"event","payload"} or one payload per file."""
+    for p in paths:
+        text = pathlib.Path(p).read_text(encoding="utf-8")
+        if event:
+            yield event, json.loads(text)
+            continue
+        for n, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if "event" not in rec or "payload" not in rec:
+                raise SystemExit(f"{p}:{n}: expected {{\"event\": ..., \"payload\": ...}} (or pass --event)")
+            yield rec["event"], rec["payload"]
+
+def replay(ing:Ingestor, deliveries:Iterable[Tuple[str, dict]])->Dict[str, int]:
+    """Apply recorded deliveries in order; repeat rescans of one repo collapse to the last one."""
+    ops: Dict[str, str] = {}
+    counts = {"deliveries": 0, "ignored": 0}
+    for event, payload in deliveries:
+        counts["deliveries"] += 1
+        steps = ing.plan(event, payload)
+        if not steps:
+            counts["ignored"] += 1
+        for op, full in steps:
+            ops.pop(full, None)
+            ops[full] = op
+    for full, op in ops.items():
+        ing.apply(op, full)
+    ing.flush()
+    counts["repos"] = len(ops)
+    log(f"replay: {counts['deliveries']} deliveries, {counts['ignored']} ignored, {counts['repos']} repos updated")
+    return counts
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    server_version = "SCW-Webhooks/1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status:int, payload:dict)->None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"ok": True, "queued": self.server.jobs.qsize()})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/webhook":
+            self._send(404, {"error": "not found"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        secret = self.server.secret
+        if secret and not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+            metrics.inc("webhook_rejected", reason="signature")
+            self._send(401, {"error": "bad signature"})
+            return
+        event = self.headers.get("X-GitHub-Event", "")
+        if event == "ping":
+            self._send(200, {"ok": True, "pong": True})
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._send(400, {"error": "body must be JSON"})
+            return
+        steps = self.server.ingestor.plan(event, payload)
+        for step in steps:
+            self.server.jobs.put(step)
+        self._send(202, {"queued": [f"{op}:{full}" for op, full in steps]})
+
+def _worker(server)->None:
+    """Single consumer: coalesces queued steps per repo, flushes the report on a timer."""
+    ing, jobs = server.ingestor, server.jobs
+    last_flush = time.monotonic()
+    while not server.stopping.is_set():
+        try:
+            step = jobs.get(timeout=0.5)
+        except queue.Empty:
+            step = None
+        if step is not None:
+            pending = {step[1]: step[0]}
+            while True:
+                try:
+                    op, full = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                pending.pop(full, None)
+                pending[full] = op
+            for full, op in pending.items():
+                ing.apply(op, full)
+        if ing.state.dirty and time.monotonic() - last_flush >= server.flush_seconds:
+            ing.flush()
+            last_flush = time.monotonic()
+    ing.flush()
+
+def serve(ing:Ingestor, host:str="127.0.0.1", port:int=8787, flush_seconds:float=FLUSH_SECONDS)->None:
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    server.daemon_threads = True
+    server.ingestor, server.jobs = ing, queue.Queue()
+    server.secret = os.getenv("SCW_WEBHOOK_SECRET") or ""
+    server.flush_seconds = flush_seconds
+    server.stopping = threading.Event()
+    worker = threading.Thread(target=_worker, args=(server,), daemon=True)
+    worker.start()
+    if not server.secret:
+        log("SCW_WEBHOOK_SECRET not set; accepting unsigned deliveries")
+    log(f"Listening on http://{host}:{server.server_address[1]}/webhook")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.stopping.set()
+        worker.join()
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap = argparse.ArgumentParser(description="SCW webhook ingestion")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="Run the HTTP receiver")
+    s.add_argument("--host", default=os.getenv("SCW_WEBHOOK_HOST", "127.0.0.1"))
+    s.add_argument("--port", type=int, default=int(os.getenv("SCW_WEBHOOK_PORT", "8787")))
+    r = sub.add_parser("replay", help="Apply recorded deliveries")
+    r.add_argument("files", nargs="+")
+    r.add_argument("--event", default=None, help="Event name when each file is one raw payload")
+    args = ap.parse_args(argv)
+
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    token = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise SystemExit("Missing GH_TOKEN")
+    orgs = [o.strip() for o in os.getenv("SCW_ORGS","StegVerse,StegVerse-Labs").split(",") if o.strip()]
+    ing = Ingestor(root, token, load_policy(root), orgs)
+    with metrics.command(root, f"webhook-{args.cmd}"):
+        try:
+            if args.cmd == "serve":
+                serve(ing, args.host, args.port)
+            else:
+                replay(ing, iter_deliveries(args.files, args.event))
+        finally:
+            ing.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
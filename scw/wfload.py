@@ -0,0 +1,266 @@
+"""
+=== STEGVERSE FILE METADATA ===
+sv_file: scw/wfload.py
+sv_kind: python
+sv_module: SCW
+sv_version: 4.1.0
+sv_build_id: 20261019-000000Z
+sv_epoch: 9
+sv_parent_build: none
+sv_hash: auto
+sv_sig: svmeta:v1
+=== END STEGVERSE FILE METADATA ===
+
+SCW Workflow Loader (v1)
+
+Shared workflow YAML loading for the First-Aid sweep, auto-quarantine and
+AI review jobs:
+- libyaml CSafeLoader when available (pure-Python SafeLoader otherwise)
+- keys read the way GitHub Actions reads them (`on:` stays the string "on",
+  timestamps stay strings)
+- parse results and parse errors cached by content SHA-256 in
+  .steg/state/workflow_parse_cache.json, so each distinct workflow body is
+  parsed once across jobs and runs (the file is persisted with
+  actions/cache, not committed)
+- change selection for incremental sweeps: current file hashes (or
+  `git diff` since the last processed SHA) against the post_checksums in
+  .steg/state/latest_per_workflow.json
+
+Usage:
+  python -m scw.wfload check [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse, copy, hashlib, json, os, pathlib, re, subprocess
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+def log(msg): print(f"[WFLOAD] {msg}", flush=True)
+
+CACHE_PATH = pathlib.Path(".steg") / "state" / "workflow_parse_cache.json"
+CACHE_SIG = "wfparse:v1"
+MAX_ENTRIES = 512
+LATEST_INDEX_PATH = pathlib.Path(".steg") / "state" / "latest_per_workflow.json"
+SWEEP_MODES = ("full", "hash", "git")
+
+_BOOL_TAG = "tag:yaml.org,2002:bool"
+_TIMESTAMP_TAG = "tag:yaml.org,2002:timestamp"
+
+_BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+LOADER_NAME = _BaseLoader.__name__
+
+class WorkflowLoader(_BaseLoader):
+    """Safe loader with YAML 1.2 booleans (true/false only) and no timestamps."""
+
+WorkflowLoader.yaml_implicit_resolvers = {
+    ch: [(tag, rx) for tag, rx in resolvers if tag not in (_BOOL_TAG, _TIMESTAMP_TAG)]
+    for ch, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+}
+WorkflowLoader.add_implicit_resolver(
+    _BOOL_TAG, re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"), list("tTfF"))
+
+def load(text:str)->Any:
+    return yaml.load(text, Loader=WorkflowLoader)
+
+def text_sha(text:str)->str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _json_roundtrips(data:Any)->bool:
+    try:
+        return json.loads(json.dumps(data)) == data
+    except (TypeError, ValueError):
+        return False
+
+class ParseCache:
+    """
+    Content-addressed parse cache.
+
+    Entries: sha -> {"ok": True, "data": ...} or {"ok": False, "error": "ScannerError",
+    "message": "..."}. Models that do not survive a JSON round trip (non-string
+    keys, ...) are cached as ok without "data" and re-parsed on demand.
+    Least recently used entries beyond max_entries are dropped on save.
+    """
+
+    def __init__(self, path:Optional[pathlib.Path]=CACHE_PATH, max_entries:int=MAX_ENTRIES):
+        self.path = pathlib.Path(path) if path else None
+        self.max_entries = max_entries
+        self.entries: Dict[str, dict] = {}
+        self.fresh: Dict[str, dict] = {}
+        self.hits = self.misses = 0
+        self.dirty = False
+        if self.path and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                if raw.get("sig") == CACHE_SIG:
+                    self.entries = raw.get("entries", {})
+            except Exception:
+                self.entries = {}
+
+    def _entry(self, text:str)->Tuple[dict, Any]:
+        sha = text_sha(text)
+        ent = self.entries.pop(sha, None)
+        data = None
+        if ent is None:
+            self.misses += 1
+            try:
+                data = load(text)
+                ent = {"ok": True, "data": data} if _json_roundtrips(data) else {"ok": True}
+            except Exception as e:
+                ent = {"ok": False, "error": type(e).__name__, "message": str(e)[:300]}
+            self.fresh[sha] = ent
+            self.dirty = True
+        else:
+            self.hits += 1
+        self.entries[sha] = ent  # re-insert: most recently used last
+        return ent, data
+
+    def status(self, text:str)->Optional[str]:
+        """Parse error type name, or None if the text parses."""
+        ent, _ = self._entry(text)
+        return None if ent["ok"] else ent["error"]
+
+    def parse(self, text:str)->Tuple[Any, Optional[str]]:
+        """(model, error_type_name). The model is a private copy the caller may mutate."""
+        ent, data = self._entry(text)
+        if not ent["ok"]:
+            return None, ent["error"]
+        if data is not None:
+            return copy.deepcopy(data), None
+        if "data" in ent:
+            return copy.deepcopy(ent["data"]), None
+        return load(text), None
+
+    def load_file(self, p:pathlib.Path)->Tuple[str, Any, Optional[str]]:
+        text = p.read_text(encoding="utf-8", errors="ignore")
+        data, err = self.parse(text)
+        return text, data, err
+
+    def take_fresh(self)->Dict[str, dict]:
+        """Entries parsed since the last call (for shipping out of pool workers)."""
+        fresh, self.fresh = self.fresh, {}
+        return fresh
+
+    def merge(self, entries:Dict[str, dict])->None:
+        for sha, ent in entries.items():
+            self.entries.pop(sha, None)
+            self.entries[sha] = ent
+            self.dirty = True
+
+    def save(self)->None:
+        if not self.path or not self.dirty:
+            return
+        keep = list(self.entries.items())[-self.max_entries:]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"sig": CACHE_SIG, "loader": LOADER_NAME,
+                                         "entries": dict(keep)}), encoding="utf-8")
+        self.dirty = False
+
+def workflow_paths(wf_dir:pathlib.Path)->List[pathlib.Path]:
+    return sorted(wf_dir.glob("*.y*ml"))
+
+def file_checksum(p:pathlib.Path)->str:
+    """Same digest state_engine records as post_checksum (SHA-256 of raw bytes)."""
+    return hashlib.sha256(p.read_bytes()).hexdigest()
+
+def load_latest_index(path:pathlib.Path=LATEST_INDEX_PATH)->Dict[str, dict]:
+    try:
+        data = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def last_processed_sha(index:Dict[str, dict])->Optional[str]:
+    """Commit SHA of the newest local event in the latest-per-workflow index."""
+    local = [ev for ev in index.values() if "fleet" not in (ev.get("labels") or [])]
+    newest = max(local, key=lambda ev: ev.get("ts") or "", default=None)
+    return ((newest or {}).get("meta") or {}).get("sha")
+
+def git_changed_names(base:str, wf_dir:pathlib.Path)->Optional[set]:
+    """Workflow file names changed between `base` and the working tree, or None if git can't tell."""
+    try:
+        r = subprocess.run(["git","diff","--name-only",base,"--",str(wf_dir)],
+                           check=False, text=True, capture_output=True)
+    except OSError:
+        return None
+    if r.returncode != 0:
+        return None
+    return {pathlib.Path(x).name for x in r.stdout.splitlines() if x.strip()}
+
+def select_changed(paths:Iterable[pathlib.Path], mode:str="full",
+                   index:Optional[Dict[str, dict]]=None, git_base:Optional[str]=None,
+                   recheck_status:Iterable[str]=())->Tuple[List[pathlib.Path], List[pathlib.Path]]:
+    """
+    Split workflow paths into (to_process, unchanged).
+
+    - full: everything is processed.
+    - hash: a file is unchanged when its checksum equals the indexed
+      post_checksum.
+    - git:  a file is unchanged when `git diff` since git_base (default: the
+      SHA of the newest indexed event) does not list it; falls back to hash
+      when git cannot resolve the base.
+    Files missing from the index, or whose indexed status is in
+    recheck_status, are always processed.
+    """
+    paths = list(paths)
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Unknown sweep mode {mode!r}; expected one of {SWEEP_MODES}")
+    if mode == "full" or not index:
+        return paths, []
+
+    recheck = set(recheck_status)
+    changed_names = None
+    if mode == "git":
+        base = git_base if git_base and git_base != "auto" else last_processed_sha(index)
+        changed_names = git_changed_names(base, paths[0].parent) if base and paths else None
+        if changed_names is None:
+            log("git diff unavailable; falling back to hash comparison")
+
+    todo, unchanged = [], []
+    for p in paths:
+        known = index.get(p.name)
+        if not known or known.get("status") in recheck:
+            todo.append(p)
+        elif changed_names is not None:
+            (todo if p.name in changed_names else unchanged).append(p)
+        else:
+            (unchanged if file_checksum(p) == known.get("post_checksum") else todo).append(p)
+    return todo, unchanged
+
+def check(wf_dir:pathlib.Path, cache:ParseCache)->Dict[str, Any]:
+    files = []
+    for p in workflow_paths(wf_dir):
+        err = cache.status(p.read_text(encoding="utf-8", errors="ignore"))
+        files.append({"file": p.name, "ok": err is None, "error": err})
+    return {
+        "loader": LOADER_NAME,
+        "files": files,
+        "broken": sum(1 for f in files if not f["ok"]),
+        "cache": {"hits": cache.hits, "misses": cache.misses},
+    }
+
+def main(argv: Optional[list] = None) -> int:
+    root = pathlib.Path(os.getenv("GITHUB_WORKSPACE","."))
+    parser = argparse.ArgumentParser(description="SCW Workflow Loader – cached workflow parsing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_check = sub.add_parser("check", help="Report parse status of every workflow file.")
+    p_check.add_argument("--workflows-dir", default=str(root/".github"/"workflows"))
+    p_check.add_argument("--cache", default=str(root/CACHE_PATH))
+    p_check.add_argument("--json", default=None, help="Also write the report to this path")
+    args = parser.parse_args(argv)
+
+    cache = ParseCache(pathlib.Path(args.cache))
+    report = check(pathlib.Path(args.workflows_dir), cache)
+    cache.save()
+    for f in report["files"]:
+        log(f"{'ok    ' if f['ok'] else 'BROKEN'} {f['file']}" + (f" ({f['error']})" if f["error"] else ""))
+    log(f"loader={report['loader']} cache hits={cache.hits} misses={cache.misses}")
+    if args.json:
+        out = pathlib.Path(args.json)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,10 +2,99 @@
 StegTVC Client – lightweight import layer for GitHub Actions.
 
 Workflow example:
-    from stegtvc_client import resolve
+    from stegtvc_client import resolve, resolve_many
 
+Talks to the resolver service (python -m app.resolver_service) when one is
+listening on $STEGTVC_SOCKET (default /tmp/stegtvc.sock) or $STEGTVC_URL
+(http://127.0.0.1:PORT), reusing one keep-alive connection per process.
+Without a service it resolves in-process via app.resolver.
 """
 
-from app.resolver import stegtvc_resolve as resolve
+import http.client
+import json
+import os
+import socket
+import time
+from urllib.parse import urlencode, urlparse
 
-__all__ = ["resolve"]
+from app import resolver as _local
+from app.resolver import StegTVCResolutionError
+
+SOCKET_PATH = os.environ.get("STEGTVC_SOCKET", "/tmp/stegtvc.sock")
+SERVICE_URL = os.environ.get("STEGTVC_URL")
+TIMEOUT = 2.0
+# After a failed connect, resolve in-process for this long before retrying.
+RETRY_AFTER = 5.0
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("stegtvc", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
+
+
+_conn = None
+_down_until = 0.0
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        if SERVICE_URL:
+            u = urlparse(SERVICE_URL)
+            _conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=TIMEOUT)
+        else:
+            _conn = _UnixHTTPConnection(SOCKET_PATH, TIMEOUT)
+    return _conn
+
+
+def _call(method, path, body=None):
+    """(status, payload) from the service, or None when no service is reachable."""
+    global _conn, _down_until
+    if time.monotonic() < _down_until or (not SERVICE_URL and not os.path.exists(SOCKET_PATH)):
+        return None
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if data is not None else {}
+    for attempt in (0, 1):  # one retry covers a keep-alive socket the server closed
+        try:
+            conn = _connection()
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, json.loads(resp.read() or b"{}")
+        except (OSError, http.client.HTTPException, ValueError):
+            if _conn is not None:
+                _conn.close()
+            _conn = None
+    _down_until = time.monotonic() + RETRY_AFTER
+    return None
+
+
+def resolve(use_case, module, importance="normal"):
+    query = urlencode({"use_case": use_case, "module": module, "importance": importance})
+    res = _call("GET", f"/resolve?{query}")
+    if res is None:
+        return _local.stegtvc_resolve(use_case, module, importance)
+    status, payload = res
+    if status != 200:
+        raise StegTVCResolutionError(payload.get("error", f"resolver service returned {status}"))
+    return payload
+
+
+def resolve_many(pairs, importance="normal", strict=True):
+    pairs = [list(p) for p in pairs]
+    res = _call("POST", "/resolve_many", {"pairs": pairs, "importance": importance, "strict": strict})
+    if res is None:
+        return _local.resolve_many(pairs, importance, strict)
+    status, payload = res
+    if status != 200:
+        raise StegTVCResolutionError(payload.get("error", f"resolver service returned {status}"))
+    return payload["results"]
+
+
+__all__ = ["resolve", "resolve_many", "StegTVCResolutionError"]